@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils import timezone
 from datetime import timedelta
+from .entitlements import invalidate_entitlements
 from .models import Vendor
 from .models import PaymentRequest
 from django import forms
@@ -103,6 +104,7 @@ class VendorAdmin(admin.ModelAdmin):
 			daily_orders_count=0,
 			daily_orders_date=None,
 		)
+		invalidate_entitlements(queryset.values_list('pk', flat=True))
 		self.message_user(request, f"Started 14-day trial for {count} vendors")
 	
 	@admin.action(description="Activate Free Plan (10 orders/day)")
@@ -115,6 +117,7 @@ class VendorAdmin(admin.ModelAdmin):
 			daily_orders_count=0,
 			daily_orders_date=None,
 		)
+		invalidate_entitlements(queryset.values_list('pk', flat=True))
 		self.message_user(request, f"Activated free plan for {count} vendors")
 
 	@admin.action(description="Activate Monthly Plan ($22.99/month)")
@@ -129,6 +132,7 @@ class VendorAdmin(admin.ModelAdmin):
 			daily_orders_count=0,
 			daily_orders_date=None,
 		)
+		invalidate_entitlements(queryset.values_list('pk', flat=True))
 		self.message_user(request, f"Activated monthly plan for {count} vendors")
 
 	@admin.action(description="Activate 3-Month Plan ($68.97/3 months)")
@@ -143,6 +147,7 @@ class VendorAdmin(admin.ModelAdmin):
 			daily_orders_count=0,
 			daily_orders_date=None,
 		)
+		invalidate_entitlements(queryset.values_list('pk', flat=True))
 		self.message_user(request, f"Activated 3-month plan for {count} vendors")
 
 	@admin.action(description="Activate 6-Month Plan ($137.94/6 months)")
@@ -157,6 +162,7 @@ class VendorAdmin(admin.ModelAdmin):
 			daily_orders_count=0,
 			daily_orders_date=None,
 		)
+		invalidate_entitlements(queryset.values_list('pk', flat=True))
 		self.message_user(request, f"Activated 6-month plan for {count} vendors")
 
 	@admin.action(description="Activate Annual Plan ($275.88/year)")
@@ -171,6 +177,7 @@ class VendorAdmin(admin.ModelAdmin):
 			daily_orders_count=0,
 			daily_orders_date=None,
 		)
+		invalidate_entitlements(queryset.values_list('pk', flat=True))
 		self.message_user(request, f"Activated annual plan for {count} vendors")
 
 	@admin.action(description="Activate Perpetual (no expiry)")
@@ -183,11 +190,13 @@ class VendorAdmin(admin.ModelAdmin):
 			daily_orders_count=0,
 			daily_orders_date=None,
 		)
+		invalidate_entitlements(queryset.values_list('pk', flat=True))
 		self.message_user(request, f"Activated perpetual plan for {count} vendors")
 
 	@admin.action(description="Revoke Service (disable bot + app actions)")
 	def revoke_service(self, request, queryset):
 		count = queryset.update(is_service_active=False)
+		invalidate_entitlements(queryset.values_list('pk', flat=True))
 		self.message_user(request, f"Revoked service for {count} vendors")
 
 	@admin.action(description="Reset Daily Order Count")
@@ -272,7 +281,6 @@ class PaymentRequestAdmin(admin.ModelAdmin):
 
 	@admin.action(description="Approve selected payments and activate vendor")
 	def approve_payments(self, request, queryset):
-		from django.utils import timezone
 		# Admins may optionally pass 'duration_days' in the POST data when triggering this action via the
 		# admin action form. If not provided, default to 30 days activation window.
 		from django.conf import settings
@@ -285,21 +293,9 @@ class PaymentRequestAdmin(admin.ModelAdmin):
 				duration_days = default_days
 		except Exception:
 			duration_days = default_days
-		count = 0
-		for pr in queryset:
-			if pr.status != 'approved':
-				pr.status = 'approved'
-				pr.processed_at = timezone.now()
-				pr.processed_by = request.user
-				pr.save(update_fields=['status','processed_at','processed_by'])
-				# Activate vendor service for duration_days
-				vendor = pr.vendor
-				vendor.is_service_active = True
-				vendor.is_trial = False
-				vendor.plan = 'monthly'
-				vendor.plan_expires_at = timezone.now() + timedelta(days=duration_days)
-				vendor.save(update_fields=['is_service_active','is_trial','plan','plan_expires_at'])
-				count += 1
+		# Two set-based UPDATEs and one channel event per vendor, however many are selected
+		from .payments import approve_payment_requests
+		count, _ = approve_payment_requests(queryset, request.user, duration_days)
 		self.message_user(request, f"Approved and activated {count} payment(s) for {duration_days} days")
 
 	@admin.action(description="Reject selected payments")
@@ -332,3 +328,22 @@ class GlobalPaymentDestinationAdmin(admin.ModelAdmin):
     list_display = ("name", "kind", "is_active", "created_at")
     list_filter = ("kind", "is_active")
     search_fields = ("name", "details")
+
+
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "status", "attempts", "next_attempt_at", "created_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("subject", "to")
+    readonly_fields = ("created_at", "sent_at", "last_error")
+    actions = ["retry_now"]
+
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboundEmail.SENT).update(
+            status=OutboundEmail.PENDING, next_attempt_at=timezone.now()
+        )
+        self.message_user(request, f"Requeued {updated} email(s).", messages.SUCCESS)
+    retry_now.short_description = "Retry selected emails now"
@@ -0,0 +1,222 @@
+"""Time-bucketed order analytics for the vendor dashboard.
+
+``GET /accounts/analytics/?granularity=day|week|month&start=&end=&asset=``
+groups the vendor's orders by creation period and asset. For each group it
+returns:
+
+- the order count, by status;
+- completed volume (asset units) and revenue (``total_value``, or
+  ``amount * rate`` for legacy rows);
+- the average acceptance time (``accepted_at - created_at``);
+- the average release time. That is the time from proof upload to completion
+  (``vendor_completed_at``, else ``completed_at``).
+
+Bucketing and aggregation run in SQL: one ``GROUP BY`` over ``Trunc*`` of
+``created_at``. Transaction fields come from correlated subqueries rather than
+a join, so an order with several transactions still counts once. There is
+one such statement for the hot tables and one for the archive (``orders.archive``).
+Both use the ``(vendor, created_at)`` indexes with a plain range on
+``created_at``. Averages are kept as sums and counts until the two are merged,
+so archived history weighs the same as live rows.
+
+Results are cached under the endpoint's ETag. That tag changes with the
+vendor's order/transaction change versions and with the day, so an order
+write or an archive run makes the next request recompute. Unchanged requests
+get a 304 or a single cache read.
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Tuple, cast
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, DurationField, Exists, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.change_versions import ORDERS, TRANSACTIONS, etag_matches, not_modified, vendor_etag, with_etag
+from vendora.db_router import replica_reads
+
+logger = logging.getLogger(__name__)
+
+TRUNCATE = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+DEFAULT_DAYS = {"day": 30, "week": 7 * 26, "month": 365}
+CACHE_KEY_PREFIX = "analytics:"
+
+_STATUSES = ("pending", "accepted", "declined", "expired", "completed")
+_MONEY = DecimalField(max_digits=40, decimal_places=4)
+
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def periods(start: date, end: date, granularity: str) -> List[date]:
+    """Every bucket start between ``start`` and ``end``, so clients can zero-fill."""
+    out = []
+    current = period_start(start, granularity)
+    while current <= end:
+        out.append(current)
+        if granularity == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if granularity == "week" else 1)
+    return out
+
+
+def parse_analytics_query(params) -> Tuple[date, date, str, str]:
+    """``granularity``, ``start``/``end`` (inclusive) and ``asset``; ValueError when invalid."""
+    granularity = (params.get("granularity") or "day").lower()
+    if granularity not in TRUNCATE:
+        raise ValueError(f"granularity must be one of: {', '.join(TRUNCATE)}")
+    end = date.fromisoformat(params["end"]) if params.get("end") else timezone.localdate()
+    start = date.fromisoformat(params["start"]) if params.get("start") else end - timedelta(days=DEFAULT_DAYS[granularity] - 1)
+    if end < start:
+        raise ValueError("end is before start")
+    max_buckets = int(getattr(settings, "ANALYTICS_MAX_BUCKETS", 400) or 400)
+    if len(periods(start, end, granularity)) > max_buckets:
+        raise ValueError(f"Range spans more than {max_buckets} {granularity} buckets; use a coarser granularity")
+    return start, end, granularity, (params.get("asset") or "").strip()
+
+
+def _grouped(model, txn_model, vendor_id, since: datetime, until: datetime, granularity: str, asset: str):
+    """One ``GROUP BY period, asset`` statement over ``model``, one row per order whatever its transactions."""
+    qs = cast(Any, model).objects.filter(vendor_id=vendor_id, created_at__gte=since, created_at__lt=until)
+    if asset:
+        qs = qs.filter(asset=asset)
+    txns = cast(Any, txn_model).objects.filter(order=OuterRef("pk"))
+    # Same "completed" test as the dashboard totals, true when any transaction passes it
+    txn_done = Exists(txns.filter(
+        Q(status__iexact="completed") | Q(completed_at__isnull=False) | Q(vendor_completed_at__isnull=False)
+    ))
+    # Release time of the order's latest released transaction
+    release = Subquery(
+        txns.filter(Q(proof_uploaded_at__isnull=False) & (Q(vendor_completed_at__isnull=False) | Q(completed_at__isnull=False)))
+        .order_by("-id")
+        .annotate(took=ExpressionWrapper(
+            Coalesce(F("vendor_completed_at"), F("completed_at")) - F("proof_uploaded_at"), output_field=DurationField(),
+        ))
+        .values("took")[:1],
+        output_field=DurationField(),
+    )
+    done = Q(status="completed") | Q(txn_done=True)
+    value = Coalesce(F("total_value"), ExpressionWrapper(F("amount") * F("rate"), output_field=_MONEY), output_field=_MONEY)
+    accepted = Q(accepted_at__isnull=False)
+    released = Q(release__isnull=False)
+    return (
+        qs.annotate(period=TRUNCATE[granularity]("created_at"), txn_done=txn_done, release=release)
+        .values("period", "asset")
+        .annotate(
+            n_orders=Count("id"),
+            n_done=Count("id", filter=done),
+            volume=Sum("amount", filter=done),
+            revenue=Sum(value, filter=done),
+            accept_sum=Sum(ExpressionWrapper(F("accepted_at") - F("created_at"), output_field=DurationField()), filter=accepted),
+            accept_n=Count("id", filter=accepted),
+            release_sum=Sum("release", filter=released),
+            release_n=Count("id", filter=released),
+            **{f"n_{s}": Count("id", filter=Q(status=s)) for s in _STATUSES},
+        )
+        # Replaces Meta.ordering, which would otherwise join the GROUP BY
+        .order_by("period", "asset")
+    )
+
+
+def _empty() -> Dict[str, Any]:
+    return {
+        "n_orders": 0, "n_done": 0, "volume": 0, "revenue": 0,
+        "accept_sum": timedelta(0), "accept_n": 0, "release_sum": timedelta(0), "release_n": 0,
+        **{f"n_{s}": 0 for s in _STATUSES},
+    }
+
+
+def _add(into: Dict[str, Any], row: Dict[str, Any]) -> None:
+    for key, current in into.items():
+        value = row.get(key)
+        if value is not None:
+            into[key] = current + value
+
+
+def _seconds(total: timedelta, n: int) -> Optional[float]:
+    return round(total.total_seconds() / n, 1) if n else None
+
+
+def _public(acc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "orders": acc["n_orders"],
+        "by_status": {s: acc[f"n_{s}"] for s in _STATUSES},
+        "completed": acc["n_done"],
+        "volume": float(acc["volume"]),
+        "revenue": float(acc["revenue"]),
+        "avg_acceptance_seconds": _seconds(acc["accept_sum"], acc["accept_n"]),
+        "avg_release_seconds": _seconds(acc["release_sum"], acc["release_n"]),
+    }
+
+
+def _label(period) -> str:
+    if isinstance(period, datetime):
+        period = timezone.localtime(period).date() if timezone.is_aware(period) else period.date()
+    return period.isoformat()
+
+
+def vendor_analytics(vendor_id, start: date, end: date, granularity: str, asset: str = "") -> Dict[str, Any]:
+    """Bucketed series plus range totals, hot and archived orders combined."""
+    from orders.models import ArchivedOrder, Order
+    from transactions.models import ArchivedTransaction, Transaction
+
+    tz = timezone.get_current_timezone()
+    since = timezone.make_aware(datetime.combine(start, time.min), tz)
+    until = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+
+    buckets: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    totals = _empty()
+    for model, txn_model in ((Order, Transaction), (ArchivedOrder, ArchivedTransaction)):
+        for row in _grouped(model, txn_model, vendor_id, since, until, granularity, asset):
+            acc = buckets.setdefault((_label(row["period"]), row["asset"]), _empty())
+            _add(acc, row)
+            _add(totals, row)
+
+    return {
+        "granularity": granularity,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "asset": asset or None,
+        "periods": [p.isoformat() for p in periods(start, end, granularity)],
+        "series": [{"period": p, "asset": a, **_public(buckets[(p, a)])} for p, a in sorted(buckets)],
+        "totals": _public(totals),
+    }
+
+
+class AnalyticsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @replica_reads
+    def get(self, request):
+        try:
+            start, end, granularity, asset = parse_analytics_query(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Default ranges end today, so the date is part of the validator
+        etag = vendor_etag(request, (ORDERS, TRANSACTIONS), extra=(timezone.localdate(),))
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+
+        key = f"{CACHE_KEY_PREFIX}{request.user.pk}:{etag}" if etag else None
+        payload = cache.get(key) if key else None
+        if payload is None:
+            payload = vendor_analytics(request.user.pk, start, end, granularity, asset)
+            if key:
+                try:
+                    cache.set(key, payload, timeout=int(getattr(settings, "ANALYTICS_CACHE_SECONDS", 3600)))
+                except Exception as e:
+                    logger.warning("Analytics cache failed for vendor %s: %s", request.user.pk, e)
+        return with_etag(Response(payload), etag)
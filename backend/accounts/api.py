@@ -1,5 +1,5 @@
 from rest_framework import serializers, viewsets, permissions
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework import status
 from .models import PaymentRequest
@@ -11,6 +11,8 @@ from django.conf import settings
 
 
 class PaymentRequestSerializer(serializers.ModelSerializer):
+    receipt_key = serializers.CharField(write_only=True, required=False, allow_blank=True)
+
     def validate_receipt(self, value):
         if not value:
             return value
@@ -38,9 +40,25 @@ class PaymentRequestSerializer(serializers.ModelSerializer):
 
         return value
 
+    def validate_receipt_key(self, value):
+        if not value:
+            return value
+        from api.storage import UploadError, validate_uploaded_key
+        try:
+            return validate_uploaded_key("receipt", value, self.context["request"].user)
+        except UploadError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate(self, attrs):
+        # A receipt PUT straight to object storage is attached by key
+        receipt_key = attrs.pop('receipt_key', None)
+        if receipt_key:
+            attrs['receipt'] = receipt_key
+        return attrs
+
     class Meta:
         model = PaymentRequest
-        fields = ['id','vendor','receipt','note','status','created_at','processed_at']
+        fields = ['id','vendor','receipt','receipt_key','note','status','created_at','processed_at']
         read_only_fields = ['id','vendor','status','created_at','processed_at']
 
 
@@ -52,7 +70,7 @@ class IsOwnerOrAdmin(permissions.BasePermission):
 class PaymentRequestViewSet(viewsets.ModelViewSet):
     queryset = PaymentRequest.objects.all()
     serializer_class = PaymentRequestSerializer
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def get_permissions(self):
         # Allow authenticated users to create and list their own requests
@@ -85,22 +103,9 @@ class PaymentRequestViewSet(viewsets.ModelViewSet):
         except (ValueError, TypeError):
             return Response({'detail': 'duration_days must be an integer number of days'}, status=status.HTTP_400_BAD_REQUEST)
 
-        pr.status = 'approved'
-        pr.processed_at = timezone.now()
-        pr.processed_by = request.user
-        pr.save(update_fields=['status', 'processed_at', 'processed_by'])
-        # Activate vendor
-        vendor = pr.vendor
-        vendor.is_service_active = True
-        vendor.is_trial = False
-        # If duration_days provided, set plan to 'monthly' and set expiry accordingly; otherwise default to perpetual
-        if duration_days:
-            vendor.plan = 'monthly'
-            vendor.plan_expires_at = timezone.now() + timezone.timedelta(days=duration_days)
-        else:
-            vendor.plan = 'perpetual'
-            vendor.plan_expires_at = None
-        vendor.save(update_fields=['is_service_active', 'is_trial', 'plan', 'plan_expires_at'])
+        # Activate vendor: with duration_days a 'monthly' plan expiring accordingly; otherwise perpetual
+        from .payments import approve_payment_requests
+        approve_payment_requests(PaymentRequest.objects.filter(pk=pr.pk), request.user, duration_days)
         return Response({'detail': 'Approved and vendor activated'}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
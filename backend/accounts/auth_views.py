@@ -12,10 +12,10 @@ from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 from typing import Any, cast
+from .mail_queue import enqueue_email
 from .models import Vendor
 from .serializers import CustomTokenObtainPairSerializer, VendorRegistrationSerializer
 import logging
@@ -242,13 +242,7 @@ Best regards,
 Vendora Team
 """
     
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [vendor.email],
-        fail_silently=False,
-    )
+    enqueue_email(subject, message, [vendor.email], from_email=settings.DEFAULT_FROM_EMAIL)
 
 
 def send_password_reset_email(vendor, uid, token):
@@ -274,10 +268,4 @@ Best regards,
 Vendora Team
 """
     
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [vendor.email],
-        fail_silently=False,
-    )
+    enqueue_email(subject, message, [vendor.email], from_email=settings.DEFAULT_FROM_EMAIL)
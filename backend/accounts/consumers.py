@@ -1,6 +1,9 @@
 import json
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 
+from api.events import PAYMENT_REQUEST_CHANGED, vendor_group
+from .ws_auth import jwt_subprotocol
+
 
 class PaymentRequestConsumer(AsyncJsonWebsocketConsumer):
     async def connect(self):
@@ -8,10 +11,10 @@ class PaymentRequestConsumer(AsyncJsonWebsocketConsumer):
         if not user or not getattr(user, 'is_authenticated', False):
             await self.close(code=4001)
             return
-        # Use user id as group name
-        self.group_name = f"payment_requests_{user.id}"
+        # Live events for this vendor arrive via the event bus group
+        self.group_name = vendor_group(user.id)
         await self.channel_layer.group_add(self.group_name, self.channel_name)
-        await self.accept()
+        await self.accept(subprotocol=jwt_subprotocol(self.scope))
 
     async def disconnect(self, close_code):
         try:
@@ -19,6 +22,8 @@ class PaymentRequestConsumer(AsyncJsonWebsocketConsumer):
         except Exception:
             pass
 
-    async def payment_request_event(self, event):
-        # event['data'] expected to be JSON-serializable
-        await self.send_json(event.get('data', {}))
+    async def vendor_events(self, event):
+        # A batch of bus events; clients get one frame per payment request change
+        for ev in event.get('events', []):
+            if ev.get('type') == PAYMENT_REQUEST_CHANGED:
+                await self.send_json(ev.get('data', {}))
@@ -7,10 +7,14 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api.change_versions import BROADCASTS, ORDERS, QUERIES, TRANSACTIONS, etag_matches, not_modified, vendor_etag, with_etag
+from vendora.db_router import replica_reads
+
 
 class DashboardSummaryView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @replica_reads
     def get(self, request):
         from orders.models import Order
         from transactions.models import Transaction
@@ -18,6 +22,10 @@ class DashboardSummaryView(APIView):
         from accounts.models import BroadcastMessage
 
         user = request.user
+        # Insights cover the last 14 days, so the date is part of the validator
+        etag = vendor_etag(request, (ORDERS, TRANSACTIONS, QUERIES, BROADCASTS), extra=(timezone.localdate(),))
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
 
         order_counts = Order.objects.filter(vendor=user).aggregate(
             pending=Count("id", filter=Q(status=Order.PENDING)),
@@ -51,6 +59,11 @@ class DashboardSummaryView(APIView):
                 except Exception:
                     continue
 
+        # Finished history moved out of the hot tables still counts
+        from orders.archive import archived_totals
+        archived = archived_totals(user.pk)
+        total_revenue_decimal += archived["revenue"]
+
         pending_queries_qs = Query.objects.filter(
             Q(vendor=user) | Q(order__vendor=user)
         ).filter(
@@ -166,11 +179,11 @@ class DashboardSummaryView(APIView):
                 ),
             },
             "stats": {
-                "total_orders_received": (order_counts.get("accepted") or 0) + (order_counts.get("declined") or 0),
+                "total_orders_received": (order_counts.get("accepted") or 0) + (order_counts.get("declined") or 0) + archived["declined"],
                 "pending_orders": order_counts.get("pending") or 0,
-                "completed_orders": order_counts.get("completed") or 0,
+                "completed_orders": (order_counts.get("completed") or 0) + archived["completed"],
                 "total_revenue": float(total_revenue_decimal),
-                "completed_transactions": completed_count,
+                "completed_transactions": completed_count + archived["completed_transactions"],
                 "pending_queries": pending_queries_count,
             },
             "recent": {
@@ -184,4 +197,4 @@ class DashboardSummaryView(APIView):
             },
         }
 
-        return Response(payload)
+        return with_etag(Response(payload), etag)
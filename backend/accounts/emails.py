@@ -1,30 +1,42 @@
-from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
-from typing import Optional
+from typing import Optional, Tuple
 
 DEF_FROM = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com')
 
 def _send(subject: str, body: str, to: str):
+    # Delivered asynchronously by the deliver_emails job (see accounts.mail_queue)
     try:
-        send_mail(subject, body, DEF_FROM, [to], fail_silently=True)
+        from .mail_queue import enqueue_email
+        enqueue_email(subject, body, to, from_email=DEF_FROM)
     except Exception:
         pass
 
-def send_trial_ending_email(vendor, days_left: int):
-    _send(
+
+def trial_ending_message(vendor, days_left: int) -> Tuple[str, str]:
+    return (
         "Your trial is ending soon",
         f"Hi {vendor.name}, your trial ends in {days_left} day(s). Upgrade to keep your access.",
-        vendor.email,
     )
 
-def send_trial_expired_email(vendor):
-    _send(
+def trial_expired_message(vendor) -> Tuple[str, str]:
+    return (
         "Your trial has expired",
         f"Hi {vendor.name}, your trial has expired. Upgrade to continue using the platform.",
-        vendor.email,
     )
 
+def plan_expiring_message(vendor, days_left: int) -> Tuple[str, str]:
+    return (
+        "Plan expiring soon",
+        f"Hi {vendor.name}, your {vendor.plan} plan expires in {days_left} day(s). Renew to avoid interruption.",
+    )
+
+def send_trial_ending_email(vendor, days_left: int):
+    _send(*trial_ending_message(vendor, days_left), vendor.email)
+
+def send_trial_expired_email(vendor):
+    _send(*trial_expired_message(vendor), vendor.email)
+
 def send_plan_changed_email(vendor, old_plan: str, new_plan: str):
     _send(
         "Plan updated",
@@ -33,8 +45,4 @@ def send_plan_changed_email(vendor, old_plan: str, new_plan: str):
     )
 
 def send_plan_expiring_email(vendor, days_left: int):
-    _send(
-        "Plan expiring soon",
-        f"Hi {vendor.name}, your {vendor.plan} plan expires in {days_left} day(s). Renew to avoid interruption.",
-        vendor.email,
-    )
\ No newline at end of file
+    _send(*plan_expiring_message(vendor, days_left), vendor.email)
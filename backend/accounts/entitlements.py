@@ -0,0 +1,136 @@
+"""Per-vendor entitlement snapshots.
+
+Trial, plan, service and availability gating is derived once from the Vendor
+fields into an immutable ``Entitlement``. ``valid_until`` is the earliest
+moment the snapshot could change on its own (the next trial or plan expiry,
+capped by ``ENTITLEMENT_CACHE_SECONDS``), so checking a cached snapshot is a
+single comparison and costs no query.
+
+Snapshots are cached per vendor in the default cache under a versioned key
+and dropped whenever a Vendor is saved. Code that changes vendors with
+``QuerySet.update`` calls ``invalidate_entitlements``.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+# Bump when the fields below change so old pickled snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+SUSPENDED = 'suspended'
+TRIAL_EXPIRED = 'trial_expired'
+PLAN_EXPIRED = 'plan_expired'
+
+# Plans that never expire on a date. A vendor who drops to the free plan keeps
+# the old plan_expires_at, which must not lock them out.
+_UNDATED_PLANS = {'none', 'trial', 'perpetual'}
+
+_VENDOR_FIELDS = (
+    'id', 'name', 'plan', 'is_trial', 'trial_expires_at', 'plan_expires_at', 'is_service_active',
+    'daily_order_limit', 'auto_accept', 'is_available', 'unavailable_message',
+)
+
+
+def _cache_key(vendor_id) -> str:
+    return f"entitlement:v{SNAPSHOT_VERSION}:{vendor_id}"
+
+
+def _ttl_seconds() -> int:
+    return max(1, int(getattr(settings, 'ENTITLEMENT_CACHE_SECONDS', 300) or 300))
+
+
+@dataclass(frozen=True)
+class Entitlement:
+    vendor_id: int
+    active: bool
+    reason: str  # '' when active, else SUSPENDED / TRIAL_EXPIRED / PLAN_EXPIRED
+    trial_expired: bool
+    plan_expired: bool
+    suspended: bool
+    expires_at: Optional[datetime]  # when the current trial or dated plan runs out
+    daily_limit: int  # -1 means unlimited
+    auto_accept: bool
+    is_available: bool
+    unavailable_message: str
+    valid_until: datetime
+
+    @classmethod
+    def from_vendor(cls, vendor, now: Optional[datetime] = None) -> 'Entitlement':
+        now = now or timezone.now()
+        suspended = not getattr(vendor, 'is_service_active', True)
+        is_trial = bool(getattr(vendor, 'is_trial', False))
+        tea = getattr(vendor, 'trial_expires_at', None) if is_trial else None
+        pea = None
+        if getattr(vendor, 'plan', 'trial') not in _UNDATED_PLANS:
+            pea = getattr(vendor, 'plan_expires_at', None)
+        trial_expired = bool(tea and tea < now)
+        plan_expired = bool(pea and pea < now)
+
+        reason = ''
+        if suspended:
+            reason = SUSPENDED
+        elif trial_expired:
+            reason = TRIAL_EXPIRED
+        elif plan_expired:
+            reason = PLAN_EXPIRED
+
+        upcoming = [t for t in (tea, pea) if t and t >= now]
+        expires_at = min(upcoming) if upcoming else None
+        valid_until = now + timezone.timedelta(seconds=_ttl_seconds())
+        if expires_at and expires_at < valid_until:
+            valid_until = expires_at
+
+        daily_limit = vendor.get_daily_order_limit() if vendor.is_on_free_plan() else -1
+        return cls(
+            vendor_id=vendor.pk,
+            active=not reason,
+            reason=reason,
+            trial_expired=trial_expired,
+            plan_expired=plan_expired,
+            suspended=suspended,
+            expires_at=expires_at,
+            daily_limit=daily_limit,
+            auto_accept=bool(getattr(vendor, 'auto_accept', False)),
+            is_available=getattr(vendor, 'is_available', True) is not False,
+            unavailable_message=getattr(vendor, 'unavailable_message', '') or '',
+            valid_until=valid_until,
+        )
+
+    def is_fresh(self, now: Optional[datetime] = None) -> bool:
+        return (now or timezone.now()) < self.valid_until
+
+
+def entitlement_for(vendor) -> Entitlement:
+    """Snapshot for a loaded vendor instance, memoized on the instance."""
+    ent = vendor.__dict__.get('_entitlement')
+    if ent is None or not ent.is_fresh():
+        ent = Entitlement.from_vendor(vendor)
+        vendor.__dict__['_entitlement'] = ent
+    return ent
+
+
+def get_entitlement(vendor_id) -> Optional[Entitlement]:
+    """Snapshot for a vendor id from the shared cache; loads the vendor on a miss.
+
+    Returns None when the vendor does not exist.
+    """
+    now = timezone.now()
+    key = _cache_key(vendor_id)
+    ent = cache.get(key)
+    if isinstance(ent, Entitlement) and ent.is_fresh(now):
+        return ent
+    from .models import Vendor
+    vendor = Vendor.objects.only(*_VENDOR_FIELDS).filter(pk=vendor_id).first()
+    if vendor is None:
+        return None
+    ent = Entitlement.from_vendor(vendor, now)
+    cache.set(key, ent, timeout=max(1, int((ent.valid_until - now).total_seconds())))
+    return ent
+
+
+def invalidate_entitlements(vendor_ids: Iterable) -> None:
+    cache.delete_many([_cache_key(pk) for pk in vendor_ids])
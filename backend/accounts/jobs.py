@@ -0,0 +1,77 @@
+"""Scheduled vendor account jobs (see ``api.scheduler``).
+
+Each expiry reads the due vendor ids and then runs a single UPDATE. Because
+``QuerySet.update`` skips ``Vendor.save``, the ids are passed to
+``invalidate_entitlements``. The matching deadline callback returns the
+earliest row the job would touch so the scheduler wakes right when it is due.
+"""
+from datetime import datetime
+from typing import Optional
+
+from django.db.models import Min
+from django.utils import timezone
+
+from accounts.entitlements import invalidate_entitlements
+from accounts.mail_queue import deliver_queued_email, next_email_due
+from accounts.models import Vendor
+from api.scheduler import job
+
+
+def _active_trials():
+    return Vendor.objects.filter(is_trial=True, trial_expires_at__isnull=False, is_service_active=True)
+
+
+# Same scope as the expire_licenses command: trials and undated plans are not touched
+PAID_PLANS = ("monthly", "yearly")
+
+
+def _active_plans():
+    return Vendor.objects.filter(is_trial=False, plan__in=PAID_PLANS, plan_expires_at__isnull=False, is_service_active=True)
+
+
+def _deactivate(due) -> int:
+    pks = list(due.values_list("pk", flat=True))
+    if not pks:
+        return 0
+    # ``due`` is re-applied, so a vendor renewed in between is left alone
+    count = due.filter(pk__in=pks).update(is_service_active=False)
+    invalidate_entitlements(pks)
+    return count
+
+
+def next_trial_expiry() -> Optional[datetime]:
+    return _active_trials().aggregate(due=Min("trial_expires_at"))["due"]
+
+
+def next_plan_expiry() -> Optional[datetime]:
+    return _active_plans().aggregate(due=Min("plan_expires_at"))["due"]
+
+
+@job("expire_trials", interval=3600, deadline=next_trial_expiry)
+def expire_trials() -> int:
+    """Disable service for vendors whose trial has ended."""
+    return _deactivate(_active_trials().filter(trial_expires_at__lt=timezone.now()))
+
+
+@job("expire_plans", interval=3600, deadline=next_plan_expiry)
+def expire_plans() -> int:
+    """Disable service for paid vendors whose plan_expires_at has passed; the plan itself is kept."""
+    return _deactivate(_active_plans().filter(plan_expires_at__lt=timezone.now()))
+
+
+@job("send_account_notices", interval=3600)
+def send_account_notices() -> int:
+    from accounts.notices import send_account_notices as run_notices
+    return sum(run_notices().values())
+
+
+@job("deliver_emails", interval=60, deadline=next_email_due)
+def deliver_emails() -> int:
+    """Drain the outbound email queue, a bounded number of batches per run."""
+    total = 0
+    for _ in range(10):
+        sent = deliver_queued_email()
+        total += sent
+        if not sent:
+            break
+    return total
@@ -0,0 +1,136 @@
+"""DB-backed outbound email queue.
+
+Request handlers and signals call ``enqueue_email`` (one INSERT) instead of
+talking to SMTP. The ``deliver_emails`` scheduler job drains due rows in
+batches over a single reused connection of ``EMAIL_BACKEND``, so the console,
+file-based and locmem backends work as local stand-ins. Failed sends retry
+with exponential backoff until ``EMAIL_QUEUE_MAX_ATTEMPTS`` is reached.
+
+Production therefore needs a running scheduler: the ``scheduler`` worker in
+``.do/app.yaml``, the Procfile ``worker`` process, or the compose
+``scheduler`` service.
+"""
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Min
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def _default_from() -> str:
+    return getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@example.com')
+
+
+def _recipients(to) -> List[str]:
+    if isinstance(to, str):
+        to = [to]
+    return [str(addr) for addr in (to or []) if addr]
+
+
+def enqueue_email(subject: str, body: str, to, from_email: Optional[str] = None) -> Optional[OutboundEmail]:
+    """Queue one email for delivery. Returns None when there is no recipient."""
+    recipients = _recipients(to)
+    if not recipients:
+        return None
+    return OutboundEmail.objects.create(
+        subject=subject[:255], body=body, to=recipients, from_email=from_email or _default_from()
+    )
+
+
+def enqueue_many(messages: Iterable[Tuple[str, str, str]]) -> int:
+    """Queue ``(subject, body, to)`` tuples with one bulk INSERT."""
+    from_email = _default_from()
+    rows = [
+        OutboundEmail(subject=subject[:255], body=body, to=_recipients(to), from_email=from_email)
+        for subject, body, to in messages
+        if _recipients(to)
+    ]
+    OutboundEmail.objects.bulk_create(rows)
+    return len(rows)
+
+
+def next_email_due() -> Optional[datetime]:
+    return OutboundEmail.objects.filter(status=OutboundEmail.PENDING).aggregate(due=Min('next_attempt_at'))['due']
+
+
+def _backoff_seconds(attempts: int) -> int:
+    base = int(getattr(settings, 'EMAIL_QUEUE_RETRY_BASE_SECONDS', 30) or 30)
+    cap = int(getattr(settings, 'EMAIL_QUEUE_RETRY_MAX_SECONDS', 3600) or 3600)
+    return min(cap, base * (2 ** max(0, attempts - 1)))
+
+
+def _claim(batch_size: int, now: datetime) -> List[OutboundEmail]:
+    """Lease a batch of due rows in a short transaction and count the attempt.
+
+    A claimed row stays pending with ``next_attempt_at`` pushed out by
+    ``EMAIL_QUEUE_LEASE_SECONDS``. Other workers skip it, and if this worker
+    dies before recording a result the row becomes due again when the lease ends.
+    """
+    lease = int(getattr(settings, 'EMAIL_QUEUE_LEASE_SECONDS', 1200) or 1200)
+    with transaction.atomic():
+        # skip_locked lets several workers claim disjoint batches
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'pk')[:batch_size]
+        )
+        if batch:
+            OutboundEmail.objects.filter(pk__in=[row.pk for row in batch]).update(
+                attempts=F('attempts') + 1, next_attempt_at=now + timezone.timedelta(seconds=lease)
+            )
+    for row in batch:
+        row.attempts += 1
+    return batch
+
+
+def deliver_queued_email(batch_size: Optional[int] = None, connection=None) -> int:
+    """Send one batch of due emails; returns how many were delivered.
+
+    No database transaction or row lock is held while talking to SMTP.
+    """
+    batch_size = int(batch_size or getattr(settings, 'EMAIL_QUEUE_BATCH_SIZE', 100) or 100)
+    max_attempts = int(getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 6) or 6)
+    now = timezone.now()
+    batch: Sequence[OutboundEmail] = _claim(batch_size, now)
+    if not batch:
+        return 0
+    sent = 0
+    conn = connection or get_connection(fail_silently=False)
+    try:
+        conn.open()
+    except Exception as e:
+        logger.warning("Email backend unavailable: %s", e)
+        conn = None
+    for row in batch:
+        try:
+            if conn is None:
+                raise ConnectionError("email backend unavailable")
+            message = EmailMessage(row.subject, row.body, row.from_email or _default_from(), list(row.to), connection=conn)
+            conn.send_messages([message])
+        except Exception as e:
+            row.last_error = str(e)[:2000]
+            if row.attempts >= max_attempts:
+                row.status = OutboundEmail.FAILED
+                logger.error("Giving up on email %s after %s attempts: %s", row.pk, row.attempts, e)
+            else:
+                row.next_attempt_at = now + timezone.timedelta(seconds=_backoff_seconds(row.attempts))
+        else:
+            row.status = OutboundEmail.SENT
+            row.sent_at = timezone.now()
+            row.last_error = ''
+            sent += 1
+    if conn is not None and connection is None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+    OutboundEmail.objects.bulk_update(batch, ['status', 'next_attempt_at', 'last_error', 'sent_at'])
+    return sent
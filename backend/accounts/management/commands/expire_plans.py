@@ -1,17 +1,9 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from accounts.models import Vendor
+from accounts.jobs import expire_plans
 
 class Command(BaseCommand):
-    help = 'Expire vendor plans that have passed their plan_expires_at and set is_service_active=False'
+    help = 'Set is_service_active=False for monthly/yearly vendors past their plan_expires_at'
 
     def handle(self, *args, **options):
-        now = timezone.now()
-        qs = Vendor.objects.filter(plan_expires_at__isnull=False, plan_expires_at__lt=now, is_service_active=True)
-        count = 0
-        for v in qs:
-            v.is_service_active = False
-            v.plan = 'none'
-            v.save(update_fields=['is_service_active','plan'])
-            count += 1
+        count = expire_plans()
         self.stdout.write(self.style.SUCCESS(f'Expired {count} vendor plans'))
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from typing import Any, cast
 from django.conf import settings
@@ -171,41 +172,122 @@ class Vendor(AbstractBaseUser, PermissionsMixin):
         # Paid plans or unspecified -> unlimited
         return -1
 
+    def daily_limit_message(self) -> str:
+        return f"{self.name} can't take any more orders for today, check back tomorrow!"
+
+    def orders_used_today(self) -> int:
+        """Today's order count, treating a counter from a previous day as zero."""
+        from django.utils import timezone
+        if self.daily_orders_date != timezone.now().date():
+            return 0
+        return self.daily_orders_count
+
     def can_accept_order(self) -> tuple[bool, str]:
-        """Check if vendor can accept a new order based on daily limits."""
+        """Check if vendor can accept a new order based on daily limits.
+
+        Does not take quota (``consume_daily_order`` does), but a counter left
+        over from a previous day is reset to zero in the row and on ``self``.
+        Use ``orders_used_today`` for a check without any write.
+        """
         from django.utils import timezone
-        
+
         # Paid plans have unlimited orders
         if not self.is_on_free_plan():
             return True, ""
-        
+
         today = timezone.now().date()
-        
-        # Reset counter if it's a new day
+
+        # Roll a stale counter over; the date filter makes this a no-op when
+        # another request already did it
         if self.daily_orders_date != today:
+            type(self).objects.filter(pk=self.pk).exclude(daily_orders_date=today).update(
+                daily_orders_count=0, daily_orders_date=today
+            )
             self.daily_orders_count = 0
             self.daily_orders_date = today
-            self.save(update_fields=['daily_orders_count', 'daily_orders_date'])
-        
+
         limit = self.get_daily_order_limit()
-        if self.daily_orders_count >= limit:
-            return False, f"{self.name} can't take any more orders for today, check back tomorrow!"
-        
+        if limit >= 0 and self.daily_orders_count >= limit:
+            return False, self.daily_limit_message()
+
         return True, ""
 
+    def consume_daily_order(self) -> int | None:
+        """Atomically check and take one order from today's quota.
+
+        Returns the remaining capacity after this order (-1 when unlimited), or
+        None when the limit is already reached. The check, the day rollover and
+        the increment happen in one conditional UPDATE, so concurrent accepts
+        cannot overshoot the limit.
+        """
+        if not self.is_on_free_plan():
+            return -1
+        limit = self.get_daily_order_limit()
+        if limit < 0:
+            return -1
+        count = _consume_quota(self.pk, limit)
+        if count is None:
+            return None
+        self.daily_orders_count = count
+        self.daily_orders_date = timezone.now().date()
+        return max(0, limit - count)
+
     def increment_daily_orders(self):
-        """Increment daily order count."""
-        from django.utils import timezone
-        
-        today = timezone.now().date()
-        
-        # Reset counter if it's a new day
-        if self.daily_orders_date != today:
-            self.daily_orders_count = 0
-            self.daily_orders_date = today
-        
-        self.daily_orders_count += 1
-        self.save(update_fields=['daily_orders_count', 'daily_orders_date'])
+        """Increment daily order count without checking the limit."""
+        count = _consume_quota(self.pk, None)
+        if count is not None:
+            self.daily_orders_count = count
+            self.daily_orders_date = timezone.now().date()
+
+
+def _consume_quota(vendor_id, limit: int | None) -> int | None:
+    """Increment a vendor's daily counter in one statement and return the new count.
+
+    The counter restarts at 1 when the stored date is not today. With a
+    ``limit`` the row only matches while today's count is below it; no match
+    returns None.
+    """
+    from django.db import connection, transaction
+
+    today = timezone.now().date()
+    if _update_returning_supported(connection):
+        qn = connection.ops.quote_name
+        table = qn(Vendor._meta.db_table)
+        count_col, date_col, pk_col = qn('daily_orders_count'), qn('daily_orders_date'), qn(Vendor._meta.pk.column)
+        sql = (
+            f"UPDATE {table} SET {count_col} = CASE WHEN {date_col} = %s THEN {count_col} + 1 ELSE 1 END, "
+            f"{date_col} = %s WHERE {pk_col} = %s"
+        )
+        params: list = [today, today, vendor_id]
+        if limit is not None:
+            sql += f" AND ({date_col} IS NULL OR {date_col} <> %s OR {count_col} < %s)"
+            params += [today, limit]
+        sql += f" RETURNING {count_col}"
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        return int(row[0]) if row else None
+
+    # Other backends: the conditional UPDATE is still atomic and keeps the row
+    # locked until commit, so reading it back in the same transaction is exact
+    match = Q(pk=vendor_id)
+    if limit is not None:
+        match &= Q(daily_orders_date__isnull=True) | ~Q(daily_orders_date=today) | Q(daily_orders_count__lt=limit)
+    new_count = Case(When(daily_orders_date=today, then=F('daily_orders_count') + 1), default=Value(1))
+    with transaction.atomic():
+        if not Vendor.objects.filter(match).update(daily_orders_count=new_count, daily_orders_date=today):
+            return None
+        return Vendor.objects.filter(pk=vendor_id).values_list('daily_orders_count', flat=True).first()
+
+
+def _update_returning_supported(connection) -> bool:
+    """``UPDATE ... RETURNING``: PostgreSQL, and SQLite from 3.35 (not MySQL/MariaDB/Oracle)."""
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
 
 class NotificationLog(models.Model):
     KIND_CHOICES = [
@@ -314,4 +396,34 @@ class GlobalPaymentDestination(models.Model):
         ordering = ["-is_active", "-created_at"]
 
     def __str__(self) -> str:
-        return f"{self.name} ({self.kind})"
\ No newline at end of file
+        return f"{self.name} ({self.kind})"
+
+class OutboundEmail(models.Model):
+    """Queued outbound email, delivered by the ``deliver_emails`` scheduler job."""
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbound_email_due_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"OutboundEmail:{self.pk}:{self.status}:{self.subject}"
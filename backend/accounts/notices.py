@@ -0,0 +1,101 @@
+"""Trial and plan expiry notices, processed as sets rather than per vendor.
+
+For each notice kind, one query selects the vendors that match the kind's
+window and have no ``NotificationLog`` row yet (a NOT EXISTS anti-join). The
+vendors are walked in primary-key chunks. Each chunk's emails are queued
+(``accounts.mail_queue``) and its log rows written with
+``bulk_create(ignore_conflicts=True)`` in one transaction. The log rows are
+the checkpoint: an interrupted run resumes with the first chunk that was not
+logged, and no notice is queued twice.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.utils import timezone
+
+from .emails import plan_expiring_message, trial_ending_message, trial_expired_message
+from .mail_queue import enqueue_many
+from .models import NotificationLog, Vendor
+
+NOTICE_WINDOW_DAYS = 3
+DEFAULT_CHUNK_SIZE = 500
+
+_PAID_PLANS = ['monthly', 'yearly']
+
+
+def _days_left(expires_at: Optional[datetime], now: datetime) -> int:
+    days_left = (expires_at - now).days if expires_at else NOTICE_WINDOW_DAYS
+    return max(days_left, 1)
+
+
+@dataclass(frozen=True)
+class NoticeKind:
+    kind: str
+    # Q matching vendors due this notice, given (now, soon)
+    due: Callable[[datetime, datetime], Q]
+    # (subject, body) for a vendor, or None when the notice is log-only
+    message: Optional[Callable[[Vendor, datetime], Tuple[str, str]]]
+
+
+NOTICE_KINDS = [
+    NoticeKind(
+        'trial_ending',
+        lambda now, soon: Q(is_trial=True, trial_expires_at__range=(now, soon)),
+        lambda v, now: trial_ending_message(v, _days_left(v.trial_expires_at, now)),
+    ),
+    NoticeKind(
+        'trial_expired',
+        lambda now, soon: Q(is_trial=True, trial_expires_at__lt=now),
+        lambda v, now: trial_expired_message(v),
+    ),
+    NoticeKind(
+        'plan_ending',
+        lambda now, soon: Q(is_trial=False, plan__in=_PAID_PLANS, plan_expires_at__range=(now, soon)),
+        lambda v, now: plan_expiring_message(v, _days_left(v.plan_expires_at, now)),
+    ),
+    NoticeKind(
+        'plan_expired',
+        lambda now, soon: Q(is_trial=False, plan__in=_PAID_PLANS, plan_expires_at__lt=now),
+        None,
+    ),
+]
+
+
+def pending_vendors(notice: NoticeKind, now: datetime) -> QuerySet:
+    """Vendors due ``notice`` that have not been sent it yet, in primary-key order."""
+    soon = now + timezone.timedelta(days=NOTICE_WINDOW_DAYS)
+    already_sent = NotificationLog.objects.filter(vendor=OuterRef('pk'), kind=notice.kind)
+    return (
+        Vendor.objects.filter(notice.due(now, soon))
+        .filter(~Exists(already_sent))
+        .only('id', 'email', 'name', 'plan', 'trial_expires_at', 'plan_expires_at')
+        .order_by('pk')
+    )
+
+
+def send_account_notices(now: Optional[datetime] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, int]:
+    """Queue every outstanding notice; returns the number processed per kind."""
+    now = now or timezone.now()
+    chunk_size = max(1, int(chunk_size))
+    counts: Dict[str, int] = {}
+    for notice in NOTICE_KINDS:
+        counts[notice.kind] = 0
+        qs = pending_vendors(notice, now)
+        last_pk = 0
+        while True:
+            chunk = list(qs.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            with transaction.atomic():
+                if notice.message is not None:
+                    enqueue_many((*notice.message(v, now), v.email) for v in chunk)
+                NotificationLog.objects.bulk_create(
+                    [NotificationLog(vendor_id=v.pk, kind=notice.kind) for v in chunk],
+                    ignore_conflicts=True,
+                )
+            counts[notice.kind] += len(chunk)
+            last_pk = chunk[-1].pk
+    return counts
@@ -0,0 +1,67 @@
+"""Set-based approval of vendor payment requests.
+
+Approving a batch is two UPDATEs (payment requests, then vendors) in one
+transaction, after one locking read that collects the affected rows. Row
+saves are skipped on purpose: they would fire ``push_payment_event`` once per
+request. Instead, after commit, each affected vendor gets a single batched
+channel-layer event, and its cached entitlement is dropped.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .entitlements import invalidate_entitlements
+from .models import PaymentRequest, Vendor
+
+
+def approve_payment_requests(queryset: QuerySet, processed_by, duration_days: Optional[int]) -> Tuple[int, Set[int]]:
+    """Approve every not-yet-approved request in ``queryset`` and activate its vendor.
+
+    With ``duration_days`` vendors get a monthly plan expiring after that many
+    days; without it the activation is perpetual. Returns the number of
+    requests approved and the ids of the vendors activated.
+    """
+    now = timezone.now()
+    if duration_days:
+        plan, plan_expires_at = 'monthly', now + timezone.timedelta(days=duration_days)
+    else:
+        plan, plan_expires_at = 'perpetual', None
+
+    with transaction.atomic():
+        rows = list(
+            PaymentRequest.objects.select_for_update()
+            .filter(pk__in=queryset.values('pk'))
+            .exclude(status='approved')
+            .values_list('pk', 'vendor_id', 'created_at')
+        )
+        if not rows:
+            return 0, set()
+        ids = [pk for pk, _, _ in rows]
+        vendor_ids = {vendor_id for _, vendor_id, _ in rows}
+        PaymentRequest.objects.filter(pk__in=ids).update(
+            status='approved', processed_at=now, processed_by=processed_by
+        )
+        Vendor.objects.filter(pk__in=vendor_ids).update(
+            is_service_active=True, is_trial=False, plan=plan, plan_expires_at=plan_expires_at
+        )
+
+        events: Dict[int, List[dict]] = defaultdict(list)
+        for pk, vendor_id, created_at in rows:
+            events[vendor_id].append({
+                'id': pk,
+                'status': 'approved',
+                'created_at': created_at.isoformat() if created_at else None,
+                'processed_at': now.isoformat(),
+            })
+        transaction.on_commit(lambda: _after_approval(events))
+    return len(ids), vendor_ids
+
+
+def _after_approval(events: Dict[int, List[dict]]) -> None:
+    from .signals import publish_payment_events
+    invalidate_entitlements(events.keys())
+    for vendor_id, vendor_events in events.items():
+        publish_payment_events(vendor_id, vendor_events)
@@ -1,9 +1,17 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.conf import settings
-from django.core.mail import send_mail
-from .models import PaymentRequest
-import json
+from django.db import transaction
+from .entitlements import invalidate_entitlements
+from .mail_queue import enqueue_email
+from .models import BankDetail, BroadcastMessage, PaymentRequest, Vendor
+
+
+@receiver(post_save, sender=Vendor)
+@receiver(post_delete, sender=Vendor)
+def drop_vendor_entitlement(sender, instance: Vendor, **kwargs):
+    instance.__dict__.pop('_entitlement', None)
+    invalidate_entitlements([instance.pk])
 
 
 @receiver(post_save, sender=PaymentRequest)
@@ -15,58 +23,51 @@ def notify_admin_on_payment_request(sender, instance: PaymentRequest, created, *
         return
     subject = f"New payment request from {getattr(instance, 'vendor', getattr(instance, 'vendor_email', 'unknown'))}"
     body = f"A new payment request (id: {getattr(instance, 'pk', None)}) was created by {getattr(instance, 'vendor', getattr(instance, 'vendor_email', 'unknown'))}.\n\nNote: {getattr(instance, 'note', '') or ''}\n\nPlease review and approve: {getattr(settings, 'SITE_URL', '')}/admin/accounts/paymentrequest/{getattr(instance, 'pk', None)}/change/"
-    send_mail(subject, body, getattr(settings, 'DEFAULT_FROM_EMAIL', admin_email), [admin_email], fail_silently=True)
+    enqueue_email(subject, body, [admin_email], from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', admin_email))
 
 
-# --- In-memory event store for SSE (single-process dev) ---
-_EVENT_STORE = {}
-
+def payment_event(pr) -> dict:
+    created_at = getattr(pr, 'created_at', None)
+    processed_at = getattr(pr, 'processed_at', None)
+    return {
+        'id': getattr(pr, 'id', None),
+        'status': getattr(pr, 'status', None),
+        'created_at': created_at.isoformat() if created_at else None,
+        'processed_at': processed_at.isoformat() if processed_at else None,
+    }
 
-def push_event(vendor_id: int, event: dict):
-    key = str(vendor_id)
-    _EVENT_STORE.setdefault(key, []).append(event)
 
+def publish_payment_events(vendor_id: int, events: list):
+    """Publish a vendor's payment request changes to the event bus in one batch.
 
-def pop_events(vendor_id: int):
-    key = str(vendor_id)
-    items = _EVENT_STORE.pop(key, [])
-    return items
+    The bus stores them for Last-Event-ID replay and sends a single live
+    message to the vendor's channel-layer group (WebSocket and SSE streams).
+    """
+    if not events:
+        return
+    from api.events import PAYMENT_REQUEST_CHANGED, publish_events
+    publish_events(vendor_id, [(PAYMENT_REQUEST_CHANGED, ev) for ev in events])
 
 
 @receiver(post_save, sender=PaymentRequest)
 def push_payment_event(sender, instance: PaymentRequest, created, **kwargs):
-    # Publish PaymentRequest change to the in-memory event store for SSE
-    created_at = getattr(instance, 'created_at', None)
-    processed_at = getattr(instance, 'processed_at', None)
-    ev = {
-        'id': getattr(instance, 'id', None),
-        'status': getattr(instance, 'status', None),
-        'created_at': created_at.isoformat() if created_at else None,
-        'processed_at': processed_at.isoformat() if processed_at else None,
-    }
+    # Publish once the change is committed so subscribers never see rolled-back rows
     vendor_id = getattr(instance, 'vendor_id', None)
     if vendor_id is None:
         return
-    # Try to broadcast over Channels channel layer if available
-    try:
-        from asgiref.sync import async_to_sync
-        from channels.layers import get_channel_layer
-        channel_layer = get_channel_layer()
-        if channel_layer is not None:
-            group_name = f"payment_requests_{vendor_id}"
-            async_to_sync(channel_layer.group_send)(
-                group_name,
-                {
-                    'type': 'payment_request_event',
-                    'data': ev,
-                }
-            )
-            return
-    except Exception:
-        # Fall back to in-memory store if channels are not available
-        pass
+    ev = payment_event(instance)
+    transaction.on_commit(lambda: publish_payment_events(vendor_id, [ev]))
+
+
+@receiver(post_save, sender=BroadcastMessage)
+@receiver(post_delete, sender=BroadcastMessage)
+def bump_broadcast_version(sender, instance, **kwargs):
+    from api.change_versions import BROADCASTS, bump_on_commit
+    bump_on_commit(instance.vendor_id, BROADCASTS)
+
 
-    try:
-        push_event(vendor_id, ev)
-    except Exception:
-        pass
+@receiver(post_save, sender=BankDetail)
+@receiver(post_delete, sender=BankDetail)
+def bump_bank_detail_version(sender, instance, **kwargs):
+    from api.change_versions import BANK_DETAILS, bump_on_commit
+    bump_on_commit(instance.vendor_id, BANK_DETAILS)
@@ -1,23 +1,181 @@
-import time
+"""Server-Sent Events stream of a vendor's payment request changes.
+
+The view is async: it joins the vendor's event bus group (``api.events``) on
+the channel layer and awaits messages, so an open stream holds no worker
+thread. Every change carries its bus offset as the SSE ``id``; a reconnecting
+client's ``Last-Event-ID`` is replayed from the bus, and when the offset has
+fallen out of retention the client gets a fresh snapshot instead. Heartbeat
+comments go out on a fixed cadence, each connection is closed after
+``PAYMENT_STREAM_MAX_SECONDS`` (EventSource reconnects on its own), and the
+number of open streams is reported as the ``payment_stream_connections_open``
+metric.
+
+Under WSGI an async iterator would be collected into a list before anything
+is sent, so there the view returns a plain generator instead. It polls the
+event bus every ``PAYMENT_STREAM_POLL_SECONDS`` and holds a worker thread for
+the life of the stream.
+"""
+import asyncio
 import json
-from django.http import StreamingHttpResponse, HttpResponseForbidden
-from django.contrib.auth.decorators import login_required
+import time
+
 from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+
+from api import metrics
+from api.events import PAYMENT_REQUEST_CHANGED, get_event_bus, parse_event_id, vendor_group
+from vendora.db_router import use_replica
 from .models import PaymentRequest
 
+OPEN_CONNECTIONS_METRIC = 'payment_stream_connections_open'
+
+
+def _sse(data, event_id=None) -> bytes:
+    prefix = f"id: {event_id}\n" if event_id else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n".encode('utf-8')
+
+
+def _stream_limits():
+    heartbeat = float(getattr(settings, 'PAYMENT_STREAM_HEARTBEAT_SECONDS', 15) or 15)
+    lifetime = float(getattr(settings, 'PAYMENT_STREAM_MAX_SECONDS', 300) or 300)
+    return heartbeat, lifetime
+
+
+def _latest_requests(vendor_id, limit=5):
+    out = []
+    with use_replica(vendor_id):
+        for p in PaymentRequest.objects.filter(vendor_id=vendor_id).order_by('-created_at')[:limit]:
+            out.append({
+                'id': p.id,
+                'status': p.status,
+                'created_at': p.created_at.isoformat() if p.created_at else None,
+                'processed_at': p.processed_at.isoformat() if p.processed_at else None,
+            })
+    return out
+
+
+def _payment_events(events, after=None):
+    """(offset, payload) for payment request changes in bus events newer than ``after``."""
+    return [
+        (ev['id'], ev['data']) for ev in events
+        if ev.get('type') == PAYMENT_REQUEST_CHANGED and (after is None or parse_event_id(ev['id']) > after)
+    ]
+
+
+async def _event_stream(vendor_id, last_event_id=None):
+    from asgiref.sync import sync_to_async
+    from channels.layers import get_channel_layer
+
+    heartbeat, lifetime = _stream_limits()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + lifetime
+    next_beat = loop.time() + heartbeat
+    layer = get_channel_layer()
+    bus = get_event_bus()
+    group = vendor_group(vendor_id)
+    channel = None
+    metrics.inc(OPEN_CONNECTIONS_METRIC)
+    metrics.inc('payment_stream_connections_total')
+    try:
+        if layer is not None:
+            # Subscribe before reading offsets so nothing falls between the two
+            channel = await layer.new_channel()
+            await layer.group_add(group, channel)
+        yield b'retry: 2000\n\n'
+
+        # ``cursor`` is the newest offset sent; live messages at or before it were replayed
+        cursor = None
+        missed, complete = await sync_to_async(bus.replay)(vendor_id, last_event_id)
+        if last_event_id and complete:
+            cursor = parse_event_id(last_event_id)
+            for event_id, data in _payment_events([ev.as_dict() for ev in missed]):
+                yield _sse(data, event_id)
+            if missed:
+                cursor = parse_event_id(missed[-1].id)
+        else:
+            # Fresh connection or a gap beyond retention: snapshot, tagged with the current offset
+            offset = await sync_to_async(bus.latest_id)(vendor_id)
+            cursor = parse_event_id(offset) if offset else None
+            yield _sse(await sync_to_async(_latest_requests)(vendor_id), offset)
+
+        while True:
+            now = loop.time()
+            if now >= deadline:
+                break
+            if now >= next_beat:
+                yield b': keep-alive\n\n'
+                next_beat += heartbeat
+                continue
+            timeout = min(next_beat, deadline) - now
+            if layer is None:
+                # No channel layer configured: re-send the snapshot once per heartbeat
+                await asyncio.sleep(timeout)
+                if loop.time() >= next_beat:
+                    yield _sse(await sync_to_async(_latest_requests)(vendor_id))
+                    next_beat += heartbeat
+                continue
+            try:
+                message = await asyncio.wait_for(layer.receive(channel), timeout)
+            except asyncio.TimeoutError:
+                continue
+            for event_id, data in _payment_events(message.get('events') or [], cursor):
+                cursor = parse_event_id(event_id)
+                yield _sse(data, event_id)
+    finally:
+        metrics.inc(OPEN_CONNECTIONS_METRIC, -1)
+        if channel is not None:
+            try:
+                await layer.group_discard(group, channel)
+            except Exception:
+                pass
+
 
-def _get_redis_client():
+def _polling_stream(vendor_id, last_event_id=None):
+    """WSGI variant of ``_event_stream``: reads the bus on a timer instead of awaiting the channel layer."""
+    from vendora.db_pool import release_connections
+
+    heartbeat, lifetime = _stream_limits()
+    poll = float(getattr(settings, 'PAYMENT_STREAM_POLL_SECONDS', 2) or 2)
+    bus = get_event_bus()
+    deadline = time.monotonic() + lifetime
+    next_beat = time.monotonic() + heartbeat
+    metrics.inc(OPEN_CONNECTIONS_METRIC)
+    metrics.inc('payment_stream_connections_total')
     try:
-        import redis
-    except Exception:
-        return None
-    url = getattr(settings, 'REDIS_URL', 'redis://localhost:6379/0')
-    return redis.from_url(url, decode_responses=True)
+        yield b'retry: 2000\n\n'
+        missed, complete = bus.replay(vendor_id, last_event_id)
+        if last_event_id and complete:
+            cursor = missed[-1].id if missed else last_event_id
+            for event_id, data in _payment_events([ev.as_dict() for ev in missed]):
+                yield _sse(data, event_id)
+        else:
+            cursor = bus.latest_id(vendor_id)
+            yield _sse(_latest_requests(vendor_id), cursor)
+
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now >= next_beat:
+                yield b': keep-alive\n\n'
+                next_beat += heartbeat
+                continue
+            release_connections()
+            time.sleep(max(0.0, min(now + poll, next_beat, deadline) - now))
+            events = bus.read(vendor_id, after=cursor)
+            if events:
+                cursor = events[-1].id
+            for event_id, data in _payment_events([ev.as_dict() for ev in events]):
+                yield _sse(data, event_id)
+    finally:
+        metrics.inc(OPEN_CONNECTIONS_METRIC, -1)
 
 
 @login_required
-def payment_request_stream(request):
-    user = request.user
+async def payment_request_stream(request):
+    user = await request.auser()
     # If admin, allow vendor_id param
     vendor_id = request.GET.get('vendor_id') if (user.is_staff or user.is_superuser) else None
     if vendor_id:
@@ -28,64 +186,12 @@ def payment_request_stream(request):
     else:
         vendor_id = getattr(user, 'id', None)
 
-    redis_client = _get_redis_client()
-
-    def event_stream():
-        # SSE prelude
-        yield b'retry: 2000\n\n'
-
-        if redis_client:
-            # Subscribe to vendor-specific channel
-            channel = f"payment_requests:{vendor_id}"
-            try:
-                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
-                pubsub.subscribe(channel)
-                # Use a loop with timeout to yield messages
-                while True:
-                    message = pubsub.get_message(timeout=1.0)
-                    if message and message.get('type') == 'message':
-                        data = message.get('data')
-                        if data is None:
-                            # nothing to send
-                            continue
-                        # Ensure we have a string
-                        if not isinstance(data, str):
-                            data = str(data)
-                        # Data is expected to be JSON string; escape newlines
-                        # Escape newlines outside the f-string expression to avoid backslash in f-string expression context
-                        escaped = data.replace('\n', '\\n')
-                        yield f"data: {escaped}\n\n".encode('utf-8')
-                    else:
-                        # Keep the connection alive with a noop comment line
-                        yield b':\n'
-                        time.sleep(0.1)
-            except GeneratorExit:
-                try:
-                    pubsub.close()
-                except Exception:
-                    pass
-            except Exception:
-                # fallthrough to polling fallback below
-                pass
-
-        # Fallback polling: send latest payment requests every 2s
-        while True:
-            try:
-                latest = PaymentRequest.objects.filter(vendor_id=vendor_id).order_by('-created_at')[:5]
-                list_out = [
-                    {
-                        'id': getattr(p, 'id', None),
-                        'status': getattr(p, 'status', None),
-                        'created_at': p.created_at.isoformat() if getattr(p, 'created_at', None) is not None else None,
-                        'processed_at': p.processed_at.isoformat() if p.processed_at is not None else None,
-                    }
-                    for p in latest
-                ]
-                if list_out:
-                    yield ('data: ' + json.dumps(list_out) + '\n\n').encode('utf-8')
-            except Exception:
-                # ignore DB errors and keep trying
-                pass
-            time.sleep(2)
-
-    return StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    if isinstance(request, ASGIRequest):
+        stream = _event_stream(vendor_id, last_event_id)
+    else:
+        stream = _polling_stream(vendor_id, last_event_id)
+    resp = StreamingHttpResponse(stream, content_type='text/event-stream')
+    resp['Cache-Control'] = 'no-cache'
+    resp['X-Accel-Buffering'] = 'no'
+    return resp
@@ -36,3 +36,54 @@ class VendorLimitsTest(TestCase):
         # After can_accept a reset should have occurred
         v.refresh_from_db()
         self.assertEqual(v.daily_orders_count, 0)
+
+    def test_consume_daily_order_is_atomic_and_reports_remaining(self):
+        v = Vendor.objects.create_user(email='vtest3@example.com', password='pw', name='V Test3')
+        Vendor.objects.filter(pk=v.pk).update(
+            is_trial=False, plan='none', daily_order_limit=3,
+            daily_orders_count=5, daily_orders_date=(timezone.now() - timezone.timedelta(days=1)).date(),
+        )
+        v.refresh_from_db()
+        # Two stale copies of the row, as two concurrent requests would hold
+        other = Vendor.objects.get(pk=v.pk)
+
+        self.assertEqual(v.consume_daily_order(), 2)  # rolled over to today
+        self.assertEqual(other.consume_daily_order(), 1)
+        self.assertEqual(v.consume_daily_order(), 0)
+        self.assertIsNone(other.consume_daily_order())
+        v.refresh_from_db()
+        self.assertEqual((v.daily_orders_count, v.daily_orders_date), (3, timezone.now().date()))
+
+    def test_consume_daily_order_unlimited_for_paid_plans(self):
+        v = Vendor.objects.create_user(email='vtest4@example.com', password='pw', name='V Test4')
+        Vendor.objects.filter(pk=v.pk).update(is_trial=False, plan='monthly', is_service_active=True)
+        v.refresh_from_db()
+        self.assertEqual(v.consume_daily_order(), -1)
+        v.refresh_from_db()
+        self.assertEqual(v.daily_orders_count, 0)
+
+    def test_consume_daily_order_without_update_returning(self):
+        from unittest import mock
+        from accounts import models as account_models
+
+        v = Vendor.objects.create_user(email='vtest5@example.com', password='pw', name='V Test5')
+        Vendor.objects.filter(pk=v.pk).update(is_trial=False, plan='none', daily_order_limit=2)
+        v.refresh_from_db()
+        # MySQL/MariaDB/Oracle path: conditional UPDATE, then re-read in the same transaction
+        with mock.patch.object(account_models, '_update_returning_supported', return_value=False):
+            self.assertEqual(v.consume_daily_order(), 1)
+            self.assertEqual(v.consume_daily_order(), 0)
+            self.assertIsNone(v.consume_daily_order())
+
+    def test_failed_bot_order_creation_gives_the_quota_back(self):
+        from unittest import mock
+        from orders.models import Order
+        from api import bot_handlers
+
+        v = Vendor.objects.create_user(email='vtest6@example.com', password='pw', name='V Test6')
+        Vendor.objects.filter(pk=v.pk).update(is_trial=False, plan='none', daily_order_limit=5, is_service_active=True)
+        with mock.patch.object(Order.objects, 'create', side_effect=RuntimeError("db down")):
+            bot_handlers.handle_order_creation(f'confirm_BTC_buy_1_{v.pk}', chat_id='quota_chat')
+        v.refresh_from_db()
+        self.assertEqual(v.daily_orders_count, 0)
+        self.assertFalse(Order.objects.filter(vendor=v).exists())
@@ -12,6 +12,7 @@ from django import contrib
 from accounts import admin as accounts_admin
 from django.core import mail
 from django.test import override_settings
+from django.utils import timezone
 
 
 class PaymentRequestTests(TestCase):
@@ -96,6 +97,31 @@ class PaymentRequestTests(TestCase):
         self.assertIsNotNone(pr.processed_by)
         self.assertTrue(self.vendor.is_service_active)
 
+    def test_bulk_admin_approval_is_set_based_with_one_event_per_vendor(self):
+        from unittest import mock
+        other = Vendor.objects.create(email='other@example.com', password='pass', name='Other')
+        Vendor.objects.filter(pk__in=[self.vendor.pk, other.pk]).update(is_service_active=False)
+        for v in (self.vendor, self.vendor, other):
+            PaymentRequest.objects.create(vendor=v, status='pending')
+        PaymentRequest.objects.create(vendor=other, status='approved')
+        request = self.factory.post('/', {'duration_days': '10'})
+        request.user = self.staff
+        setattr(request, 'session', {})
+        setattr(request, '_messages', FallbackStorage(request))
+        admin_instance = accounts_admin.PaymentRequestAdmin(PaymentRequest, contrib.admin.site)
+
+        with mock.patch('accounts.signals.publish_payment_events') as publish:
+            # locking read + two UPDATEs (plus savepoint bookkeeping inside the test transaction)
+            with self.assertNumQueries(5), self.captureOnCommitCallbacks(execute=True):
+                admin_instance.approve_payments(request, PaymentRequest.objects.all())
+        self.assertEqual(PaymentRequest.objects.filter(status='approved').count(), 4)
+        published = {call.args[0]: len(call.args[1]) for call in publish.call_args_list}
+        self.assertEqual(published, {self.vendor.pk: 2, other.pk: 1})
+        other.refresh_from_db()
+        self.assertTrue(other.is_service_active)
+        self.assertEqual(other.plan, 'monthly')
+        self.assertEqual((other.plan_expires_at - timezone.now()).days, 9)
+
     def test_unauthenticated_cannot_create(self):
         # logout and attempt create
         self.client.force_authenticate(user=None)
@@ -156,5 +182,8 @@ class PaymentRequestTests(TestCase):
         # clear outbox
         mail.outbox = []
         PaymentRequest.objects.create(vendor=self.vendor, status='pending', note='payment')
-        # one email should be queued
+        # one email should be queued, and delivered by the queue worker
+        from accounts.mail_queue import deliver_queued_email
+        self.assertEqual(len(mail.outbox), 0)
+        deliver_queued_email()
         self.assertGreaterEqual(len(mail.outbox), 1)
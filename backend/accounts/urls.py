@@ -12,6 +12,7 @@ from .auth_views import (
     confirm_password_reset
 )
 from .dashboard import DashboardSummaryView
+from .analytics import AnalyticsView
 from accounts.models import Vendor
 
 app_name = "accounts"
@@ -43,10 +44,13 @@ urlpatterns = [
     path('vendors/<int:pk>/', VendorViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}), name='vendor_detail'),
     path('vendors/onboarding/', VendorViewSet.as_view({'get': 'onboarding'}), name='vendor_onboarding'),
     path('dashboard-summary/', DashboardSummaryView.as_view(), name='dashboard_summary'),
+    path('analytics/', AnalyticsView.as_view(), name='analytics'),
     # Convenience explicit route for broadcast send-to-bot (kebab-case)
     path('broadcast-messages/<int:pk>/send-to-bot/', BroadcastMessageViewSet.as_view({'post': 'send_to_bot'}), name='broadcast-send-to-bot'),
 
+    # Ahead of the router, whose payment-requests/<pk>/ route would otherwise capture it
+    path('payment-requests/stream/', payment_request_stream, name='payment_request_stream'),
+
     # Vendor endpoints
     path("", include(router.urls)),
-    path('payment-requests/stream/', payment_request_stream, name='payment_request_stream'),
 ]
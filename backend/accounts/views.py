@@ -91,6 +91,14 @@ class VendorViewSet(ModelViewSet):
         # PATCH
         serializer = self.get_serializer(user, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
+        avatar_key = request.data.get("avatar_key")
+        if avatar_key:
+            # Avatar already PUT to object storage via /uploads/presign/
+            from api.storage import UploadError, validate_uploaded_key
+            try:
+                user.avatar = validate_uploaded_key("avatar", avatar_key, user)
+            except UploadError as e:
+                return Response({"avatar_key": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
         serializer.save()
         return Response(serializer.data)
 
@@ -268,19 +276,15 @@ class DailyUsageView(APIView):
         from django.utils import timezone
         
         today = timezone.now().date()
-        
-        # Reset counter if it's a new day
-        if vendor.daily_orders_date != today:
-            vendor.daily_orders_count = 0
-            vendor.daily_orders_date = today
-            vendor.save(update_fields=['daily_orders_count', 'daily_orders_date'])
-        
+        # A counter from a previous day reads as zero; no write needed
+        used_today = vendor.orders_used_today()
+
         is_free_plan = vendor.is_on_free_plan()
         daily_order_limit = vendor.get_daily_order_limit()
-        orders_remaining = max(0, daily_order_limit - vendor.daily_orders_count) if daily_order_limit > 0 else -1
+        orders_remaining = max(0, daily_order_limit - used_today) if daily_order_limit > 0 else -1
         
         return Response({
-            "daily_orders_count": vendor.daily_orders_count,
+            "daily_orders_count": used_today,
             "daily_order_limit": daily_order_limit,
             "is_free_plan": is_free_plan,
             "orders_remaining": orders_remaining,
@@ -11,34 +11,26 @@ class JwtAuthMiddleware:
 
     The client should send the token in the WebSocket subprotocol as `jwt.<token>`.
     This avoids placing JWTs in the URL. For backwards compatibility the middleware
-    will also accept `access_token` in the query string if present.
+    will also accept `access_token` in the query string if present. Consumers
+    should accept the connection with ``jwt_subprotocol(scope)`` so browsers see
+    the offered subprotocol echoed back.
     """
 
     def __init__(self, inner):
         self.inner = inner
 
-    def __call__(self, scope):
-        return JwtAuthMiddlewareInstance(scope, self.inner)
-
-
-class JwtAuthMiddlewareInstance:
-    def __init__(self, scope, inner):
-        self.scope = dict(scope)
-        self.inner = inner
-
-    async def __call__(self, receive, send):
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope)
         token = None
 
         # 1) Look for a subprotocol like 'jwt.<token>'
-        subprotocols = self.scope.get('subprotocols') or []
-        for sp in subprotocols:
-            if isinstance(sp, str) and sp.startswith('jwt.'):
-                token = sp.split('jwt.', 1)[1]
-                break
+        offered = jwt_subprotocol(scope)
+        if offered:
+            token = offered.split('jwt.', 1)[1]
 
         # 2) Fallback: query string 'access_token'
         if not token:
-            qs = self.scope.get('query_string', b'').decode('utf-8')
+            qs = scope.get('query_string', b'').decode('utf-8')
             if qs:
                 params = urllib.parse.parse_qs(qs)
                 vals = params.get('access_token') or params.get('token')
@@ -67,7 +59,14 @@ class JwtAuthMiddlewareInstance:
                 user = AnonymousUser()
 
         # attach user to scope for downstream consumers
-        self.scope['user'] = user
+        scope['user'] = user
+
+        return await self.inner(scope, receive, send)
+
 
-        inner = self.inner(self.scope)
-        return await inner(receive, send)
+def jwt_subprotocol(scope):
+    """The ``jwt.<token>`` subprotocol the client offered, if any."""
+    for sp in scope.get('subprotocols') or []:
+        if isinstance(sp, str) and sp.startswith('jwt.'):
+            return sp
+    return None
@@ -1,9 +1,27 @@
-from typing import Dict, Any, Tuple, Optional
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, Tuple, Optional, cast
 from django.core.cache import cache
+from django.db import transaction as django_transaction
+from django.db.models import Avg, DurationField, ExpressionWrapper, F
 from django.urls import reverse
 from django.conf import settings
+from django.utils import timezone
+from accounts.entitlements import get_entitlement
+from accounts.models import BankDetail, Vendor
+from orders.models import Order
+from rates.models import Rate
+from transactions.models import Transaction
+from .models import BotUser
 from .telegram_service import TelegramBotService
+from .bot_router import PrefixTable
+from vendora.db_router import replica_reads
 
+# Customer-facing replies for an inactive vendor, keyed by entitlement reason
+VENDOR_GATE_MESSAGES = {
+    "suspended": "Vendor service inactive. Please contact the vendor.",
+    "trial_expired": "Vendor trial expired. Please contact the vendor.",
+    "plan_expired": "Vendor subscription expired. Please contact the vendor.",
+}
 
 def create_inline_keyboard(buttons: list) -> dict:
     """Create inline keyboard markup for Telegram.
@@ -33,9 +51,6 @@ def handle_start_command(vendor_id: Optional[int] = None) -> Tuple[str, dict]:
     extras_snippet = ""
     try:
         if vendor_id:
-            from accounts.models import Vendor
-            from transactions.models import Transaction
-            from typing import Any, cast
             v = cast(Any, Vendor).objects.only('id','name','bio','telegram_username').filter(id=vendor_id).first()
             if v:
                 vendor_name = getattr(v, "name", vendor_name) or vendor_name
@@ -50,7 +65,6 @@ def handle_start_command(vendor_id: Optional[int] = None) -> Tuple[str, dict]:
                     # Compute avg release minutes with DB aggregate then fallback
                     avg_minutes: Optional[int] = None
                     try:
-                        from django.db.models import Avg, F, ExpressionWrapper, DurationField
                         qs = cast(Any, Transaction).objects.filter(order__vendor=v, status="completed").exclude(vendor_completed_at__isnull=True).exclude(order__accepted_at__isnull=True)
                         delta_expr = ExpressionWrapper(F('vendor_completed_at') - F('order__accepted_at'), output_field=DurationField())
                         delta = qs.aggregate(avg=Avg(delta_expr)).get('avg')
@@ -87,7 +101,6 @@ def handle_start_command(vendor_id: Optional[int] = None) -> Tuple[str, dict]:
     vendor_username = ""
     try:
         if vendor_id:
-            from accounts.models import Vendor
             # Prefer external_vendor_id (public vendor code/name used in /start links)
             v_for_header = Vendor.objects.filter(id=vendor_id).only('external_vendor_id', 'name').first()
             if v_for_header:
@@ -140,7 +153,6 @@ def handle_help_command(vendor_id: Optional[int] = None) -> Tuple[str, dict]:
     prefix = "This bot connects you with your vendor on Vendora."
     try:
         if vendor_id:
-            from accounts.models import Vendor
             v = Vendor.objects.filter(id=vendor_id).first()
             if v:
                 prefix = f"You're chatting with {v.name}'s Vendora bot."
@@ -173,145 +185,126 @@ def handle_help_command(vendor_id: Optional[int] = None) -> Tuple[str, dict]:
 
 
 def handle_callback_query(data: str, vendor_id: Optional[int] = None, chat_id: Optional[str] = None) -> Tuple[str, Optional[dict]]:
-    """Handle callback queries from inline keyboards."""
-    if data == "buy":
-        return handle_buy_command(vendor_id)
-    elif data == "sell":
-        return handle_sell_command(vendor_id)
-    elif data == "query":
-        return handle_query_command()
-    elif data == "help":
-        return handle_help_command(vendor_id)
-    elif data == "assets":
-        return handle_assets_panel()
-    elif data.startswith("asset_"):
-        # asset_{type}_{asset}
-        parts = data.split("_", 2)
-        if len(parts) == 3:
-            _, order_type, asset = parts
-        else:
-            order_type = "buy"
-            asset = data.replace("asset_", "")
+    """Handle callback queries from inline keyboards.
 
-        # If no vendor is linked yet, try to infer from Rate table (single-owner asset)
-        if not vendor_id and asset:
-            try:
-                from rates.models import Rate as _Rate
-                from typing import Any, cast as _cast
-                vendor_ids = list(_cast(Any, _Rate).objects.filter(asset=asset).values_list("vendor_id", flat=True).distinct())
-                if len(vendor_ids) == 1:
-                    vendor_id = int(vendor_ids[0])
-                    # Persist on BotUser for this chat for subsequent steps
-                    if chat_id:
-                        try:
-                            from .models import BotUser as _BotUser
-                            bu = _BotUser._default_manager.filter(chat_id=str(chat_id)).first()
-                            if bu and (not bu.vendor or getattr(bu.vendor, "id", None) != vendor_id):
-                                from accounts.models import Vendor as _Vendor
-                                v = _Vendor.objects.filter(id=vendor_id).first()
-                                if v:
-                                    bu.vendor = v
-                                    bu.save(update_fields=["vendor"])
-                        except Exception:
-                            pass
-            except Exception:
-                pass
+    Exact callback values are looked up in ``_CALLBACK_ACTIONS`` and prefixed
+    ones (``asset_``, ``confirm_``...) in ``_CALLBACK_PREFIXES``.
+    """
+    action = _CALLBACK_ACTIONS.get(data) or _CALLBACK_PREFIXES.match(data)
+    if action is None:
+        return "Unknown action. Please try again.", {}
+    return action(data, vendor_id, chat_id)
 
-        return handle_asset_selection(asset, order_type, vendor_id)
-    elif data.startswith("amount_"):
-        # Parse: amount_{asset}_{order_type}_{amount}
-        parts = data.replace("amount_", "").split("_")
-        if len(parts) >= 3:
-            asset, order_type, amount = parts[0], parts[1], parts[2]
-            return handle_amount_confirmation(asset, order_type, amount, vendor_id, chat_id)
-        else:
-            # Fallback for old format
-            asset, amount = parts[0], parts[1]
-            return handle_amount_confirmation(asset, "buy", amount, vendor_id, chat_id)
-    elif data.startswith("cont_"):
-        parts = data.split("_")
-        if len(parts) >= 3 and chat_id:
-            asset, order_type = parts[1], parts[2]
-            try:
-                from .models import BotUser
-                from typing import Any, cast
-                bu = cast(Any, BotUser)._default_manager.get(chat_id=str(chat_id))
-                bu.state = "awaiting_amount"
-                bu.temp_asset = asset
-                bu.temp_type = order_type
-                bu.save(update_fields=["state", "temp_asset", "temp_type"])
-            except Exception:
-                pass
-            # Provide a Cancel option specific to the awaiting_amount step
-            buttons = [
-                [
-                    {"text": "❌ Cancel", "callback_data": "cancel_amount"},
-                    {"text": "🏠 Main Menu", "callback_data": "back_to_menu"}
-                ]
-            ]
-            return (f"Please enter the amount you want to {order_type} for {asset}.", create_inline_keyboard(buttons))
-        return ("Invalid request. Try again.", None)
-    elif data == "cancel_amount" and chat_id:
-        # Only cancel the amount-entry flow; clear awaiting_amount state and related temp fields
+
+def _cb_asset(data: str, vendor_id: Optional[int], chat_id: Optional[str]) -> Tuple[str, Optional[dict]]:
+    # asset_{type}_{asset}
+    parts = data.split("_", 2)
+    if len(parts) == 3:
+        _, order_type, asset = parts
+    else:
+        order_type = "buy"
+        asset = data.replace("asset_", "")
+
+    # If no vendor is linked yet, try to infer from Rate table (single-owner asset)
+    if not vendor_id and asset:
         try:
-            from .models import BotUser
-            from typing import Any, cast
-            bu = cast(Any, BotUser)._default_manager.filter(chat_id=str(chat_id)).first()
-            if bu and getattr(bu, "state", "") == "awaiting_amount":
-                bu.state = ""
-                # Clear amount-related temp fields only
-                bu.temp_asset = ""
-                bu.temp_type = ""
-                bu.save(update_fields=["state", "temp_asset", "temp_type"])
+            vendor_ids = list(cast(Any, Rate).objects.filter(asset=asset).values_list("vendor_id", flat=True).distinct())
+            if len(vendor_ids) == 1:
+                vendor_id = int(vendor_ids[0])
+                # Persist on BotUser for this chat for subsequent steps
+                if chat_id:
+                    try:
+                        bu = BotUser._default_manager.filter(chat_id=str(chat_id)).first()
+                        if bu and bu.vendor_id != vendor_id:
+                            bu.vendor_id = vendor_id
+                            bu.save(update_fields=["vendor"])
+                    except Exception:
+                        pass
         except Exception:
             pass
-        # Go back to main menu after canceling amount input
-        return handle_start_command()
-    elif data.startswith("repeat_"):
-        # repeat_{asset}_{order_type}_{amount}
-        try:
-            _, asset, order_type, amount = data.split("_", 3)
-        except ValueError:
-            return ("Couldn't parse repeat request. Please start a new trade.", None)
+
+    return handle_asset_selection(asset, order_type, vendor_id)
+
+
+def _cb_amount(data: str, vendor_id: Optional[int], chat_id: Optional[str]) -> Tuple[str, Optional[dict]]:
+    # Parse: amount_{asset}_{order_type}_{amount}
+    parts = data.replace("amount_", "").split("_")
+    if len(parts) >= 3:
+        asset, order_type, amount = parts[0], parts[1], parts[2]
         return handle_amount_confirmation(asset, order_type, amount, vendor_id, chat_id)
-    elif data.startswith("confirm_"):
-        # Parse: confirm_{order_id}_{asset}_{order_type}_{amount}_{vendor_id}
-        return handle_order_creation(data, chat_id)
-    elif data == "cancel_order":
-        return handle_order_cancelled()
-    elif data == "check_order":
-        return handle_check_order(chat_id)
-    elif data == "general_question":
-        return handle_general_question(chat_id, vendor_id)
-    elif data == "back_to_menu":
-        # Try to resolve vendor from BotUser by chat_id so handle_start_command can include Switch Vendor
-        resolved_vendor_id = vendor_id
-        if not resolved_vendor_id and chat_id:
-            try:
-                from .models import BotUser
-                from typing import Any, cast
-                bu = cast(Any, BotUser)._default_manager.filter(chat_id=str(chat_id)).first()
-                if bu and getattr(bu, 'vendor', None):
-                    resolved_vendor_id = getattr(bu.vendor, 'id', None)
-            except Exception:
-                resolved_vendor_id = None
-        return handle_start_command(resolved_vendor_id)
-    elif data == "switch_vendor":
-        return handle_switch_vendor()
-    elif data.startswith("contact_vendor@"):  # open DM link instruction
-        handle = data.replace("contact_vendor@", "").lstrip("@")
-        url = f"https://t.me/{handle}" if handle else "https://t.me/"
-        return (f"You can contact the vendor directly here: {url}", None)
-    else:
+    # Fallback for old format
+    asset, amount = parts[0], parts[1]
+    return handle_amount_confirmation(asset, "buy", amount, vendor_id, chat_id)
+
+
+def _cb_continue(data: str, vendor_id: Optional[int], chat_id: Optional[str]) -> Tuple[str, Optional[dict]]:
+    parts = data.split("_")
+    if len(parts) >= 3 and chat_id:
+        asset, order_type = parts[1], parts[2]
+        try:
+            cast(Any, BotUser)._default_manager.filter(chat_id=str(chat_id)).update(
+                state="awaiting_amount", temp_asset=asset, temp_type=order_type
+            )
+        except Exception:
+            pass
+        # Provide a Cancel option specific to the awaiting_amount step
+        buttons = [
+            [
+                {"text": "❌ Cancel", "callback_data": "cancel_amount"},
+                {"text": "🏠 Main Menu", "callback_data": "back_to_menu"}
+            ]
+        ]
+        return (f"Please enter the amount you want to {order_type} for {asset}.", create_inline_keyboard(buttons))
+    return ("Invalid request. Try again.", None)
+
+
+def _cb_cancel_amount(data: str, vendor_id: Optional[int], chat_id: Optional[str]) -> Tuple[str, Optional[dict]]:
+    if not chat_id:
         return "Unknown action. Please try again.", {}
+    # Only cancel the amount-entry flow; clear awaiting_amount state and related temp fields
+    try:
+        cast(Any, BotUser)._default_manager.filter(chat_id=str(chat_id), state="awaiting_amount").update(
+            state="", temp_asset="", temp_type=""
+        )
+    except Exception:
+        pass
+    # Go back to main menu after canceling amount input
+    return handle_start_command()
 
 
+def _cb_repeat(data: str, vendor_id: Optional[int], chat_id: Optional[str]) -> Tuple[str, Optional[dict]]:
+    # repeat_{asset}_{order_type}_{amount}
+    try:
+        _, asset, order_type, amount = data.split("_", 3)
+    except ValueError:
+        return ("Couldn't parse repeat request. Please start a new trade.", None)
+    return handle_amount_confirmation(asset, order_type, amount, vendor_id, chat_id)
+
+
+def _cb_back_to_menu(data: str, vendor_id: Optional[int], chat_id: Optional[str]) -> Tuple[str, Optional[dict]]:
+    # Try to resolve vendor from BotUser by chat_id so handle_start_command can include Switch Vendor
+    resolved_vendor_id = vendor_id
+    if not resolved_vendor_id and chat_id:
+        try:
+            resolved_vendor_id = cast(Any, BotUser)._default_manager.filter(chat_id=str(chat_id)).values_list("vendor_id", flat=True).first()
+        except Exception:
+            resolved_vendor_id = None
+    return handle_start_command(resolved_vendor_id)
+
+
+def _cb_contact_vendor(data: str, vendor_id: Optional[int], chat_id: Optional[str]) -> Tuple[str, Optional[dict]]:
+    # open DM link instruction
+    handle = data.replace("contact_vendor@", "").lstrip("@")
+    url = f"https://t.me/{handle}" if handle else "https://t.me/"
+    return (f"You can contact the vendor directly here: {url}", None)
+
+
+@replica_reads
 def handle_buy_command(vendor_id: Optional[int] = None) -> Tuple[str, dict]:
     """Handle buy command with dynamic asset selection from database."""
     vendor_label = ""
     if vendor_id:
         try:
-            from accounts.models import Vendor
             v = Vendor.objects.filter(id=vendor_id).first()
             if v:
                 vendor_label = f" from {v.name}"
@@ -320,9 +313,6 @@ def handle_buy_command(vendor_id: Optional[int] = None) -> Tuple[str, dict]:
     text = f"What would you like to buy{vendor_label}? Select an asset:"
     
     # Fetch available assets from the database
-    from rates.models import Rate
-    from typing import Any, cast
-    
     if vendor_id:
         rates_qs = cast(Any, Rate).objects.only('asset').filter(vendor_id=vendor_id)
     else:
@@ -345,12 +335,12 @@ def handle_buy_command(vendor_id: Optional[int] = None) -> Tuple[str, dict]:
     return text, reply_markup
 
 
+@replica_reads
 def handle_sell_command(vendor_id: Optional[int] = None) -> Tuple[str, dict]:
     """Handle sell command with dynamic asset selection from database."""
     vendor_label = ""
     if vendor_id:
         try:
-            from accounts.models import Vendor
             v = Vendor.objects.filter(id=vendor_id).first()
             if v:
                 vendor_label = f" to {v.name}"
@@ -359,9 +349,6 @@ def handle_sell_command(vendor_id: Optional[int] = None) -> Tuple[str, dict]:
     text = f"What would you like to sell{vendor_label}? Select an asset:"
     
     # Fetch available assets from the database
-    from rates.models import Rate
-    from typing import Any, cast
-    
     if vendor_id:
         rates_qs = cast(Any, Rate).objects.only('asset').filter(vendor_id=vendor_id)
     else:
@@ -407,10 +394,6 @@ def handle_query_command() -> Tuple[str, dict]:
 
 def handle_asset_selection(asset: str, order_type: str = "buy", vendor_id: Optional[int] = None) -> Tuple[str, dict]:
     """Handle asset selection with rate display and amount input."""
-    from rates.models import Rate
-    from accounts.models import Vendor
-    from typing import Any, cast
-    
     # Get rate information for this asset
     rate_info = "Rate not available"
     extra_info = ""
@@ -456,11 +439,6 @@ def handle_asset_selection(asset: str, order_type: str = "buy", vendor_id: Optio
 
 def handle_amount_confirmation(asset: str, order_type: str, amount: str, vendor_id: Optional[int] = None, chat_id: Optional[str] = None) -> Tuple[str, dict]:
     """Handle amount input: show preview with totals and ask to Confirm/Cancel (no creation yet)."""
-    from rates.models import Rate
-    from typing import Any, cast
-    import uuid
-    from decimal import Decimal, InvalidOperation
-    
     try:
         amount_decimal = Decimal(str(amount))
     except (InvalidOperation, ValueError):
@@ -471,21 +449,15 @@ def handle_amount_confirmation(asset: str, order_type: str, amount: str, vendor_
         return "❌ Vendor information missing. Please restart the bot.", {}
     try:
         # Check vendor gating before proceeding
-        from accounts.models import Vendor as _Vendor
-        from django.utils import timezone
-        v = cast(Any, _Vendor).objects.get(id=vendor_id)
-        now = timezone.now()
-        if not getattr(v, "is_service_active", True):
-            return ("Vendor service inactive. Please contact the vendor.", {})
-        texp = getattr(v, "trial_expires_at", None)
-        if getattr(v, "is_trial", False) and texp and texp < now:
-            return ("Vendor trial expired. Please contact the vendor.", {})
-        if getattr(v, "plan", "trial") not in {"trial", "perpetual"}:
-            pea = getattr(v, "plan_expires_at", None)
-            if pea and pea < now:
-                return ("Vendor subscription expired. Please contact the vendor.", {})
-
-        rate_obj = cast(Any, Rate).objects.get(vendor_id=vendor_id, asset=asset)
+        ent = get_entitlement(vendor_id)
+        if ent is None:
+            return "❌ Vendor information missing. Please restart the bot.", {}
+        if not ent.active:
+            return (VENDOR_GATE_MESSAGES[ent.reason], {})
+
+        # The vendor row rides along with the rate for the currency symbol
+        rate_obj = cast(Any, Rate).objects.select_related("vendor").get(vendor_id=vendor_id, asset=asset)
+        v = rate_obj.vendor
         if order_type == "buy":
             rate = Decimal(rate_obj.buy_rate)
         else:
@@ -527,54 +499,38 @@ def handle_amount_confirmation(asset: str, order_type: str, amount: str, vendor_
 
 def handle_order_creation(callback_data: str, chat_id: Optional[str] = None) -> Tuple[str, dict]:
     """Create the order after user confirms, then tell them it's pending acceptance."""
-    from orders.models import Order
-    from accounts.models import Vendor
-    from .models import BotUser
-    from typing import Any, cast
-    from decimal import Decimal
-    
     try:
         # Parse: confirm_{asset}_{order_type}_{amount}_{vendor_id}
         parts = callback_data.replace("confirm_", "").split("_")
         if len(parts) >= 4:
             asset, order_type, amount, vendor_id = parts[0], parts[1], parts[2], parts[3]
             
-            # Get vendor
+            # Respect availability and service gating before loading the vendor
+            ent = get_entitlement(int(vendor_id))
+            if ent is None:
+                return "❌ Vendor information missing. Please restart the bot.", {}
+            if not ent.is_available:
+                return (ent.unavailable_message or "Vendor is currently unavailable.", {})
+            if not ent.active:
+                return (VENDOR_GATE_MESSAGES[ent.reason], {})
             vendor = cast(Any, Vendor).objects.get(id=int(vendor_id))
-            # Respect availability and service gating
-            from django.utils import timezone
-            now = timezone.now()
-            if getattr(vendor, "is_available", True) is False:
-                msg = getattr(vendor, "unavailable_message", "Vendor is currently unavailable.") or "Vendor is currently unavailable."
-                return (msg, {})
-            if not getattr(vendor, "is_service_active", True):
-                return ("Vendor service inactive. Please contact the vendor.", {})
-            tea = getattr(vendor, "trial_expires_at", None)
-            if getattr(vendor, "is_trial", False) and tea and tea < now:
-                return ("Vendor trial expired. Please contact the vendor.", {})
-            if getattr(vendor, "plan", "trial") not in {"trial", "perpetual"}:
-                pea = getattr(vendor, "plan_expires_at", None)
-                if pea and pea < now:
-                    return ("Vendor subscription expired. Please contact the vendor.", {})
             
-            # Check daily order limit for free plan
-            can_accept, limit_message = vendor.can_accept_order()
-            if not can_accept:
-                return (limit_message, {})
-            
-            # Create order in database
-            order = cast(Any, Order).objects.create(
-                vendor=vendor,
-                customer_chat_id=chat_id or "",
-                asset=asset,
-                type=order_type,
-                amount=Decimal(str(amount)),
-                rate=Decimal("0"),  # We'll update this based on current rate
-                status=Order.PENDING,
-            )
+            # Take today's free-plan quota and create the order together, so a
+            # failed create gives the slot back
+            with django_transaction.atomic():
+                if vendor.consume_daily_order() is None:
+                    return (vendor.daily_limit_message(), {})
+                order = cast(Any, Order).objects.create(
+                    vendor=vendor,
+                    customer_chat_id=chat_id or "",
+                    asset=asset,
+                    type=order_type,
+                    amount=Decimal(str(amount)),
+                    rate=Decimal("0"),  # We'll update this based on current rate
+                    status=Order.PENDING,
+                )
             
             # Update rate from current rate table and ensure instructions will be set on accept
-            from rates.models import Rate
             try:
                 rate_obj = cast(Any, Rate).objects.get(vendor=vendor, asset=asset)
                 if order_type == "buy":
@@ -597,14 +553,11 @@ def handle_order_creation(callback_data: str, chat_id: Optional[str] = None) ->
             except cast(Any, BotUser).DoesNotExist:
                 pass
 
-            # Increment daily order count for free plan users
-            if vendor.is_on_free_plan():
-                vendor.increment_daily_orders()
-
             # Push notify vendor about new pending order (bot-created)
             try:
                 # If vendor has auto_accept enabled, suppress the initial pending-order push
                 if not getattr(vendor, "auto_accept", False):
+                    # Imported here: notifications needs the optional pywebpush package
                     from notifications.views import send_web_push_to_vendor as _send_push
                     _send_push(vendor, "New pending order", f"Order {order.order_code or order.pk} created", url="/orders")
             except Exception:
@@ -614,10 +567,6 @@ def handle_order_creation(callback_data: str, chat_id: Optional[str] = None) ->
             try:
                 if getattr(vendor, "auto_accept", False):
                     # Harden: perform acceptance + transaction creation atomically
-                    from django.db import transaction as django_transaction
-                    from transactions.models import Transaction
-                    from django.utils import timezone as dj_tz
-
                     with django_transaction.atomic():
                         # Lock the fresh order row to avoid concurrent accept/decline races
                         locked_order = Order.objects.select_for_update().get(id=order.id)
@@ -627,14 +576,13 @@ def handle_order_creation(callback_data: str, chat_id: Optional[str] = None) ->
                             raise RuntimeError('Order no longer pending')
 
                         locked_order.status = Order.ACCEPTED
-                        locked_order.accepted_at = dj_tz.now()
+                        locked_order.accepted_at = timezone.now()
                         # Populate pay_instructions / send_instructions similar to manual accept flow
                         try:
                             # If BUY and no pay_instructions, prefer default BankDetail then rate.bank_details
                             if locked_order.type == Order.BUY and not getattr(locked_order, 'pay_instructions', None):
                                 try:
-                                    from accounts.models import BankDetail as _BankDetail
-                                    bd = _BankDetail._default_manager.filter(vendor=locked_order.vendor).order_by('-is_default', '-created_at').first()
+                                    bd = BankDetail._default_manager.filter(vendor=locked_order.vendor).order_by('-is_default', '-created_at').first()
                                     if bd:
                                         locked_order.pay_instructions = (
                                             f"Bank: {bd.bank_name}\nAccount Name: {bd.account_name}\nAccount Number: {bd.account_number}\n"
@@ -787,7 +735,6 @@ def handle_check_order(chat_id: Optional[str] = None) -> Tuple[str, dict]:
     """Handle order status check: set state and prompt for code/ID."""
     if chat_id:
         try:
-            from .models import BotUser
             bu = BotUser._default_manager.filter(chat_id=str(chat_id)).first()
             if bu:
                 bu.state = "awaiting_order_status"
@@ -810,7 +757,6 @@ def handle_general_question(chat_id: Optional[str] = None, vendor_id: Optional[i
     """Start general question flow by setting state and prompting for the question."""
     if chat_id:
         try:
-            from .models import BotUser
             bu = BotUser._default_manager.filter(chat_id=str(chat_id)).first()
             if bu:
                 bu.state = "awaiting_general_question"
@@ -827,9 +773,9 @@ def handle_general_question(chat_id: Optional[str] = None, vendor_id: Optional[i
     return text, reply_markup
 
 
+@replica_reads
 def handle_assets() -> str:
     """List assets from rates app."""
-    from rates.models import Rate
     try:
         # Accessing the default manager via _default_manager for linting compatibility
         assets_qs = Rate._default_manager.values_list("asset", flat=True).distinct()
@@ -854,9 +800,9 @@ def handle_assets_panel() -> Tuple[str, dict]:
     return text, create_inline_keyboard(buttons)
 
 
+@replica_reads
 def handle_rate(asset_symbol: str) -> str:
     """Get rate for specific asset."""
-    from rates.models import Rate
     # Use _default_manager for linting compatibility
     qs = Rate._default_manager.filter(asset__iexact=asset_symbol)
     if not qs.exists():
@@ -884,3 +830,26 @@ def handle_submit_query(question: str) -> str:
     return "Query received. A vendor will respond via PWA."
 
 
+# Callback dispatch tables: (data, vendor_id, chat_id) -> (text, reply_markup)
+_CALLBACK_ACTIONS = {
+    "buy": lambda data, vendor_id, chat_id: handle_buy_command(vendor_id),
+    "sell": lambda data, vendor_id, chat_id: handle_sell_command(vendor_id),
+    "query": lambda data, vendor_id, chat_id: handle_query_command(),
+    "help": lambda data, vendor_id, chat_id: handle_help_command(vendor_id),
+    "assets": lambda data, vendor_id, chat_id: handle_assets_panel(),
+    "cancel_amount": _cb_cancel_amount,
+    "cancel_order": lambda data, vendor_id, chat_id: handle_order_cancelled(),
+    "check_order": lambda data, vendor_id, chat_id: handle_check_order(chat_id),
+    "general_question": lambda data, vendor_id, chat_id: handle_general_question(chat_id, vendor_id),
+    "back_to_menu": _cb_back_to_menu,
+    "switch_vendor": lambda data, vendor_id, chat_id: handle_switch_vendor(),
+}
+
+_CALLBACK_PREFIXES = PrefixTable()
+_CALLBACK_PREFIXES.add("asset_", _cb_asset)
+_CALLBACK_PREFIXES.add("amount_", _cb_amount)
+_CALLBACK_PREFIXES.add("cont_", _cb_continue)
+_CALLBACK_PREFIXES.add("repeat_", _cb_repeat)
+# Parse: confirm_{asset}_{order_type}_{amount}_{vendor_id}
+_CALLBACK_PREFIXES.add("confirm_", lambda data, vendor_id, chat_id: handle_order_creation(data, chat_id))
+_CALLBACK_PREFIXES.add("contact_vendor@", _cb_contact_vendor)
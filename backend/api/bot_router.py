@@ -0,0 +1,231 @@
+"""Declarative routing for Telegram bot updates.
+
+Handlers register against a command name, an exact callback value, a callback
+prefix or a BotUser conversation state. Each update is resolved with dict
+lookups (no linear ``startswith`` ladder) and handlers receive a ``BotContext``
+with the BotUser and its vendor preloaded in a single query. Handlers return a
+``Reply`` descriptor; sending it is left to the transport (``send_reply``).
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+import logging
+
+from . import telegram_service
+from .flood_guard import flood_guard
+from .models import BotUser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLY_TEXT = "I received your message. Use /help to see commands."
+
+
+class Reply(NamedTuple):
+    """Outgoing message descriptor. Unpacks like the legacy ``(text, markup)`` tuples."""
+    text: str = ""
+    reply_markup: Optional[dict] = None
+
+
+@dataclass
+class BotContext:
+    """Per-update context handed to every handler."""
+    chat_id: str
+    update: Dict[str, Any]
+    message: Dict[str, Any] = field(default_factory=dict)
+    text: str = ""
+    callback_data: str = ""
+    is_callback: bool = False
+    bot_user: Optional[Any] = None
+
+    @property
+    def vendor(self):
+        return getattr(self.bot_user, "vendor", None) if self.bot_user else None
+
+    @property
+    def vendor_id(self) -> Optional[int]:
+        return getattr(self.bot_user, "vendor_id", None) if self.bot_user else None
+
+    @property
+    def state(self) -> str:
+        return (getattr(self.bot_user, "state", "") or "") if self.bot_user else ""
+
+    @property
+    def command_args(self) -> str:
+        """Text following the command token, e.g. ``vendor_12`` for ``/start vendor_12``."""
+        parts = self.text.split(None, 1)
+        return parts[1].strip() if len(parts) > 1 else ""
+
+
+Handler = Callable[[BotContext], Optional[Reply]]
+
+
+class PrefixTable:
+    """Longest-prefix lookup keyed by the registered prefix lengths.
+
+    Lookup cost depends on the number of distinct prefix lengths registered,
+    not on the number of prefixes or the size of the input.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Any] = {}
+        self._lengths: Tuple[int, ...] = ()
+
+    def add(self, prefix: str, value: Any) -> None:
+        self._entries[prefix] = value
+        self._lengths = tuple(sorted({len(p) for p in self._entries}, reverse=True))
+
+    def match(self, data: str) -> Optional[Any]:
+        for n in self._lengths:
+            if len(data) >= n:
+                value = self._entries.get(data[:n])
+                if value is not None:
+                    return value
+        return None
+
+
+def _command_name(text: str) -> str:
+    """Extract ``/cmd`` from ``/cmd@BotName args``."""
+    if not text.startswith("/"):
+        return ""
+    token = text.split(None, 1)[0]
+    return token.split("@", 1)[0].lower()
+
+
+def load_bot_user(chat_id: str):
+    """Fetch the BotUser for a chat with its vendor in one query."""
+    bot_user = BotUser._default_manager.select_related("vendor").filter(chat_id=str(chat_id)).first()
+    if bot_user is not None:
+        # Lets the webhook flood guard apply the vendor limit without a query
+        flood_guard.remember_vendor(chat_id, bot_user.vendor_id)
+    return bot_user
+
+
+class BotRouter:
+    """Registry mapping commands, callbacks and conversation states to handlers."""
+
+    def __init__(self, default_reply: str = DEFAULT_REPLY_TEXT) -> None:
+        self.default_reply = default_reply
+        self._commands: Dict[str, Handler] = {}
+        self._callbacks: Dict[str, Handler] = {}
+        self._callback_prefixes = PrefixTable()
+        self._states: Dict[str, Handler] = {}
+        self._upload_handler: Optional[Handler] = None
+        self._callback_fallback: Optional[Handler] = None
+
+    # --- registration -------------------------------------------------
+    def command(self, *names: str):
+        def register(fn: Handler) -> Handler:
+            for name in names:
+                self._commands["/" + name.lstrip("/").lower()] = fn
+            return fn
+        return register
+
+    def callback(self, *values: str):
+        def register(fn: Handler) -> Handler:
+            for value in values:
+                self._callbacks[value] = fn
+            return fn
+        return register
+
+    def callback_prefix(self, *prefixes: str):
+        def register(fn: Handler) -> Handler:
+            for prefix in prefixes:
+                self._callback_prefixes.add(prefix, fn)
+            return fn
+        return register
+
+    def callback_fallback(self, fn: Handler) -> Handler:
+        self._callback_fallback = fn
+        return fn
+
+    def state(self, *states: str):
+        def register(fn: Handler) -> Handler:
+            for st in states:
+                self._states[st] = fn
+            return fn
+        return register
+
+    def upload(self, fn: Handler) -> Handler:
+        self._upload_handler = fn
+        return fn
+
+    # --- resolution ---------------------------------------------------
+    def resolve_message(self, ctx: BotContext) -> Optional[Handler]:
+        if ctx.text.startswith("/"):
+            return self._commands.get(_command_name(ctx.text))
+        if ctx.message.get("photo") or ctx.message.get("document"):
+            return self._upload_handler
+        if ctx.text:
+            return self._states.get(ctx.state)
+        return None
+
+    def resolve_callback(self, data: str) -> Optional[Handler]:
+        return self._callbacks.get(data) or self._callback_prefixes.match(data) or self._callback_fallback
+
+    def build_context(self, update: Dict[str, Any]) -> Optional[BotContext]:
+        if "message" in update:
+            message = update.get("message") or {}
+            chat_id = (message.get("chat") or {}).get("id")
+            if chat_id is None:
+                return None
+            return BotContext(
+                chat_id=str(chat_id),
+                update=update,
+                message=message,
+                text=(message.get("text", "") or "").strip(),
+                bot_user=load_bot_user(str(chat_id)),
+            )
+        if "callback_query" in update:
+            cq = update.get("callback_query") or {}
+            chat_id = ((cq.get("message") or {}).get("chat") or {}).get("id")
+            if chat_id is None:
+                return None
+            return BotContext(
+                chat_id=str(chat_id),
+                update=update,
+                callback_data=str(cq.get("data") or ""),
+                is_callback=True,
+                bot_user=load_bot_user(str(chat_id)),
+            )
+        return None
+
+    def dispatch(self, update: Dict[str, Any]) -> Optional[Tuple[str, Reply]]:
+        """Route an update and return ``(chat_id, reply)``, or None for unsupported updates."""
+        ctx = self.build_context(update)
+        if ctx is None:
+            logger.info("Unknown Telegram update type")
+            return None
+        if ctx.is_callback:
+            handler = self.resolve_callback(ctx.callback_data)
+        else:
+            handler = self.resolve_message(ctx)
+        reply: Optional[Reply] = None
+        if handler is not None:
+            try:
+                reply = handler(ctx)
+            except Exception:
+                logger.exception("Bot handler %s failed", getattr(handler, "__name__", handler))
+                reply = None
+        if reply is None:
+            reply = Reply(self.default_reply, None)
+        elif not isinstance(reply, Reply):
+            reply = Reply(*reply)
+        return ctx.chat_id, reply
+
+    def process_update(self, update: Dict[str, Any]) -> bool:
+        """Dispatch an update and send the reply. Returns False when nothing was routed."""
+        routed = self.dispatch(update)
+        if routed is None:
+            return False
+        chat_id, reply = routed
+        send_reply(chat_id, reply)
+        return True
+
+
+def send_reply(chat_id: str, reply: Reply) -> Dict[str, Any]:
+    """Transport: deliver a reply descriptor through the Telegram Bot API."""
+    service = telegram_service.TelegramBotService()
+    service.chat_id = str(chat_id)
+    result = service.send_message(reply.text or "", chat_id=str(chat_id), reply_markup=reply.reply_markup)
+    if not result.get("success"):
+        logger.error(f"Failed to send response to Telegram: {result.get('error')}")
+    return result
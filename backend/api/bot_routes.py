@@ -0,0 +1,412 @@
+"""Telegram conversation flows registered on the shared bot router.
+
+Each handler receives a ``BotContext`` (chat, text, preloaded BotUser/vendor)
+and returns a ``Reply``. New commands, callbacks or conversation states are
+added here with a decorator instead of extending ``telegram_webhook``.
+"""
+from decimal import Decimal
+from typing import Any, Optional, cast
+import logging
+
+from django.core.files.base import ContentFile
+
+from accounts.entitlements import entitlement_for, get_entitlement
+from accounts.models import Vendor
+from notifications.views import send_web_push_to_vendor
+from orders.archive import find_order, transaction_for
+from orders.models import Order
+from queries.models import Query
+from transactions.models import Transaction
+
+from . import bot_handlers, telegram_service
+from .bot_router import BotContext, BotRouter, Reply
+from .models import BotUser
+from .storage import save_content_addressed
+
+logger = logging.getLogger(__name__)
+
+router = BotRouter()
+
+VENDOR_PROMPT = "Please send the vendor's username, ID, or code to link this chat to that vendor."
+
+
+def resolve_vendor_token(token: str):
+    """Resolve a customer-supplied vendor token.
+
+    Tried in order of reliability: numeric ID, external_vendor_id,
+    telegram_username (without @), then case-insensitive name.
+    """
+    token = (token or "").strip()
+    if not token:
+        return None
+    manager = cast(Any, Vendor).objects
+    if token.isdigit():
+        found = manager.filter(id=int(token)).first()
+        if found:
+            return found
+    return (
+        manager.filter(external_vendor_id__iexact=token).first()
+        or manager.filter(telegram_username__iexact=token.lstrip("@")).first()
+        or manager.filter(name__iexact=token).first()
+    )
+
+
+def vendor_service_allowed(vendor) -> bool:
+    """True when the vendor's service flag, trial and paid plan all permit trading."""
+    return entitlement_for(vendor).active
+
+
+def _prompt_for_vendor(chat_id: str) -> Reply:
+    BotUser._default_manager.update_or_create(
+        chat_id=str(chat_id), defaults={"is_subscribed": True, "state": "awaiting_vendor"}
+    )
+    return Reply(VENDOR_PROMPT, None)
+
+
+# --- commands ---------------------------------------------------------------
+
+@router.command("start")
+def start_command(ctx: BotContext) -> Reply:
+    # /start vendor_<idOrCode>: strip the leading 'vendor_' prefix once
+    token = ""
+    args = ctx.command_args.split()
+    if args and args[0].startswith("vendor_"):
+        token = args[0][len("vendor_"):].strip()
+    vendor = resolve_vendor_token(token) if token else None
+    logger.debug("/start token resolved: token=%s vendor_id=%s", token, getattr(vendor, "id", None))
+
+    bot_user, _ = BotUser._default_manager.update_or_create(
+        chat_id=ctx.chat_id, defaults={"is_subscribed": True}
+    )
+    if vendor is not None:
+        if vendor_service_allowed(vendor):
+            bot_user.vendor = vendor
+            bot_user.save(update_fields=["vendor"])
+            logger.info(f"Linked BotUser {bot_user.chat_id} to Vendor {vendor.id} via /start")
+    elif not bot_user.vendor_id:
+        # No vendor in the deep link and this chat isn't linked yet: ask for one first
+        bot_user.state = "awaiting_vendor"
+        bot_user.save(update_fields=["state"])
+        return Reply(VENDOR_PROMPT, None)
+
+    vendor_id = getattr(vendor, "id", None) or bot_user.vendor_id
+    return Reply(*bot_handlers.handle_start_command(vendor_id))
+
+
+@router.command("help")
+def help_command(ctx: BotContext) -> Reply:
+    return Reply(*bot_handlers.handle_help_command(ctx.vendor_id))
+
+
+@router.command("switch_vendor")
+def switch_vendor_command(ctx: BotContext) -> Reply:
+    return _prompt_for_vendor(ctx.chat_id)
+
+
+@router.command("status")
+def status_command(ctx: BotContext) -> Reply:
+    return Reply("Bot is running and connected to Vendora PWA!", {})
+
+
+@router.command("assets")
+def assets_command(ctx: BotContext) -> Reply:
+    return Reply(bot_handlers.handle_assets(), {})
+
+
+@router.command("rate")
+def rate_command(ctx: BotContext) -> Reply:
+    args = ctx.command_args.split()
+    if not args:
+        return Reply("Usage: /rate ASSET_SYMBOL", None)
+    return Reply(bot_handlers.handle_rate(args[0]), None)
+
+
+@router.command("create_order")
+def create_order_command(ctx: BotContext) -> Reply:
+    return Reply(bot_handlers.handle_create_order_placeholder(), None)
+
+
+@router.command("submit_txn")
+def submit_txn_command(ctx: BotContext) -> Reply:
+    return Reply(bot_handlers.handle_submit_transaction_placeholder(), None)
+
+
+@router.command("query")
+def query_command(ctx: BotContext) -> Reply:
+    return Reply(bot_handlers.handle_submit_query(ctx.command_args), None)
+
+
+# --- proof uploads ----------------------------------------------------------
+
+@router.upload
+def proof_upload(ctx: BotContext) -> Reply:
+    try:
+        return _save_proof(ctx)
+    except Exception as e:
+        logger.error(f"Error handling file upload: {e}")
+        return Reply("An error occurred while processing your file. Please try again.", None)
+
+
+def _save_proof(ctx: BotContext) -> Reply:
+    message = ctx.message
+    # Choose highest resolution photo (last size) before falling back to a document
+    file_id = None
+    photos = message.get("photo")
+    if isinstance(photos, list) and photos:
+        file_id = photos[-1].get("file_id")
+    if not file_id and message.get("document"):
+        file_id = message["document"].get("file_id")
+    if not file_id:
+        return Reply("Couldn't read the uploaded file. Please try again.", None)
+
+    bu = ctx.bot_user
+    if not bu or bu.state != "awaiting_proof" or not bu.temp_order_id:
+        return Reply("Thanks for the file. If this is a payment proof, please create an order first.", None)
+
+    order = Order._default_manager.get(id=int(bu.temp_order_id))
+    # Only allow transaction/proof after vendor acceptance
+    if order.status not in {Order.ACCEPTED, Order.COMPLETED}:
+        return Reply("The vendor hasn't accepted your order yet. Please wait for acceptance and tap Continue before uploading your proof.", None)
+
+    dres = telegram_service.TelegramBotService().download_file_by_file_id(file_id)
+    if not dres.get("success"):
+        return Reply(f"Couldn't download the file: {dres.get('error')}", None)
+    filename = str(dres.get("filename") or "proof.jpg")
+    content = dres.get("content")
+    if not isinstance(content, (bytes, bytearray)) or not content:
+        return Reply("Couldn't download the file content. Please try again.", None)
+
+    txn = Transaction._default_manager.filter(order=order).first()
+    if not txn:
+        txn = Transaction(order=order)
+        txn.save()  # Save first to get a primary key for the FileField
+    txn.proof = save_content_addressed("proof", ContentFile(bytes(content), name=filename))
+    txn.status = "uncompleted"
+    txn.save(update_fields=["proof", "status"])
+    bu.state = "awaiting_receiving"
+    bu.temp_order_id = str(order.id)
+    bu.save(update_fields=["state", "temp_order_id"])
+
+    code_or_id = order.order_code or str(order.id)
+    return Reply(
+        f"✅ Proof received for Order ID: {code_or_id}.\n"
+        f"Now, please enter your receiving details (bank account or wallet address).",
+        None,
+    )
+
+
+# --- conversation states ----------------------------------------------------
+
+@router.state("awaiting_vendor")
+def awaiting_vendor(ctx: BotContext) -> Reply:
+    bu = ctx.bot_user
+    found = resolve_vendor_token(ctx.text)
+    if not found:
+        return Reply("Couldn't find that vendor. Please check the username/ID and try again.", None)
+    bu.vendor = found
+    bu.state = ""
+    bu.save(update_fields=["vendor", "state"])
+    return Reply("Linked to vendor successfully. Use /help to see available commands.", None)
+
+
+@router.state("awaiting_amount")
+def awaiting_amount(ctx: BotContext) -> Optional[Reply]:
+    bu = ctx.bot_user
+    if not (bu.temp_asset and bu.temp_type):
+        return None
+    amt = ctx.text.replace(",", "")
+    # Only proceed if vendor is active/subscribed (cached snapshot, no vendor load)
+    ent = get_entitlement(ctx.vendor_id) if ctx.vendor_id else None
+    if ent is not None and not ent.active:
+        reply = Reply("Vendor subscription inactive. Please contact the vendor.", None)
+    else:
+        reply = Reply(*bot_handlers.handle_amount_confirmation(bu.temp_asset, bu.temp_type, amt, ctx.vendor_id, ctx.chat_id))
+    # Clear awaiting_amount to avoid reusing on next message
+    bu.state = ""
+    bu.save(update_fields=["state"])
+    return reply
+
+
+@router.state("awaiting_receiving")
+def awaiting_receiving(ctx: BotContext) -> Optional[Reply]:
+    bu = ctx.bot_user
+    if not bu.temp_order_id:
+        return None
+    txn = Transaction._default_manager.select_related("order__vendor").filter(order_id=int(bu.temp_order_id)).first()
+    if txn:
+        txn.customer_receiving_details = ctx.text
+        txn.save(update_fields=["customer_receiving_details"])
+        # Transactions created by the auto_accept flow notify the vendor once details arrive
+        try:
+            vendor = txn.order.vendor
+            if vendor and vendor.auto_accept and txn.status == "uncompleted" and not txn.vendor_notified:
+                send_web_push_to_vendor(vendor, "Uncompleted transaction", f"Order {txn.order.order_code or txn.order.pk} has an uncompleted transaction", url="/transactions")
+                txn.vendor_notified = True
+                txn.save(update_fields=["vendor_notified"])
+        except Exception:
+            pass
+    bu.state = "awaiting_note"
+    bu.save(update_fields=["state"])
+    return Reply("Got it. If you have any other information to share with the vendor (optional), type it now. If not, send 'skip'.", None)
+
+
+@router.state("awaiting_note")
+def awaiting_note(ctx: BotContext) -> Optional[Reply]:
+    bu = ctx.bot_user
+    if not bu.temp_order_id:
+        return None
+    note = ctx.text
+    if note.lower() != "skip":
+        txn = Transaction._default_manager.filter(order_id=int(bu.temp_order_id)).first()
+        if txn:
+            txn.customer_note = note
+            txn.save(update_fields=["customer_note"])
+    bu.state = ""
+    bu.temp_order_id = ""
+    bu.save(update_fields=["state", "temp_order_id"])
+    return Reply("✅ Thanks! Your transaction details have been sent to the vendor. You'll be notified when it's processed.", None)
+
+
+@router.state("awaiting_order_status")
+def awaiting_order_status(ctx: BotContext) -> Reply:
+    bu = ctx.bot_user
+    code = ctx.text
+    # Old orders may have moved to the archive
+    if code.upper().startswith("ORD-"):
+        order = find_order(order_code__iexact=code)
+    elif code.isdigit():
+        order = find_order(id=int(code))
+    else:
+        order = None
+    # Enforce vendor scoping if this chat is linked to a vendor
+    if order and ctx.vendor_id and order.vendor_id != ctx.vendor_id:
+        order = None
+
+    bu.state = ""
+    bu.save(update_fields=["state"])
+    if not order:
+        return Reply("Order not found. Please check the ID/Code and try again.", None)
+
+    total = order.total_value or (Decimal(order.amount) * Decimal(order.rate))
+    parts = [
+        f"Order: {order.order_code or order.pk}",
+        f"Type: {order.type.upper()} {order.asset}",
+        f"Amount: {order.amount:,.2f} {order.asset}",
+        f"Total: ₦{total:,.2f}",
+        f"Status: {order.status.capitalize()}",
+    ]
+    if order.accepted_at:
+        parts.append(f"Accepted: {order.accepted_at:%Y-%m-%d %H:%M}")
+    if order.declined_at:
+        parts.append(f"Declined: {order.declined_at:%Y-%m-%d %H:%M}")
+    txn = transaction_for(order)
+    if txn:
+        if txn.vendor_completed_at or txn.completed_at:
+            when = txn.vendor_completed_at or txn.completed_at
+            parts.append(f"Completed: {when:%Y-%m-%d %H:%M}")
+        elif getattr(txn, "proof_uploaded_at", None):
+            parts.append(f"Proof uploaded: {txn.proof_uploaded_at:%Y-%m-%d %H:%M}")
+        elif getattr(txn, "created_at", None):
+            parts.append(f"Transaction created: {txn.created_at:%Y-%m-%d %H:%M}")
+    return Reply("\n".join(parts), None)
+
+
+@router.state("awaiting_general_question")
+def awaiting_general_question(ctx: BotContext) -> Reply:
+    bu = ctx.bot_user
+    q = Query._default_manager.create(vendor=ctx.vendor, message=ctx.text, status="pending")
+    bu.state = "awaiting_contact"
+    bu.temp_query_id = str(q.pk or "")
+    bu.save(update_fields=["state", "temp_query_id"])
+    return Reply("Thanks! Please share your contact (phone/email/Telegram handle) so the vendor can reach you.", None)
+
+
+@router.state("awaiting_contact")
+def awaiting_contact(ctx: BotContext) -> Optional[Reply]:
+    bu = ctx.bot_user
+    if not bu.temp_query_id:
+        return None
+    q = None
+    if str(bu.temp_query_id).isdigit():
+        q = Query._default_manager.select_related("vendor", "order__vendor").filter(id=int(bu.temp_query_id)).first()
+    if q:
+        q.contact = ctx.text
+        # Persist chat id for future vendor-triggered updates
+        q.customer_chat_id = ctx.chat_id
+        q.save(update_fields=["contact", "customer_chat_id"])
+        try:
+            vendor = q.vendor or getattr(q.order, "vendor", None)
+            if vendor:
+                send_web_push_to_vendor(vendor, "New customer query", "New general question received")
+        except Exception:
+            pass
+    bu.state = ""
+    bu.temp_query_id = ""
+    bu.save(update_fields=["state", "temp_query_id"])
+    return Reply("✅ Got it! The vendor has received your question and contact. They'll reach out to you soon.", None)
+
+
+# --- callbacks --------------------------------------------------------------
+
+@router.callback("switch_vendor")
+def switch_vendor_callback(ctx: BotContext) -> Reply:
+    return _prompt_for_vendor(ctx.chat_id)
+
+
+def _continue_after_accept(ctx: BotContext, prefix: str, state: str, lead: str, prompt: str) -> Reply:
+    """Move the chat into ``state`` for an accepted order and personalise the prompt."""
+    try:
+        order_id = int(ctx.callback_data[len(prefix):])
+        bu = ctx.bot_user or BotUser._default_manager.get(chat_id=ctx.chat_id)
+        bu.state = state
+        bu.temp_order_id = str(order_id)
+        bu.save(update_fields=["state", "temp_order_id"])
+    except Exception:
+        return Reply("Invalid state. Please try again.", None)
+    try:
+        order = Order._default_manager.select_related("vendor").get(id=order_id)
+        v = order.vendor
+        vname = getattr(v, "name", "the vendor")
+        success_count = Transaction._default_manager.filter(order__vendor=v, status="completed").count() if v else 0
+        buttons = []
+        tuser = (getattr(v, "telegram_username", "") or "").lstrip("@") if v else ""
+        if tuser:
+            buttons.append([{"text": "📨 Contact Vendor", "url": f"https://t.me/{tuser}"}])
+        buttons.append([
+            {"text": "🔙 Back", "callback_data": "help"},
+            {"text": "🏠 Main Menu", "callback_data": "back_to_menu"}
+        ])
+        text = f"{lead.format(vname=vname)} {vname} has completed {success_count} successful trades here.\n{prompt}"
+        return Reply(text, {"inline_keyboard": buttons})
+    except Exception:
+        return Reply(prompt, None)
+
+
+@router.callback_prefix("cont_recv_")
+def continue_receiving(ctx: BotContext) -> Reply:
+    return _continue_after_accept(
+        ctx, "cont_recv_", "awaiting_receiving",
+        "Great! {vname} has accepted your order.",
+        "Please enter your receiving details (bank account or wallet address).",
+    )
+
+
+@router.callback_prefix("cont_upload_")
+def continue_upload(ctx: BotContext) -> Reply:
+    return _continue_after_accept(
+        ctx, "cont_upload_", "awaiting_proof",
+        "{vname} has accepted your order.",
+        "Please upload your payment/on-chain proof now (image or document).",
+    )
+
+
+@router.callback_prefix("contact_vendor@")
+def contact_vendor(ctx: BotContext) -> Reply:
+    # Backward-compat: keep a textual response if an old client sends this callback
+    handle = ctx.callback_data[len("contact_vendor@"):].lstrip("@")
+    return Reply(f"You can DM the vendor here: https://t.me/{handle}", None)
+
+
+@router.callback_fallback
+def menu_callback(ctx: BotContext) -> Reply:
+    return Reply(*bot_handlers.handle_callback_query(ctx.callback_data, ctx.vendor_id, ctx.chat_id))
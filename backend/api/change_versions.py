@@ -0,0 +1,136 @@
+"""Per-vendor change versions and conditional GETs for list views.
+
+Every write to a vendor's orders, transactions, queries, rates, bank details
+or broadcasts bumps a counter for that kind in the cache (``bump_on_commit`` from the model
+signal receivers, after the transaction commits). List endpoints build a weak
+ETag from the counters they depend on plus the request's path, query string
+and the vendor's own profile fields. A matching ``If-None-Match`` is answered
+with 304 after a single ``get_many``, without running the list query or the
+serializer.
+
+Counters start from the current time in microseconds, so a counter that was
+evicted from the cache comes back higher than any value it had before and
+stale ETags never match.
+"""
+from typing import Dict, Iterable, Optional, Sequence
+import hashlib
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+ORDERS = "orders"
+TRANSACTIONS = "transactions"
+QUERIES = "queries"
+RATES = "rates"
+BROADCASTS = "broadcasts"
+BANK_DETAILS = "bank_details"
+
+KEY_PREFIX = "changever:"
+
+# Vendor fields rendered by these endpoints (order vendor name/email and
+# instruction fallback, dashboard profile)
+_PROFILE_FIELDS = ("name", "email", "currency", "telegram_username", "external_vendor_id", "bank_details")
+
+
+def _key(vendor_id, kind: str) -> str:
+    return f"{KEY_PREFIX}{vendor_id}:{kind}"
+
+
+def _seed() -> int:
+    return time.time_ns() // 1000
+
+
+def bump(vendor_id, *kinds: str) -> None:
+    if vendor_id is None:
+        return
+    for kind in kinds:
+        key = _key(vendor_id, kind)
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                if not cache.add(key, _seed(), timeout=None):
+                    cache.incr(key)
+        except Exception as e:
+            logger.warning("Change version bump failed for %s: %s", key, e)
+    # Readers of the new version must not be served from a lagging replica
+    from vendora.db_router import pin_vendor
+    pin_vendor(vendor_id)
+
+
+def bump_on_commit(vendor_id, *kinds: str) -> None:
+    """Bump after commit so no reader pairs the new version with uncommitted data."""
+    if vendor_id is None:
+        return
+    transaction.on_commit(lambda: bump(vendor_id, *kinds))
+
+
+def get_versions(vendor_id, kinds: Sequence[str]) -> Dict[str, int]:
+    keys = {_key(vendor_id, kind): kind for kind in kinds}
+    found = cache.get_many(list(keys))
+    for key in keys:
+        if key not in found:
+            seed = _seed()
+            found[key] = seed if cache.add(key, seed, timeout=None) else cache.get(key, seed)
+    return {kind: found[key] for key, kind in keys.items()}
+
+
+def vendor_etag(request, kinds: Sequence[str], extra: Iterable = ()) -> Optional[str]:
+    """Weak ETag for the current vendor's view of ``kinds``; None for anonymous requests."""
+    user = getattr(request, "user", None)
+    if not user or not getattr(user, "is_authenticated", False):
+        return None
+    try:
+        versions = get_versions(user.pk, kinds)
+    except Exception as e:
+        logger.warning("Change versions unavailable: %s", e)
+        return None
+    parts = [str(user.pk), request.get_full_path()]
+    parts += [f"{kind}={versions[kind]}" for kind in kinds]
+    parts += [str(getattr(user, f, "") or "") for f in _PROFILE_FIELDS]
+    parts += [str(x) for x in extra]
+    digest = hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    # Weak comparison: W/ prefixes are ignored
+    return "*" in tags or etag.removeprefix("W/") in {t.removeprefix("W/") for t in tags}
+
+
+def with_etag(response, etag: Optional[str]):
+    if etag and response.status_code == status.HTTP_200_OK:
+        response["ETag"] = etag
+        # Cacheable by the browser only, and always revalidated
+        response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+class ConditionalListMixin:
+    """ViewSet mixin: ETag / If-None-Match on ``list`` driven by ``etag_kinds``."""
+
+    etag_kinds: Sequence[str] = ()
+
+    def list(self, request, *args, **kwargs):
+        etag = vendor_etag(request, self.etag_kinds)
+        if etag and etag_matches(request, etag):
+            return not_modified(etag)
+        return with_etag(super().list(request, *args, **kwargs), etag)  # type: ignore[misc]
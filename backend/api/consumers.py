@@ -0,0 +1,186 @@
+"""Vendor live feed over WebSocket.
+
+One connection per dashboard tab at ``ws/vendor-feed/``, authenticated with the
+``jwt.<token>`` subprotocol (``accounts.ws_auth``). The consumer joins the
+vendor's event bus group and never touches the database: each order or
+transaction event already carries the compact row, so it is mapped onto the
+views the client subscribed to and pushed as a delta.
+
+Client messages::
+
+    {"action": "subscribe", "views": ["orders.pending"], "last_event_id": "..."}
+    {"action": "unsubscribe", "views": ["orders.pending"]}
+    {"action": "ping"}
+
+Server frames::
+
+    {"type": "subscribed", "views": [...], "last_event_id": "..."}
+    {"type": "resync", "views": [...], "last_event_id": "..."}
+    {"type": "deltas", "last_event_id": "...", "deltas": [
+        {"view": "orders.pending", "op": "upsert" | "remove", "id": 12,
+         "event": "order.accepted", "status": "accepted", "row": {...}}]}
+
+Deltas are coalesced per ``(view, id)`` for ``VENDOR_FEED_COALESCE_MS`` so a
+burst of updates to one row reaches the client as its latest state in a single
+frame. ``last_event_id`` is the bus offset to resume from on reconnect; when
+that offset is no longer retained the client gets ``resync`` and should reload
+the view from the REST API.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+
+from accounts.ws_auth import jwt_subprotocol
+from api import metrics
+from api.events import get_event_bus, parse_event_id, vendor_group
+
+OPEN_CONNECTIONS_METRIC = 'vendor_feed_connections_open'
+
+# view name -> (event type prefix, row predicate for membership; None keeps every row)
+VIEWS = {
+    'orders': ('order.', None),
+    'orders.pending': ('order.', lambda row: row.get('status') == 'pending'),
+    'transactions': ('transaction.', None),
+    'transactions.uncompleted': ('transaction.', lambda row: row.get('status') == 'uncompleted'),
+}
+
+
+def view_deltas(views, event):
+    """Deltas an event produces for the given subscribed views."""
+    out = []
+    row = event.get('data') or {}
+    for view in views:
+        prefix, member = VIEWS[view]
+        if not str(event.get('type', '')).startswith(prefix):
+            continue
+        op = 'upsert' if member is None or member(row) else 'remove'
+        out.append({
+            'view': view,
+            'op': op,
+            'id': row.get('id'),
+            'event': event.get('type'),
+            'status': row.get('status'),
+            'row': row,
+        })
+    return out
+
+
+class VendorFeedConsumer(AsyncJsonWebsocketConsumer):
+    async def connect(self):
+        user = self.scope.get('user')
+        if not user or not getattr(user, 'is_authenticated', False):
+            await self.close(code=4001)
+            return
+        self.vendor_id = user.id
+        self.group_name = vendor_group(user.id)
+        self.views = set()
+        # Newest bus offset delivered; live messages at or before it were replayed
+        self.cursor = None
+        self.pending = {}
+        self.flush_task = None
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept(subprotocol=jwt_subprotocol(self.scope))
+        metrics.inc(OPEN_CONNECTIONS_METRIC)
+        metrics.inc('vendor_feed_connections_total')
+
+    async def disconnect(self, close_code):
+        if not hasattr(self, 'views'):
+            return
+        metrics.inc(OPEN_CONNECTIONS_METRIC, -1)
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+        try:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        except Exception:
+            pass
+
+    async def receive_json(self, content, **kwargs):
+        action = content.get('action') if isinstance(content, dict) else None
+        if action == 'ping':
+            await self.send_json({'type': 'pong'})
+            return
+        if action not in ('subscribe', 'unsubscribe'):
+            await self.send_json({'type': 'error', 'detail': 'Unknown action.'})
+            return
+        views = content.get('views') or []
+        unknown = [v for v in views if v not in VIEWS] if isinstance(views, list) else [views]
+        if unknown or not views:
+            await self.send_json({'type': 'error', 'detail': 'Unknown view.', 'views': unknown, 'available': sorted(VIEWS)})
+            return
+        if action == 'unsubscribe':
+            self.views.difference_update(views)
+            self.pending = {k: d for k, d in self.pending.items() if k[0] in self.views}
+            await self.send_json({'type': 'unsubscribed', 'views': views})
+            return
+        await self._subscribe(views, content.get('last_event_id'))
+
+    async def _subscribe(self, views, last_event_id):
+        bus = get_event_bus()
+        added = [v for v in views if v not in self.views]
+        self.views.update(views)
+        if not last_event_id:
+            # Client loads the view over REST; anything after this offset arrives here
+            latest = await sync_to_async(bus.latest_id)(self.vendor_id)
+            self._advance(latest)
+            await self.send_json({'type': 'subscribed', 'views': views, 'last_event_id': latest})
+            return
+        missed, complete = await sync_to_async(bus.replay)(self.vendor_id, last_event_id)
+        if not complete:
+            latest = await sync_to_async(bus.latest_id)(self.vendor_id)
+            self._advance(latest)
+            await self.send_json({'type': 'resync', 'views': views, 'last_event_id': latest})
+            return
+        await self.send_json({'type': 'subscribed', 'views': views, 'last_event_id': last_event_id})
+        # Replay only into the newly added views; existing ones are already current
+        self._queue([ev.as_dict() for ev in missed], added)
+        self._advance(last_event_id)
+        await self._flush()
+
+    def _advance(self, event_id):
+        if event_id and (self.cursor is None or parse_event_id(event_id) > self.cursor):
+            self.cursor = parse_event_id(event_id)
+
+    def _queue(self, events, views):
+        for ev in events:
+            for delta in view_deltas(views, ev):
+                key = (delta['view'], delta['id'])
+                # Latest state wins and moves to the back so frames stay in event order
+                self.pending.pop(key, None)
+                self.pending[key] = delta
+            offset = parse_event_id(ev['id'])
+            if self.cursor is None or offset > self.cursor:
+                self.cursor = offset
+
+    async def vendor_events(self, event):
+        if not self.views:
+            return
+        fresh = [ev for ev in event.get('events', []) if self.cursor is None or parse_event_id(ev['id']) > self.cursor]
+        if not fresh:
+            return
+        self._queue(fresh, self.views)
+        if not self.pending:
+            return
+        window = float(getattr(settings, 'VENDOR_FEED_COALESCE_MS', 250) or 0) / 1000.0
+        if window <= 0:
+            await self._flush()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self._flush_later(window))
+
+    async def _flush_later(self, window):
+        try:
+            await asyncio.sleep(window)
+            await self._flush()
+        finally:
+            self.flush_task = None
+
+    async def _flush(self):
+        if not self.pending:
+            return
+        deltas, self.pending = list(self.pending.values()), {}
+        await self.send_json({
+            'type': 'deltas',
+            'last_event_id': '%d-%d' % self.cursor if self.cursor else None,
+            'deltas': deltas,
+        })
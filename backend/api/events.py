@@ -0,0 +1,313 @@
+"""Per-vendor event bus.
+
+Domain changes (orders, transactions, payment requests, queries) are published
+as typed ``Event`` records into a partition per vendor. Each partition is an
+append-only log with bounded retention (``EVENT_BUS_MAXLEN`` entries and
+``EVENT_BUS_RETENTION_SECONDS``). Event ids increase within a partition and
+double as consumer offsets: a reconnecting SSE or WebSocket client sends its
+``Last-Event-ID`` and ``replay`` returns what it missed, or reports that the
+gap fell out of retention so the client can resync from the REST API.
+
+Backends:
+
+* ``RedisStreamsEventBus`` keeps each partition in a Redis stream (XADD with
+  approximate MAXLEN trimming plus a key TTL), shared by every process.
+* ``InMemoryEventBus`` keeps bounded deques in the current process, for
+  single-process development and tests.
+
+Live delivery rides on the channel layer: ``publish``/``publish_many`` also
+send one ``vendor.events`` message to the vendor's ``vendor_events_<id>``
+group carrying the stored events, ids included.
+"""
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from threading import Lock
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import logging
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+ORDER_CREATED = "order.created"
+ORDER_ACCEPTED = "order.accepted"
+ORDER_DECLINED = "order.declined"
+ORDER_EXPIRED = "order.expired"
+TRANSACTION_CREATED = "transaction.created"
+TRANSACTION_UPDATED = "transaction.updated"
+TRANSACTION_COMPLETED = "transaction.completed"
+PAYMENT_REQUEST_CHANGED = "payment_request.changed"
+QUERY_CREATED = "query.created"
+
+EVENT_TYPES = frozenset({
+    ORDER_CREATED, ORDER_ACCEPTED, ORDER_DECLINED, ORDER_EXPIRED,
+    TRANSACTION_CREATED, TRANSACTION_UPDATED, TRANSACTION_COMPLETED,
+    PAYMENT_REQUEST_CHANGED, QUERY_CREATED,
+})
+
+
+def vendor_group(vendor_id) -> str:
+    """Channel-layer group that receives a vendor's live events."""
+    return f"vendor_events_{vendor_id}"
+
+
+def parse_event_id(event_id: str) -> Tuple[int, int]:
+    """``"<ms>-<seq>"`` (the Redis stream id format) as a comparable tuple."""
+    ms, _, seq = str(event_id).partition("-")
+    return int(ms), int(seq or 0)
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    vendor_id: int
+    type: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    ts: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_sse(self) -> bytes:
+        payload = json.dumps({"type": self.type, "data": self.data, "ts": self.ts}, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class EventBus:
+    """Backend interface; subclasses implement ``_append``, ``_read`` and the offset lookups."""
+
+    def __init__(self, maxlen: int, retention_seconds: int) -> None:
+        self.maxlen = max(1, int(maxlen))
+        self.retention_seconds = max(1, int(retention_seconds))
+
+    def publish(self, vendor_id: int, type: str, data: Optional[Dict[str, Any]] = None) -> Optional[Event]:
+        events = self.publish_many(vendor_id, [(type, data or {})])
+        return events[0] if events else None
+
+    def publish_many(self, vendor_id: int, items: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Event]:
+        """Append events to a vendor's partition and notify live subscribers once."""
+        items = list(items)
+        for type_, _ in items:
+            if type_ not in EVENT_TYPES:
+                raise ValueError(f"Unknown event type: {type_}")
+        if not items:
+            return []
+        events = self._append(int(vendor_id), items, time.time())
+        _notify(int(vendor_id), events)
+        return events
+
+    def read(self, vendor_id: int, after: Optional[str] = None, limit: int = 500) -> List[Event]:
+        """Events after offset ``after`` (exclusive), oldest first; all retained when None."""
+        return self._read(int(vendor_id), after, max(1, int(limit)))
+
+    def latest_id(self, vendor_id: int) -> Optional[str]:
+        """Offset of the newest retained event; what a fresh snapshot corresponds to."""
+        return self._newest_id(int(vendor_id))
+
+    def replay(self, vendor_id: int, last_event_id: Optional[str], limit: int = 500) -> Tuple[List[Event], bool]:
+        """Events a client missed since ``last_event_id``.
+
+        The flag is False when the offset is older than what is retained, in
+        which case the client should resync its state before using the events.
+        """
+        if not last_event_id:
+            return [], True
+        try:
+            last = parse_event_id(last_event_id)
+        except ValueError:
+            return [], False
+        # Everything after the offset is still retained only if the oldest
+        # retained event is at or before it; an empty partition may have expired
+        oldest = self._oldest_id(int(vendor_id))
+        complete = oldest is not None and parse_event_id(oldest) <= last
+        return self.read(vendor_id, after=last_event_id, limit=limit), complete
+
+    # Backend hooks
+    def _append(self, vendor_id: int, items: Sequence[Tuple[str, Dict[str, Any]]], ts: float) -> List[Event]:
+        raise NotImplementedError
+
+    def _read(self, vendor_id: int, after: Optional[str], limit: int) -> List[Event]:
+        raise NotImplementedError
+
+    def _oldest_id(self, vendor_id: int) -> Optional[str]:
+        raise NotImplementedError
+
+    def _newest_id(self, vendor_id: int) -> Optional[str]:
+        raise NotImplementedError
+
+
+class InMemoryEventBus(EventBus):
+    def __init__(self, maxlen: int, retention_seconds: int) -> None:
+        super().__init__(maxlen, retention_seconds)
+        self._lock = Lock()
+        self._partitions: Dict[int, Deque[Event]] = {}
+        self._last = (0, 0)
+
+    def _next_id(self, ts: float) -> str:
+        ms = int(ts * 1000)
+        last_ms, last_seq = self._last
+        self._last = (ms, 0) if ms > last_ms else (last_ms, last_seq + 1)
+        return f"{self._last[0]}-{self._last[1]}"
+
+    def _expire(self, part: Deque[Event], now: float) -> None:
+        cutoff = now - self.retention_seconds
+        while part and part[0].ts < cutoff:
+            part.popleft()
+
+    def _append(self, vendor_id, items, ts):
+        with self._lock:
+            part = self._partitions.setdefault(vendor_id, deque(maxlen=self.maxlen))
+            self._expire(part, ts)
+            events = [Event(self._next_id(ts), vendor_id, type_, dict(data), ts) for type_, data in items]
+            part.extend(events)
+            return events
+
+    def _read(self, vendor_id, after, limit):
+        with self._lock:
+            part = self._partitions.get(vendor_id)
+            if not part:
+                return []
+            self._expire(part, time.time())
+            if after is None:
+                return list(part)[:limit]
+            floor = parse_event_id(after)
+            return [ev for ev in part if parse_event_id(ev.id) > floor][:limit]
+
+    def _oldest_id(self, vendor_id):
+        with self._lock:
+            part = self._partitions.get(vendor_id)
+            if not part:
+                return None
+            self._expire(part, time.time())
+            return part[0].id if part else None
+
+    def _newest_id(self, vendor_id):
+        with self._lock:
+            part = self._partitions.get(vendor_id)
+            return part[-1].id if part else None
+
+
+class RedisStreamsEventBus(EventBus):
+    def __init__(self, client, maxlen: int, retention_seconds: int, prefix: str = "vendora:events") -> None:
+        super().__init__(maxlen, retention_seconds)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, vendor_id: int) -> str:
+        return f"{self.prefix}:{vendor_id}"
+
+    def _append(self, vendor_id, items, ts):
+        key = self._key(vendor_id)
+        pipe = self.client.pipeline(transaction=False)
+        for type_, data in items:
+            pipe.xadd(
+                key,
+                {"type": type_, "data": json.dumps(data, default=str), "ts": repr(ts)},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        # Idle partitions disappear after the retention window
+        pipe.expire(key, self.retention_seconds)
+        ids = pipe.execute()[:-1]
+        return [Event(_text(i), vendor_id, type_, dict(data), ts) for i, (type_, data) in zip(ids, items)]
+
+    def _decode(self, vendor_id: int, entry_id, fields) -> Event:
+        fields = {_text(k): _text(v) for k, v in fields.items()}
+        try:
+            data = json.loads(fields.get("data") or "{}")
+        except ValueError:
+            data = {}
+        return Event(_text(entry_id), vendor_id, fields.get("type", ""), data, float(fields.get("ts") or 0))
+
+    def _read(self, vendor_id, after, limit):
+        start = f"({after}" if after else "-"
+        rows = self.client.xrange(self._key(vendor_id), min=start, max="+", count=limit)
+        return [self._decode(vendor_id, entry_id, fields) for entry_id, fields in rows]
+
+    def _oldest_id(self, vendor_id):
+        rows = self.client.xrange(self._key(vendor_id), min="-", max="+", count=1)
+        return _text(rows[0][0]) if rows else None
+
+    def _newest_id(self, vendor_id):
+        rows = self.client.xrevrange(self._key(vendor_id), max="+", min="-", count=1)
+        return _text(rows[0][0]) if rows else None
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _notify(vendor_id: int, events: List[Event]) -> None:
+    """Push freshly stored events to the vendor's channel-layer group."""
+    if not events:
+        return
+    try:
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+        layer = get_channel_layer()
+        if layer is None:
+            return
+        async_to_sync(layer.group_send)(
+            vendor_group(vendor_id),
+            {"type": "vendor.events", "events": [ev.as_dict() for ev in events]},
+        )
+    except Exception as e:
+        # Subscribers catch up from the log on their next replay
+        logger.debug("Live event notify failed for vendor %s: %s", vendor_id, e)
+
+
+_bus: Optional[EventBus] = None
+_bus_lock = Lock()
+
+
+def _build_bus() -> EventBus:
+    maxlen = int(getattr(settings, "EVENT_BUS_MAXLEN", 1000) or 1000)
+    retention = int(getattr(settings, "EVENT_BUS_RETENTION_SECONDS", 86400) or 86400)
+    backend = str(getattr(settings, "EVENT_BUS_BACKEND", "memory") or "memory").lower()
+    if backend == "redis":
+        try:
+            import redis
+            client = redis.from_url(getattr(settings, "REDIS_URL", "") or "redis://localhost:6379/0")
+            return RedisStreamsEventBus(client, maxlen, retention)
+        except Exception as e:
+            logger.warning("Redis event bus unavailable (%s); using the in-memory bus", e)
+    return InMemoryEventBus(maxlen, retention)
+
+
+def get_event_bus() -> EventBus:
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = _build_bus()
+    return _bus
+
+
+def reset_event_bus() -> None:
+    """Drop the configured bus so the next ``get_event_bus`` rebuilds it (tests, settings changes)."""
+    global _bus
+    with _bus_lock:
+        _bus = None
+
+
+def publish_event(vendor_id, type: str, data: Optional[Dict[str, Any]] = None) -> Optional[Event]:
+    """Best-effort publish used by signal receivers; never raises into the caller."""
+    if vendor_id is None:
+        return None
+    try:
+        return get_event_bus().publish(int(vendor_id), type, data)
+    except Exception as e:
+        logger.warning("Event publish failed (%s for vendor %s): %s", type, vendor_id, e)
+        return None
+
+
+def publish_events(vendor_id, items: Iterable[Tuple[str, Dict[str, Any]]]) -> List[Event]:
+    if vendor_id is None:
+        return []
+    try:
+        return get_event_bus().publish_many(int(vendor_id), items)
+    except Exception as e:
+        logger.warning("Event publish failed for vendor %s: %s", vendor_id, e)
+        return []
@@ -0,0 +1,159 @@
+"""Per-chat and per-vendor admission control for Telegram updates.
+
+``admit`` runs in the webhook right after the secret check, before any
+database work. Each chat, and each vendor the chat is linked to, has a token
+bucket (``TELEGRAM_FLOOD_CHAT_RATE`` / ``TELEGRAM_FLOOD_VENDOR_RATE``).
+An in-process bucket answers a flooding chat without any I/O; updates it
+admits are checked against the shared bucket in the cache
+(``vendora.throttling.acquire``), so the limit holds across workers.
+
+A throttled chat is told to slow down at most once per
+``TELEGRAM_FLOOD_NOTICE_SECONDS``; its other throttled updates are dropped.
+The chat-to-vendor link is learned when the bot router loads a chat's
+BotUser, so the vendor tier needs no query either.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from vendora.throttling import acquire
+
+from . import metrics
+from .update_dispatcher import update_chat_key
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "tg:flood:"
+
+CHAT_NOTICE = "You're sending messages too quickly. Please wait a moment and try again."
+VENDOR_NOTICE = "This vendor is receiving a lot of messages right now. Please try again in a moment."
+
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """``"20/min"`` -> ``(20, 60)``, as DRF throttle rates."""
+    num, period = str(rate).split("/")
+    return int(num), _PERIODS[period.strip()[0]]
+
+
+class Admission(NamedTuple):
+    allowed: bool
+    # Text to send back when this is the chat's first throttled update in the notice window
+    notice: Optional[str] = None
+
+
+class _LocalBuckets:
+    """Bounded LRU of in-process token buckets: key -> [tokens, last refill]."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = Lock()
+
+    def take(self, key: str, limit: int, duration: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(limit), now]
+                while len(self._buckets) > self.size:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(limit), bucket[0] + (now - bucket[1]) * limit / duration)
+                bucket[1] = now
+            if bucket[0] < 1:
+                return False
+            bucket[0] -= 1
+            return True
+
+
+class FloodGuard:
+    def __init__(self, lru_size: Optional[int] = None) -> None:
+        self._lru_size = lru_size
+        self._buckets = _LocalBuckets(self.lru_size)
+        self._vendors: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def lru_size(self) -> int:
+        return int(self._lru_size or getattr(settings, "TELEGRAM_FLOOD_LRU_SIZE", 10000))
+
+    def _rate(self, name: str, default: str) -> Optional[Tuple[int, int]]:
+        rate = getattr(settings, name, default)
+        return parse_rate(rate) if rate else None
+
+    def _take(self, key: str, rate: Optional[Tuple[int, int]]) -> bool:
+        if rate is None:
+            return True
+        limit, duration = rate
+        if not self._buckets.take(key, limit, duration):
+            return False
+        allowed, _ = acquire(cache, f"{KEY_PREFIX}{key}", limit, duration)
+        return allowed
+
+    def remember_vendor(self, chat_id: Any, vendor_id: Optional[int]) -> None:
+        """Record which vendor a chat talks to (called when its BotUser is loaded)."""
+        if vendor_id is None:
+            return
+        chat = str(chat_id)
+        with self._lock:
+            known = self._vendors.get(chat)
+            self._vendors[chat] = vendor_id
+            self._vendors.move_to_end(chat)
+            while len(self._vendors) > self.lru_size:
+                self._vendors.popitem(last=False)
+        if known != vendor_id:
+            try:
+                cache.set(f"{KEY_PREFIX}vendor_of:{chat}", vendor_id, timeout=86400)
+            except Exception:
+                pass
+
+    def vendor_for(self, chat_id: str) -> Optional[int]:
+        with self._lock:
+            vendor_id = self._vendors.get(chat_id)
+        if vendor_id is not None:
+            return vendor_id
+        try:
+            vendor_id = cache.get(f"{KEY_PREFIX}vendor_of:{chat_id}")
+        except Exception:
+            return None
+        if vendor_id is not None:
+            with self._lock:
+                self._vendors[chat_id] = vendor_id
+        return vendor_id
+
+    def admit(self, update: Dict[str, Any]) -> Admission:
+        chat_id = update_chat_key(update)
+        if chat_id.startswith("update:"):
+            # Not tied to a chat; nothing to key on
+            return Admission(True)
+        if not self._take(f"chat:{chat_id}", self._rate("TELEGRAM_FLOOD_CHAT_RATE", "20/min")):
+            metrics.inc("telegram_flood_chat_throttled_total")
+            return self._reject(chat_id, CHAT_NOTICE)
+        vendor_id = self.vendor_for(chat_id)
+        if vendor_id is not None and not self._take(f"vendor:{vendor_id}", self._rate("TELEGRAM_FLOOD_VENDOR_RATE", "600/min")):
+            metrics.inc("telegram_flood_vendor_throttled_total")
+            return self._reject(chat_id, VENDOR_NOTICE)
+        return Admission(True)
+
+    def _reject(self, chat_id: str, text: str) -> Admission:
+        metrics.inc("telegram_updates_throttled_total")
+        seconds = int(getattr(settings, "TELEGRAM_FLOOD_NOTICE_SECONDS", 30) or 30)
+        try:
+            first = cache.add(f"{KEY_PREFIX}notice:{chat_id}", 1, timeout=seconds)
+        except Exception:
+            first = False
+        if not first:
+            metrics.inc("telegram_updates_dropped_total")
+            return Admission(False)
+        return Admission(False, text)
+
+
+flood_guard = FloodGuard()
@@ -0,0 +1,89 @@
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer, orjson
+from vendora import compression
+
+
+def _order_page(rows: int):
+    """A paginated order list shaped like /api/v1/orders/ output."""
+    rnd = random.Random(7)
+    now = timezone.now()
+    results = []
+    for i in range(rows):
+        amount = Decimal(rnd.randint(1, 500_000)) / 100
+        rate = Decimal(rnd.randint(1_400_00, 1_600_00)) / 100
+        created = now - timedelta(minutes=i * 7)
+        results.append({
+            "id": i + 1,
+            "order_code": f"ORD-{rnd.getrandbits(32):08X}",
+            "vendor": 1,
+            "vendor_name": "Vendor One",
+            "vendor_email": "vendor@example.com",
+            "customer_chat_id": str(rnd.randint(10**8, 10**9)),
+            "customer_name": f"customer_{rnd.randint(1, 999)}",
+            "asset": rnd.choice(["USDT", "BTC", "ETH"]),
+            "type": rnd.choice(["buy", "sell"]),
+            "amount": f"{amount:.8f}",
+            "rate": f"{rate:.2f}",
+            "total_value": f"{amount * rate:.2f}",
+            "status": rnd.choice(["pending", "accepted", "completed"]),
+            "pay_instructions": "Bank: Example Bank\nAccount Name: Vendor One\nAccount Number: 0123456789\n",
+            "send_instructions": None,
+            "auto_expire_at": (created + timedelta(minutes=15)).isoformat().replace("+00:00", "Z"),
+            "rejection_reason": None,
+            "acceptance_note": None,
+            "accepted_at": None,
+            "declined_at": None,
+            "created_at": created.isoformat().replace("+00:00", "Z"),
+            "updated_at": created.isoformat().replace("+00:00", "Z"),
+            # Raw Decimal, as SerializerMethodFields return them
+            "fee": amount / 100,
+        })
+    return {"count": rows, "next": None, "previous": None, "results": results}
+
+
+def _time_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+class Command(BaseCommand):
+    help = "Measure API JSON render time and bytes on the wire (identity, gzip, br) for an order list page."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200, help="Rows per page (default 200)")
+        parser.add_argument("--repeat", type=int, default=50, help="Timing repetitions; best run is reported")
+
+    def handle(self, *args, **opts):
+        payload = _order_page(opts["rows"])
+        repeat = opts["repeat"]
+
+        stdlib, fast = JSONRenderer(), FastJSONRenderer()
+        body = stdlib.render(payload)
+        fast_body = fast.render(payload)
+        if fast_body != body:
+            self.stderr.write(self.style.ERROR("FastJSONRenderer output differs from JSONRenderer"))
+        self.stdout.write(f"Order page: {opts['rows']} rows, orjson {'available' if orjson else 'NOT installed'}")
+        self.stdout.write(f"  render JSONRenderer      {_time_ms(lambda: stdlib.render(payload), repeat):8.2f} ms")
+        self.stdout.write(f"  render FastJSONRenderer  {_time_ms(lambda: fast.render(payload), repeat):8.2f} ms")
+
+        self.stdout.write(f"  identity {len(body):>9} bytes")
+        encodings = ["gzip"] + (["br"] if compression.brotli is not None else [])
+        for enc in encodings:
+            compressed = compression.compress_bytes(body, enc)
+            ms = _time_ms(lambda: compression.compress_bytes(body, enc), repeat)
+            ratio = len(compressed) / len(body) if body else 0
+            self.stdout.write(f"  {enc:<8} {len(compressed):>9} bytes ({ratio:.1%}), {ms:.2f} ms to compress")
+        if compression.brotli is None:
+            self.stdout.write("  br       (brotli module not installed)")
@@ -0,0 +1,46 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from api.scheduler import Scheduler
+
+
+class Command(BaseCommand):
+    help = "Run scheduled lifecycle jobs (order/trial/plan expiry, account notices) in one process"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run every registered job once and exit (no leader election).",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="List registered jobs and exit.",
+        )
+
+    def handle(self, *args, **options):
+        scheduler = Scheduler()
+        if options.get("list"):
+            for j in scheduler.jobs.values():
+                kind = "deadline" if j.deadline else "interval"
+                self.stdout.write(f"{j.name:<24} every {int(j.interval)}s ({kind})")
+            return
+        if options.get("once"):
+            for j in scheduler.jobs.values():
+                ok = scheduler.run_job(j)
+                self.stdout.write(f"{j.name}: {'ok' if ok else 'failed'}")
+            return
+
+        stop = threading.Event()
+
+        def _stop(signum, frame):
+            stop.set()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+        self.stdout.write(self.style.SUCCESS(f"Scheduler starting with {len(scheduler.jobs)} jobs"))
+        scheduler.run_forever(stop)
+        self.stdout.write(self.style.WARNING("Scheduler stopped."))
@@ -1,5 +1,6 @@
 import json
 import os
+import threading
 import time
 from typing import Optional
 
@@ -10,7 +11,10 @@ from pathlib import Path
 
 
 class Command(BaseCommand):
-    help = "Poll Telegram updates (long-poll) and forward to local webhook handler. Works without public tunnel."
+    help = (
+        "Poll Telegram updates (long-poll) and dispatch them to the bot router in-process "
+        "(or forward to the local webhook with --dispatch http). Works without public tunnel."
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -34,7 +38,31 @@ class Command(BaseCommand):
             "--local-url",
             type=str,
             default="http://127.0.0.1:8000/api/v1/telegram/webhook/",
-            help="Local webhook URL to forward updates to.",
+            help="Local webhook URL to forward updates to (only used with --dispatch http).",
+        )
+        parser.add_argument(
+            "--dispatch",
+            choices=["inprocess", "http"],
+            default="inprocess",
+            help="inprocess: call the bot router directly through a worker pool (default). "
+                 "http: re-POST each update to --local-url.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Worker lanes for in-process dispatch; updates from one chat always share a lane (default 8).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Maximum updates requested per getUpdates call (Telegram caps this at 100).",
+        )
+        parser.add_argument(
+            "--no-scheduler",
+            action="store_true",
+            help="Do not run the job scheduler (expiries, notices) on a background thread.",
         )
 
     def handle(self, *args, **options):
@@ -67,47 +95,35 @@ class Command(BaseCommand):
         local_url = options["local_url"]
         interval = int(options["interval"]) or 0
         timeout = int(options["timeout"]) or 30
+        batch_size = max(1, min(100, int(options["batch_size"] or 100)))
+        in_process = options["dispatch"] == "inprocess"
+
+        dispatcher = None
+        if in_process:
+            from api.update_dispatcher import ChatOrderedDispatcher
+            from api.update_intake import reply_notice, take_update
+            # Same admission as the webhook; the slow-down notice is sent directly
+            dispatcher = ChatOrderedDispatcher(
+                lambda update: take_update(update, send_notice=reply_notice), workers=int(options["workers"])
+            )
+
+        stop = threading.Event()
+        if not options.get("no_scheduler"):
+            # Leader-elected, so this is safe alongside a dedicated run_scheduler process
+            from api.scheduler import Scheduler
+            threading.Thread(
+                target=Scheduler().run_forever, args=(stop,), name="scheduler", daemon=True
+            ).start()
 
         self.stdout.write(self.style.SUCCESS("Starting Telegram long-polling... (Ctrl+C to stop)"))
-        self.stdout.write(f"Forwarding updates to: {local_url}")
+        if in_process:
+            self.stdout.write(f"Dispatching updates in-process across {dispatcher.workers} lanes")
+        else:
+            self.stdout.write(f"Forwarding updates to: {local_url}")
 
         try:
-            last_expire_check = 0.0
             while True:
-                # Periodic auto-expire tick (every ~60s)
-                try:
-                    now_ts = time.time()
-                    if now_ts - last_expire_check >= 60:
-                        last_expire_check = now_ts
-                        try:
-                            from django.utils import timezone
-                            from orders.models import Order
-                            from api.telegram_service import TelegramBotService
-                            now = timezone.now()
-                            qs = Order.objects.filter(status=Order.PENDING, auto_expire_at__isnull=False, auto_expire_at__lt=now)
-                            for o in qs.iterator():
-                                o.status = Order.EXPIRED
-                                o.save(update_fields=["status"])
-                                # Ensure an 'expired' transaction exists for history/UI
-                                try:
-                                    from transactions.models import Transaction
-                                    Transaction._default_manager.get_or_create(order=o, defaults={"status": "expired"})
-                                except Exception:
-                                    pass
-                                try:
-                                    if o.customer_chat_id:
-                                        TelegramBotService().send_message(
-                                            f"⏰ Order {o.order_code or o.pk} has expired.",
-                                            chat_id=str(o.customer_chat_id),
-                                        )
-                                except Exception:
-                                    pass
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-
-                params = {"timeout": timeout}
+                params = {"timeout": timeout, "limit": batch_size}
                 if offset:
                     params["offset"] = offset
 
@@ -136,24 +152,36 @@ class Command(BaseCommand):
                         time.sleep(interval)
                     continue
 
-                for upd in updates:
-                    try:
-                        # Forward to local webhook handler for unified logic
-                        headers = {"Content-Type": "application/json"}
-                        if secret:
-                            headers["X-Telegram-Bot-Api-Secret-Token"] = secret
-                        # Short connect timeout to local server, modest read timeout
-                        requests.post(local_url, data=json.dumps(upd), headers=headers, timeout=(3, 8))
-                    except Exception as e:
-                        self.stderr.write(self.style.WARNING(f"Failed forwarding update: {e}"))
-
-                    # Advance offset
-                    try:
-                        update_id = int(upd.get("update_id"))
-                        offset = update_id + 1
-                        offset_file.write_text(str(offset))
-                    except Exception:
-                        pass
+                if dispatcher is not None:
+                    failures = dispatcher.run_batch(updates)
+                    if failures:
+                        self.stderr.write(self.style.WARNING(f"{failures} of {len(updates)} updates failed"))
+                else:
+                    self._forward_batch(updates, local_url, secret)
+
+                # Commit the offset once per batch, after every update in it was handled
+                try:
+                    offset = max(int(u.get("update_id")) for u in updates) + 1
+                    offset_file.write_text(str(offset))
+                except Exception:
+                    pass
 
         except KeyboardInterrupt:
             self.stdout.write(self.style.WARNING("Stopped polling."))
+        finally:
+            stop.set()
+            if dispatcher is not None:
+                dispatcher.shutdown()
+
+    def _forward_batch(self, updates, local_url: str, secret: str) -> None:
+        """Legacy mode: forward each update to the local webhook handler for unified logic."""
+        headers = {"Content-Type": "application/json"}
+        if secret:
+            headers["X-Telegram-Bot-Api-Secret-Token"] = secret
+        with requests.Session() as session:
+            for upd in updates:
+                try:
+                    # Short connect timeout to local server, modest read timeout
+                    session.post(local_url, data=json.dumps(upd), headers=headers, timeout=(3, 8))
+                except Exception as e:
+                    self.stderr.write(self.style.WARNING(f"Failed forwarding update: {e}"))
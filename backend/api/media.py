@@ -2,10 +2,12 @@ import mimetypes
 import os
 
 from django.conf import settings
-from django.http import FileResponse, Http404, HttpResponse
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect
 from django.utils._os import safe_join
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from .storage import presigned_download_url
+
 
 def _resolve_request_user(request):
     user = getattr(request, "user", None)
@@ -59,6 +61,13 @@ def serve_media_file(request, file_path: str):
     if not _is_authorized_media_path(user, normalized):
         return HttpResponse(status=403)
 
+    # Object storage: hand the client a short-lived URL instead of relaying bytes
+    presigned = presigned_download_url(normalized, filename=os.path.basename(normalized))
+    if presigned:
+        response = HttpResponseRedirect(presigned)
+        response["Cache-Control"] = "private, no-store"
+        return response
+
     try:
         absolute_path = safe_join(str(settings.MEDIA_ROOT), normalized)
     except Exception:
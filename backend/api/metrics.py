@@ -4,6 +4,8 @@ from django.utils import timezone
 from typing import Dict, Any
 from threading import Lock
 
+from vendora.db_router import replica_reads
+
 _metric_lock = Lock()
 _counters: Dict[str, int] = {
     'throttle_429_total': 0,
@@ -14,6 +16,11 @@ def inc(name: str, value: int = 1) -> None:
     with _metric_lock:
         _counters[name] = _counters.get(name, 0) + value
 
+def set_value(name: str, value: int) -> None:
+    with _metric_lock:
+        _counters[name] = value
+
+@replica_reads
 def metrics_view(request: HttpRequest) -> HttpResponse:
     secret = getattr(settings, 'METRICS_SECRET', None)
     if secret:
@@ -35,6 +42,8 @@ def metrics_view(request: HttpRequest) -> HttpResponse:
     now = timezone.now()
     with _metric_lock:
         counters_copy = dict(_counters)
+    from vendora.db_pool import pool_stats
+    counters_copy.update(pool_stats())
     try:
         vendors_total = Vendor.objects.count()
     except Exception:
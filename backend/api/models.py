@@ -23,3 +23,21 @@ class BotUser(models.Model):
         return f"BotUser {self.chat_id} -> {self.vendor.name if self.vendor else 'No Vendor'}"
 
 
+class UploadGrant(models.Model):
+    """A vendor's claim on a content-addressed object key, recorded when it was presigned.
+
+    Keys are derived from file digests, so knowing a key proves nothing; only
+    the vendor that was granted a key may attach it (``api.storage``).
+    """
+    vendor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="upload_grants")
+    key = models.CharField(max_length=255)
+    kind = models.CharField(max_length=32)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["vendor", "key"], name="uniq_upload_grant"),
+        ]
+
+    def __str__(self):
+        return f"UploadGrant {self.key} -> {self.vendor_id}"
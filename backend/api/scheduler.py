@@ -0,0 +1,237 @@
+"""In-process job scheduler for lifecycle work (expiries, notices).
+
+Jobs live in ``<app>/jobs.py`` and register themselves with ``@job``. One
+process per deployment runs them (``manage.py run_scheduler``, or embedded in
+``telegram_poll``); a Postgres advisory lock elects the leader so additional
+replicas simply stand by.
+
+Timers sit in a heap ordered by due time. Every job has a maximum ``interval``
+between runs; jobs with a ``deadline`` callback (e.g. the earliest pending
+``auto_expire_at``) are woken exactly at that moment instead of polling.
+Deadlines are re-read every ``SCHEDULER_RESCAN_SECONDS`` so rows created after
+the last run are picked up.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import heapq
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Never re-run a job sooner than this, even if its deadline is already past
+MIN_GAP_SECONDS = 1.0
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Any]
+    interval: float
+    deadline: Optional[Callable[[], Optional[datetime]]] = None
+
+
+class JobRegistry:
+    def __init__(self) -> None:
+        self._jobs: Dict[str, Job] = {}
+
+    def job(self, name: str, interval: float, deadline: Optional[Callable[[], Optional[datetime]]] = None):
+        """Register the decorated callable as a scheduled job."""
+        def decorator(func: Callable[[], Any]) -> Callable[[], Any]:
+            self._jobs[name] = Job(name=name, func=func, interval=float(interval), deadline=deadline)
+            return func
+        return decorator
+
+    def all(self) -> List[Job]:
+        return list(self._jobs.values())
+
+
+registry = JobRegistry()
+job = registry.job
+
+
+def autodiscover() -> None:
+    """Import ``jobs`` modules from every installed app so they register."""
+    from django.utils.module_loading import autodiscover_modules
+    autodiscover_modules("jobs")
+
+
+class LeaderLock:
+    """Session-level Postgres advisory lock held on a dedicated connection.
+
+    The lock lives as long as that connection, so it is kept apart from the
+    ORM connection jobs use (which ``close_old_connections`` may recycle).
+    Other databases (SQLite in development/tests) are treated as single-node.
+    """
+
+    def __init__(self, key: Optional[int] = None, alias: str = DEFAULT_DB_ALIAS) -> None:
+        self.key = int(key if key is not None else getattr(settings, "SCHEDULER_LOCK_KEY", 740_031))
+        self.alias = alias
+        self._conn: Any = None
+        self.held = False
+
+    def _supported(self) -> bool:
+        return connections[self.alias].vendor == "postgresql"
+
+    def acquire(self) -> bool:
+        if self.held:
+            return self.check()
+        if not self._supported():
+            self.held = True
+            return True
+        try:
+            if self._conn is None:
+                self._conn = connections.create_connection(self.alias)
+            with self._conn.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_lock(%s)", [self.key])
+                self.held = bool(cur.fetchone()[0])
+        except Exception as e:
+            logger.warning("Scheduler leader election failed: %s", e)
+            self._drop()
+        return self.held
+
+    def check(self) -> bool:
+        """Confirm the lock connection (and therefore the lock) is still alive."""
+        if not self.held or self._conn is None:
+            return self.held
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute("SELECT 1")
+        except Exception as e:
+            logger.warning("Scheduler lost its leader lock: %s", e)
+            self._drop()
+        return self.held
+
+    def release(self) -> None:
+        if self._conn is not None and self.held:
+            try:
+                with self._conn.cursor() as cur:
+                    cur.execute("SELECT pg_advisory_unlock(%s)", [self.key])
+            except Exception:
+                pass
+        self._drop()
+
+    def _drop(self) -> None:
+        self.held = False
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+
+class Scheduler:
+    def __init__(self, jobs: Optional[List[Job]] = None, lock: Optional[LeaderLock] = None,
+                 rescan: Optional[float] = None, clock: Callable[[], float] = time.time) -> None:
+        if jobs is None:
+            autodiscover()
+            jobs = registry.all()
+        self.jobs = {j.name: j for j in jobs}
+        self.lock = lock or LeaderLock()
+        self.rescan = float(rescan or getattr(settings, "SCHEDULER_RESCAN_SECONDS", 30) or 30)
+        self.clock = clock
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        self._next_rescan = 0.0
+
+    def _arm(self, job: Job, due: float) -> None:
+        self._due[job.name] = due
+        heapq.heappush(self._heap, (due, job.name))
+
+    def _deadline(self, job: Job) -> Optional[float]:
+        if job.deadline is None:
+            return None
+        try:
+            d = job.deadline()
+        except Exception as e:
+            logger.warning("Deadline lookup for %s failed: %s", job.name, e)
+            return None
+        return d.timestamp() if d is not None else None
+
+    def _plan(self, job: Job, now: float) -> float:
+        due = now + job.interval
+        deadline = self._deadline(job)
+        if deadline is not None:
+            due = min(due, max(deadline, now + MIN_GAP_SECONDS))
+        return due
+
+    def _refresh_deadlines(self, now: float) -> None:
+        for j in self.jobs.values():
+            deadline = self._deadline(j)
+            if deadline is not None and deadline < self._due.get(j.name, float("inf")):
+                self._arm(j, max(deadline, now))
+        self._next_rescan = now + self.rescan
+
+    def start(self) -> None:
+        """Arm every job to run immediately (catching up on anything overdue)."""
+        self._heap.clear()
+        self._due.clear()
+        now = self.clock()
+        for j in self.jobs.values():
+            self._arm(j, now)
+        self._next_rescan = now + self.rescan
+
+    def run_job(self, job: Job) -> bool:
+        """Run ``job`` once, recording per-job metrics. Returns False if it raised."""
+        close_old_connections()
+        started = time.monotonic()
+        ok = False
+        try:
+            result = job.func()
+            ok = True
+            if result:
+                logger.info("Scheduled job %s: %s", job.name, result)
+            metrics.set_value(f"scheduler_{job.name}_last_success_timestamp", int(time.time()))
+        except Exception as e:
+            metrics.inc(f"scheduler_{job.name}_failures_total")
+            logger.exception("Scheduled job %s failed: %s", job.name, e)
+        finally:
+            elapsed_ms = int((time.monotonic() - started) * 1000)
+            metrics.inc(f"scheduler_{job.name}_runs_total")
+            metrics.inc(f"scheduler_{job.name}_duration_ms_total", elapsed_ms)
+            metrics.set_value(f"scheduler_{job.name}_last_duration_ms", elapsed_ms)
+            close_old_connections()
+        return ok
+
+    def tick(self) -> float:
+        """Run every due job once; return seconds until the next timer fires."""
+        now = self.clock()
+        if now >= self._next_rescan:
+            self._refresh_deadlines(now)
+        while self._heap and self._heap[0][0] <= now:
+            due, name = heapq.heappop(self._heap)
+            if self._due.get(name) != due:
+                continue  # superseded by an earlier re-arm
+            job_ = self.jobs[name]
+            ok = self.run_job(job_)
+            now = self.clock()
+            # A failing job waits its full interval instead of chasing a past deadline
+            self._arm(job_, self._plan(job_, now) if ok else now + job_.interval)
+        next_due = self._heap[0][0] if self._heap else now + self.rescan
+        return max(0.0, min(next_due, self._next_rescan) - now)
+
+    def run_forever(self, stop: threading.Event, standby_interval: float = 15.0) -> None:
+        leading = False
+        try:
+            while not stop.is_set():
+                if not self.lock.acquire():
+                    if leading:
+                        logger.warning("Scheduler stepped down; another node holds the lock")
+                        leading = False
+                    stop.wait(standby_interval)
+                    continue
+                if not leading:
+                    logger.info("Scheduler elected leader; running %d jobs", len(self.jobs))
+                    leading = True
+                    self.start()
+                stop.wait(self.tick())
+        finally:
+            self.lock.release()
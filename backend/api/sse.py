@@ -11,6 +11,8 @@ import json
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from orders.models import Order
 from transactions.models import Transaction
+from vendora.db_pool import release_connections
+from vendora.db_router import use_replica
 
 
 def _resolve_request_user_from_auth_header(request):
@@ -98,12 +100,13 @@ def sse_stream(request):
 
     # capture initial markers
     def snapshot_marks():
-        last_order = Order.objects.filter(vendor_id=vendor_id).aggregate(
-            max_updated=Max("updated_at"), max_created=Max("created_at")
-        )
-        last_txn = Transaction.objects.filter(order__vendor_id=vendor_id).aggregate(
-            max_completed=Max("completed_at"), max_vendor_completed=Max("vendor_completed_at")
-        )
+        with use_replica(vendor_id):
+            last_order = Order.objects.filter(vendor_id=vendor_id).aggregate(
+                max_updated=Max("updated_at"), max_created=Max("created_at")
+            )
+            last_txn = Transaction.objects.filter(order__vendor_id=vendor_id).aggregate(
+                max_completed=Max("completed_at"), max_vendor_completed=Max("vendor_completed_at")
+            )
         # Use ISO strings or None
         def iso(dt):
             return dt.isoformat() if dt else None
@@ -142,6 +145,8 @@ def sse_stream(request):
             # keep-alive comment every iteration
             yield b": keep-alive\n\n"
 
+            # Pooled mode: don't hold a connection through the sleep
+            release_connections()
             sleep(poll_interval)
 
             current = snapshot_marks()
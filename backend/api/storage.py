@@ -0,0 +1,319 @@
+"""Object storage for user uploads (proofs, vendor proofs, avatars, receipts).
+
+``OBJECT_STORAGE_BACKEND=local`` keeps files on ``MEDIA_ROOT`` (development and
+tests). ``s3`` stores them in any S3-compatible bucket (AWS, MinIO, R2): the PWA
+PUTs bytes straight to a presigned URL, the media view answers with a presigned
+GET, and app workers only ever handle object keys.
+
+Uploads are content addressed (``<folder>/<sha256[:2]>/<sha256><ext>``), so the
+same receipt uploaded twice is stored once. Because a key only names content,
+presigning records an ``UploadGrant`` for the vendor, and a key can only be
+attached by a vendor holding a grant for it. The stored bytes are sniffed
+before the key is accepted, as the multipart path checks the file it receives.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import base64
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import File
+from django.core.files.storage import Storage, default_storage
+from django.utils.deconstruct import deconstructible
+
+DOCUMENT_TYPES = frozenset({"application/pdf", "image/jpeg", "image/png", "image/webp"})
+IMAGE_TYPES = frozenset({"image/jpeg", "image/png", "image/webp", "image/gif"})
+
+EXTENSIONS = {
+    "application/pdf": ".pdf",
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Leading bytes of each accepted type (WebP is RIFF....WEBP, checked separately)
+_MAGIC = (
+    (b"%PDF-", "application/pdf"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+@dataclass(frozen=True)
+class UploadKind:
+    folder: str
+    content_types: FrozenSet[str]
+    max_bytes_setting: str
+    default_max_bytes: int
+
+    @property
+    def max_bytes(self) -> int:
+        return int(getattr(settings, self.max_bytes_setting, self.default_max_bytes) or self.default_max_bytes)
+
+
+UPLOAD_KINDS: Dict[str, UploadKind] = {
+    "proof": UploadKind("proofs", DOCUMENT_TYPES, "TRANSACTION_PROOF_MAX_BYTES", 8 * 1024 * 1024),
+    "vendor_proof": UploadKind("vendor_proofs", DOCUMENT_TYPES, "TRANSACTION_PROOF_MAX_BYTES", 8 * 1024 * 1024),
+    "avatar": UploadKind("avatars", IMAGE_TYPES, "AVATAR_MAX_BYTES", 5 * 1024 * 1024),
+    "receipt": UploadKind("payment_receipts", DOCUMENT_TYPES, "PAYMENT_RECEIPT_MAX_BYTES", 5 * 1024 * 1024),
+}
+
+
+class UploadError(ValueError):
+    """Raised when a presign or attach request does not describe an acceptable upload."""
+
+
+def content_key(folder: str, digest: str, ext: str) -> str:
+    return f"{folder}/{digest[:2]}/{digest}{ext}"
+
+
+def _ext_for(content_type: str, filename: str = "") -> str:
+    if content_type in EXTENSIONS:
+        return EXTENSIONS[content_type]
+    return filename[filename.rfind('.'):].lower() if "." in filename else ""
+
+
+def _kind(kind: str) -> UploadKind:
+    try:
+        return UPLOAD_KINDS[kind]
+    except KeyError:
+        raise UploadError("Unknown upload kind.")
+
+
+@deconstructible
+class S3Storage(Storage):
+    """Minimal boto3-backed storage for S3-compatible object stores.
+
+    Names are used verbatim as object keys. ``url()`` keeps pointing at our own
+    media view so access checks stay in ``api.media``; that view redirects to
+    ``presigned_get_url()``.
+    """
+
+    def __init__(self, bucket_name: Optional[str] = None, endpoint_url: Optional[str] = None,
+                 region_name: Optional[str] = None, access_key: Optional[str] = None,
+                 secret_key: Optional[str] = None, url_ttl: Optional[int] = None) -> None:
+        self.bucket_name = bucket_name or getattr(settings, "OBJECT_STORAGE_BUCKET", "")
+        self.endpoint_url = endpoint_url or getattr(settings, "OBJECT_STORAGE_ENDPOINT_URL", "") or None
+        self.region_name = region_name or getattr(settings, "OBJECT_STORAGE_REGION", "") or None
+        self.access_key = access_key or getattr(settings, "OBJECT_STORAGE_ACCESS_KEY", "") or None
+        self.secret_key = secret_key or getattr(settings, "OBJECT_STORAGE_SECRET_KEY", "") or None
+        self.url_ttl = int(url_ttl or getattr(settings, "OBJECT_STORAGE_URL_TTL", 300) or 300)
+        self._client = None
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            if not self.bucket_name:
+                raise ImproperlyConfigured("OBJECT_STORAGE_BUCKET must be set for the s3 storage backend.")
+            try:
+                import boto3  # type: ignore
+                from botocore.config import Config  # type: ignore
+            except ImportError:
+                raise ImproperlyConfigured("boto3 is required for OBJECT_STORAGE_BACKEND=s3.")
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=self.endpoint_url,
+                region_name=self.region_name,
+                aws_access_key_id=self.access_key,
+                aws_secret_access_key=self.secret_key,
+                config=Config(signature_version="s3v4", s3={"addressing_style": "path" if self.endpoint_url else "auto"}),
+            )
+        return self._client
+
+    def _head(self, name: str) -> Optional[Dict[str, Any]]:
+        from botocore.exceptions import ClientError  # type: ignore
+        try:
+            return self.client.head_object(Bucket=self.bucket_name, Key=name)
+        except ClientError as e:
+            if str(e.response.get("Error", {}).get("Code")) in {"404", "NoSuchKey", "NotFound"}:
+                return None
+            raise
+
+    def _open(self, name: str, mode: str = "rb") -> File:
+        obj = self.client.get_object(Bucket=self.bucket_name, Key=name)
+        # Wrap the streaming body so large objects are never buffered whole
+        return File(obj["Body"], name=name)
+
+    def _save(self, name: str, content: Any) -> str:
+        if hasattr(content, "seek"):
+            content.seek(0)
+        extra = {}
+        content_type = getattr(content, "content_type", None)
+        if content_type:
+            extra["ContentType"] = content_type
+        self.client.upload_fileobj(content, self.bucket_name, name, ExtraArgs=extra or None)
+        return name
+
+    def get_available_name(self, name: str, max_length: Optional[int] = None) -> str:
+        # Content-addressed keys are safe to overwrite; never suffix them
+        return name
+
+    def exists(self, name: str) -> bool:
+        return self._head(name) is not None
+
+    def delete(self, name: str) -> None:
+        self.client.delete_object(Bucket=self.bucket_name, Key=name)
+
+    def listdir(self, path: str) -> Tuple[List[str], List[str]]:
+        prefix = f"{path.strip('/')}/" if path.strip("/") else ""
+        dirs: List[str] = []
+        files: List[str] = []
+        pages = self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket_name, Prefix=prefix, Delimiter="/")
+        for page in pages:
+            dirs += [p["Prefix"][len(prefix):].rstrip("/") for p in page.get("CommonPrefixes", [])]
+            files += [o["Key"][len(prefix):] for o in page.get("Contents", [])]
+        return dirs, files
+
+    def size(self, name: str) -> int:
+        head = self._head(name)
+        if head is None:
+            raise FileNotFoundError(name)
+        return int(head.get("ContentLength") or 0)
+
+    def read_head(self, name: str, length: int) -> bytes:
+        """First ``length`` bytes of an object, via a ranged GET."""
+        obj = self.client.get_object(Bucket=self.bucket_name, Key=name, Range=f"bytes=0-{length - 1}")
+        return obj["Body"].read()
+
+    def content_type(self, name: str) -> str:
+        head = self._head(name)
+        return str((head or {}).get("ContentType") or "")
+
+    def url(self, name: str) -> str:
+        return f"{settings.MEDIA_URL}{name}"
+
+    def presigned_get_url(self, name: str, filename: Optional[str] = None) -> str:
+        params: Dict[str, Any] = {"Bucket": self.bucket_name, "Key": name}
+        if filename:
+            params["ResponseContentDisposition"] = f'inline; filename="{filename}"'
+        return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=self.url_ttl)
+
+    def presigned_put(self, name: str, content_type: str, digest: str) -> Dict[str, Any]:
+        # Signing the SHA-256 checksum makes the store reject bytes that do not
+        # match the key, so a content-addressed object cannot be poisoned.
+        checksum = base64.b64encode(bytes.fromhex(digest)).decode("ascii")
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket_name,
+                "Key": name,
+                "ContentType": content_type,
+                "ChecksumSHA256": checksum,
+            },
+            ExpiresIn=self.url_ttl,
+        )
+        return {
+            "url": url,
+            "method": "PUT",
+            "headers": {"Content-Type": content_type, "x-amz-checksum-sha256": checksum},
+            "expires_in": self.url_ttl,
+        }
+
+
+def supports_direct_upload(storage: Any = None) -> bool:
+    return hasattr(storage or default_storage, "presigned_put")
+
+
+def presigned_download_url(name: str, filename: Optional[str] = None) -> Optional[str]:
+    """Presigned GET for ``name``, or None when the backend serves from local disk."""
+    fn = getattr(default_storage, "presigned_get_url", None)
+    if fn is None:
+        return None
+    return fn(name, filename=filename)
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Content type implied by a file's leading bytes, or None when unrecognised."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for magic, content_type in _MAGIC:
+        if head.startswith(magic):
+            return content_type
+    return None
+
+
+def _read_head(key: str, length: int = 16) -> bytes:
+    reader = getattr(default_storage, "read_head", None)
+    if reader is not None:
+        return reader(key, length)
+    with default_storage.open(key, "rb") as fh:
+        return fh.read(length)
+
+
+def presign_upload(vendor, kind: str, digest: str, content_type: str, size: int, filename: str = "") -> Dict[str, Any]:
+    """Grant ``vendor`` the upload's key and return a presigned PUT for it.
+
+    A fresh PUT is issued even when the object is already stored, so the
+    response never reveals what other vendors have uploaded. The signed
+    checksum makes re-uploading identical bytes harmless.
+    """
+    from .models import UploadGrant
+
+    spec = _kind(kind)
+    digest = str(digest or "").lower()
+    content_type = str(content_type or "").lower()
+    if not _SHA256_RE.match(digest):
+        raise UploadError("sha256 must be a hex-encoded SHA-256 digest.")
+    if content_type not in spec.content_types:
+        raise UploadError("Unsupported file type.")
+    if int(size or 0) <= 0:
+        raise UploadError("size is required.")
+    if int(size) > spec.max_bytes:
+        raise UploadError("File is too large.")
+    if not supports_direct_upload():
+        raise UploadError("Direct uploads are not enabled.")
+
+    key = content_key(spec.folder, digest, _ext_for(content_type, filename))
+    UploadGrant.objects.get_or_create(vendor=vendor, key=key, defaults={"kind": kind})
+    return {"key": key, "upload": default_storage.presigned_put(key, content_type, digest)}
+
+
+def validate_uploaded_key(kind: str, key: str, vendor) -> str:
+    """Check a client-supplied key is ``vendor``'s finished upload of ``kind``."""
+    from .models import UploadGrant
+
+    spec = _kind(kind)
+    key = str(key or "").lstrip("/")
+    parts = key.split("/")
+    digest = parts[-1].split(".", 1)[0] if parts else ""
+    if len(parts) != 3 or parts[0] != spec.folder or parts[1] != digest[:2] or not _SHA256_RE.match(digest):
+        raise UploadError("Invalid upload key.")
+    # Same answer for "not yours" and "not uploaded": keys are not an oracle
+    if not UploadGrant.objects.filter(vendor=vendor, key=key).exists() or not default_storage.exists(key):
+        raise UploadError("Upload not found.")
+    if default_storage.size(key) > spec.max_bytes:
+        default_storage.delete(key)
+        raise UploadError("File is too large.")
+    sniffed = sniff_content_type(_read_head(key))
+    if sniffed not in spec.content_types or not key.endswith(EXTENSIONS[sniffed]):
+        raise UploadError("Unsupported file type.")
+    return key
+
+
+def save_content_addressed(kind: str, file_obj: Any) -> str:
+    """Store an in-hand file under its content key and return the key.
+
+    Used where the bytes already reach the app (multipart fallback, Telegram
+    downloads). An existing object with the same digest is reused as-is.
+    """
+    spec = _kind(kind)
+    hasher = hashlib.sha256()
+    if hasattr(file_obj, "chunks"):
+        for chunk in file_obj.chunks():
+            hasher.update(chunk)
+    else:
+        file_obj.seek(0)
+        hasher.update(file_obj.read())
+    content_type = str(getattr(file_obj, "content_type", "") or "").lower()
+    key = content_key(spec.folder, hasher.hexdigest(), _ext_for(content_type, str(getattr(file_obj, "name", "") or "")))
+    if not default_storage.exists(key):
+        file_obj.seek(0)
+        default_storage.save(key, file_obj)
+    return key
@@ -0,0 +1,100 @@
+import json
+import pytest
+from decimal import Decimal
+
+from api.bot_router import BotRouter, PrefixTable, Reply
+
+
+class DummyTGS:
+    sent = []
+
+    def __init__(self, *args, **kwargs):
+        self.chat_id = None
+
+    def send_message(self, text, chat_id=None, reply_markup=None, **kwargs):
+        DummyTGS.sent.append((chat_id, text, reply_markup))
+        return {"success": True}
+
+
+@pytest.fixture()
+def tg(monkeypatch, settings):
+    settings.TELEGRAM_WEBHOOK_SECRET = "s3cret"
+    DummyTGS.sent = []
+    monkeypatch.setattr("api.telegram_service.TelegramBotService", DummyTGS)
+    return DummyTGS
+
+
+def _post(client, update):
+    from django.urls import reverse
+    return client.post(
+        reverse("telegram:webhook"),
+        json.dumps(update),
+        content_type="application/json",
+        HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN="s3cret",
+    )
+
+
+def test_prefix_table_prefers_longest_prefix():
+    table = PrefixTable()
+    table.add("cont_", "short")
+    table.add("cont_recv_", "long")
+    assert table.match("cont_recv_12") == "long"
+    assert table.match("cont_BTC_buy") == "short"
+    assert table.match("confirm_x") is None
+
+
+@pytest.mark.django_db
+def test_router_dispatches_commands_states_and_default():
+    router = BotRouter()
+
+    @router.command("ping")
+    def ping(ctx):
+        return Reply("pong:" + ctx.command_args)
+
+    routed = router.dispatch({"message": {"chat": {"id": 1}, "text": "/ping@VendoraBot hello"}})
+    assert routed == ("1", Reply("pong:hello", None))
+    # Unregistered commands fall back to the default reply
+    chat_id, reply = router.dispatch({"message": {"chat": {"id": 1}, "text": "/nope"}})
+    assert reply.text == router.default_reply
+    assert router.dispatch({"edited_message": {}}) is None
+
+
+@pytest.mark.django_db
+def test_webhook_start_links_vendor_and_order_status_by_code(client, tg):
+    from accounts.models import Vendor
+    from api.models import BotUser
+    from orders.models import Order
+
+    vendor = Vendor.objects.create(email="router@example.com", name="Router", external_vendor_id="routerv")
+    order = Order.objects.create(vendor=vendor, asset="BTC", type="buy", amount=Decimal("1"), rate=Decimal("10"))
+
+    assert _post(client, {"message": {"chat": {"id": 777}, "text": "/start vendor_routerv"}}).status_code == 200
+    bu = BotUser.objects.get(chat_id="777")
+    assert bu.vendor_id == vendor.id
+    assert "currently trading with routerv" in tg.sent[-1][1]
+
+    assert _post(client, {"callback_query": {"message": {"chat": {"id": 777}}, "data": "check_order"}}).status_code == 200
+    bu.refresh_from_db()
+    assert bu.state == "awaiting_order_status"
+
+    assert _post(client, {"message": {"chat": {"id": 777}, "text": order.order_code}}).status_code == 200
+    assert f"Order: {order.order_code}" in tg.sent[-1][1]
+    bu.refresh_from_db()
+    assert bu.state == ""
+
+
+@pytest.mark.django_db
+def test_webhook_continue_upload_callback_sets_proof_state(client, tg):
+    from accounts.models import Vendor
+    from api.models import BotUser
+    from orders.models import Order
+
+    vendor = Vendor.objects.create(email="router2@example.com", name="Router Two")
+    order = Order.objects.create(vendor=vendor, asset="BTC", type="buy", amount=Decimal("1"), rate=Decimal("10"))
+    BotUser.objects.create(chat_id="778", vendor=vendor)
+
+    assert _post(client, {"callback_query": {"message": {"chat": {"id": 778}}, "data": f"cont_upload_{order.id}"}}).status_code == 200
+    bu = BotUser.objects.get(chat_id="778")
+    assert bu.state == "awaiting_proof"
+    assert bu.temp_order_id == str(order.id)
+    assert "Router Two has accepted your order" in tg.sent[-1][1]
@@ -0,0 +1,102 @@
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from api.events import (
+    ORDER_ACCEPTED, ORDER_CREATED, QUERY_CREATED, TRANSACTION_COMPLETED, TRANSACTION_CREATED,
+    TRANSACTION_UPDATED, InMemoryEventBus, get_event_bus, parse_event_id,
+    reset_event_bus, vendor_group,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_bus():
+    reset_event_bus()
+    yield
+    reset_event_bus()
+
+
+def test_partitions_offsets_and_bounded_retention():
+    bus = InMemoryEventBus(maxlen=3, retention_seconds=60)
+    evs = [bus.publish(1, ORDER_CREATED, {"n": i}) for i in range(5)]
+    bus.publish(2, QUERY_CREATED, {})
+    ids = [parse_event_id(e.id) for e in evs]
+    assert ids == sorted(ids) and len(set(ids)) == 5
+
+    # Partition 1 keeps only its newest three; partition 2 is independent
+    assert [e.data["n"] for e in bus.read(1)] == [2, 3, 4]
+    assert [e.type for e in bus.read(2)] == [QUERY_CREATED]
+    assert [e.data["n"] for e in bus.read(1, after=evs[2].id)] == [3, 4]
+    assert bus.latest_id(1) == evs[4].id
+
+    # Offset still retained: complete replay. Trimmed away: caller must resync
+    assert bus.replay(1, evs[2].id) == (bus.read(1, after=evs[2].id), True)
+    missed, complete = bus.replay(1, evs[0].id)
+    assert not complete and [e.data["n"] for e in missed] == [2, 3, 4]
+    assert bus.replay(1, "garbage") == ([], False)
+
+    with pytest.raises(ValueError):
+        bus.publish(1, "order.teleported", {})
+
+
+def test_retention_window_expires_old_events(monkeypatch):
+    bus = InMemoryEventBus(maxlen=100, retention_seconds=10)
+    old = bus.publish(1, ORDER_CREATED, {})
+    monkeypatch.setattr(time, "time", lambda: old.ts + 11)
+    assert bus.read(1) == []
+    assert bus.replay(1, old.id) == ([], False)
+
+
+def test_publish_many_notifies_the_vendor_group_once():
+    layer = get_channel_layer()
+
+    async def subscribe_publish_receive():
+        channel = await layer.new_channel()
+        await layer.group_add(vendor_group(7), channel)
+        from asgiref.sync import sync_to_async
+        events = await sync_to_async(get_event_bus().publish_many)(7, [(ORDER_CREATED, {"id": 1}), (ORDER_ACCEPTED, {"id": 1})])
+        message = await layer.receive(channel)
+        await layer.group_discard(vendor_group(7), channel)
+        return events, message
+
+    events, message = async_to_sync(subscribe_publish_receive)()
+    assert message["type"] == "vendor.events"
+    assert [e["id"] for e in message["events"]] == [e.id for e in events]
+    assert [e["type"] for e in message["events"]] == [ORDER_CREATED, ORDER_ACCEPTED]
+
+
+@pytest.mark.django_db
+def test_order_lifecycle_publishes_on_commit(vendor_user, django_capture_on_commit_callbacks):
+    from orders.models import Order
+
+    with django_capture_on_commit_callbacks(execute=True):
+        order = Order.objects.create(vendor=vendor_user, asset="BTC", type="buy", amount=1, rate=100)
+        order.acceptance_note = "ok"
+        order.save(update_fields=["acceptance_note"])  # not a status change
+        order.status = Order.ACCEPTED
+        order.save(update_fields=["status"])
+    events = get_event_bus().read(vendor_user.id)
+    assert [e.type for e in events] == [ORDER_CREATED, ORDER_ACCEPTED]
+    assert events[1].data["id"] == order.pk and events[1].data["status"] == "accepted"
+
+
+@pytest.mark.django_db
+def test_transaction_changes_publish_on_commit(vendor_user, django_capture_on_commit_callbacks):
+    from orders.models import Order
+    from transactions.models import Transaction
+
+    order = Order.objects.create(vendor=vendor_user, asset="BTC", type="buy", amount=1, rate=100, status=Order.ACCEPTED)
+    reset_event_bus()
+    with django_capture_on_commit_callbacks(execute=True):
+        txn = Transaction.objects.create(order=order)
+        txn.customer_note = "sent"
+        txn.save(update_fields=["customer_note"])
+        txn.vendor_notified = True
+        txn.save(update_fields=["vendor_notified"])  # bookkeeping only
+        txn.status = "completed"
+        txn.save(update_fields=["status"])
+    events = get_event_bus().read(vendor_user.id)
+    assert [e.type for e in events] == [TRANSACTION_CREATED, TRANSACTION_UPDATED, TRANSACTION_COMPLETED]
+    assert events[0].data["order_code"] == order.order_code and events[-1].data["status"] == "completed"
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from api import metrics
+from api.flood_guard import CHAT_NOTICE, VENDOR_NOTICE, FloodGuard
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _update(update_id, chat_id, text="hi"):
+    return {"update_id": update_id, "message": {"message_id": update_id, "chat": {"id": chat_id}, "text": text}}
+
+
+def test_chat_flood_is_told_once_then_dropped(settings):
+    settings.TELEGRAM_FLOOD_CHAT_RATE = "3/min"
+    metrics.set_value("telegram_updates_dropped_total", 0)
+    guard = FloodGuard()
+    results = [guard.admit(_update(n, 555)) for n in range(6)]
+    assert [r.allowed for r in results] == [True, True, True, False, False, False]
+    assert [r.notice for r in results[3:]] == [CHAT_NOTICE, None, None]
+    assert metrics._counters["telegram_updates_dropped_total"] == 2
+    # Other chats are unaffected
+    assert guard.admit(_update(10, 777)).allowed
+
+
+def test_shared_bucket_holds_across_workers(settings):
+    settings.TELEGRAM_FLOOD_CHAT_RATE = "2/min"
+    first, second = FloodGuard(), FloodGuard()
+    assert first.admit(_update(1, 42)).allowed and first.admit(_update(2, 42)).allowed
+    # A second process has a full local bucket but the shared one is spent
+    assert not second.admit(_update(3, 42)).allowed
+
+
+def test_vendor_limit_spans_its_chats(settings):
+    settings.TELEGRAM_FLOOD_VENDOR_RATE = "3/min"
+    guard = FloodGuard()
+    for chat in (1, 2, 3, 4):
+        guard.remember_vendor(chat, 9)
+    assert [guard.admit(_update(n, chat)).allowed for n, chat in enumerate((1, 2, 3))] == [True, True, True]
+    rejected = guard.admit(_update(4, 4))
+    assert not rejected.allowed and rejected.notice == VENDOR_NOTICE
+    # The link is shared through the cache for workers that never loaded the chat
+    assert FloodGuard().vendor_for("4") == 9
+
+
+@pytest.mark.django_db
+def test_webhook_answers_flood_without_routing(client, settings, monkeypatch):
+    from api import update_intake
+
+    settings.TELEGRAM_WEBHOOK_SECRET = "s3cret"
+    settings.TELEGRAM_FLOOD_CHAT_RATE = "1/min"
+    monkeypatch.setattr(update_intake, "flood_guard", FloodGuard())
+    routed = []
+    monkeypatch.setattr(update_intake.bot_router, "process_update", lambda update: routed.append(update["update_id"]))
+    url = reverse("telegram:webhook")
+
+    def post(update):
+        return client.post(url, json.dumps(update), content_type="application/json", HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN="s3cret").json()
+
+    assert post(_update(9001, 321)) == {"status": "ok"}
+    assert post(_update(9002, 321)) == {"method": "sendMessage", "chat_id": "321", "text": CHAT_NOTICE}
+    assert post(_update(9003, 321)) == {"status": "throttled"}
+    assert routed == [9001]
+
+
+def test_poll_dispatch_applies_the_same_admission(settings, monkeypatch):
+    from api import update_intake
+    from api.update_dispatcher import ChatOrderedDispatcher
+    from vendora.request_context import get_context
+
+    settings.TELEGRAM_FLOOD_CHAT_RATE = "2/min"
+    monkeypatch.setattr(update_intake, "flood_guard", FloodGuard())
+    routed, notices = [], []
+    monkeypatch.setattr(
+        update_intake.bot_router, "process_update",
+        lambda update: routed.append((update["update_id"], get_context().get("update_id"))),
+    )
+    # As telegram_poll builds its dispatcher, with the notice sent through the Bot API
+    dispatcher = ChatOrderedDispatcher(
+        lambda update: update_intake.take_update(update, send_notice=lambda chat, text: notices.append((chat, text))),
+        workers=2,
+    )
+    try:
+        batch = [_update(n, 321) for n in range(8101, 8106)] + [_update(8101, 321)]
+        assert dispatcher.run_batch(batch) == 0
+    finally:
+        dispatcher.shutdown()
+    assert routed == [(8101, 8101), (8102, 8102)]
+    assert notices == [("321", CHAT_NOTICE)]
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.utils import timezone
+
+from api import metrics
+from api.scheduler import Job, LeaderLock, Scheduler
+
+
+class FakeClock:
+    def __init__(self, start=1_000_000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def no_connection_recycling(monkeypatch):
+    monkeypatch.setattr("api.scheduler.close_old_connections", lambda: None)
+
+
+def test_timers_wake_at_deadline_and_failures_back_off():
+    clock = FakeClock()
+    runs = []
+    deadline = {"at": clock.now + 5}
+
+    def expire():
+        runs.append(("expire", clock.now))
+        deadline["at"] = clock.now + 40
+
+    def broken():
+        runs.append(("broken", clock.now))
+        raise RuntimeError("boom")
+
+    jobs = [
+        Job("expire", expire, interval=3600,
+            deadline=lambda: datetime.fromtimestamp(deadline["at"], tz=dt_timezone.utc)),
+        Job("broken", broken, interval=20),
+    ]
+    before = dict(metrics._counters)
+    sched = Scheduler(jobs=jobs, lock=LeaderLock(), rescan=1000, clock=clock)
+    sched.start()
+    start = clock.now
+
+    # Both run at start; "expire" is re-armed for its deadline (+40), not its hour interval
+    assert sched.tick() == pytest.approx(20)
+    clock.now += 20
+    assert sched.tick() == pytest.approx(20)
+    clock.now += 20
+    sched.tick()
+    assert sorted(runs[:2]) == [("broken", start), ("expire", start)]
+    assert runs[2:] == [("broken", start + 20), ("broken", start + 40), ("expire", start + 40)]
+
+    assert metrics._counters["scheduler_broken_failures_total"] - before.get("scheduler_broken_failures_total", 0) == 3
+    assert metrics._counters["scheduler_expire_runs_total"] - before.get("scheduler_expire_runs_total", 0) == 2
+    assert "scheduler_expire_last_duration_ms" in metrics._counters
+
+
+def test_rescan_picks_up_earlier_deadlines():
+    clock = FakeClock()
+    runs = []
+    deadline = {"at": None}
+    job = Job("expire", lambda: runs.append(clock.now), interval=3600,
+              deadline=lambda: deadline["at"] and datetime.fromtimestamp(deadline["at"], tz=dt_timezone.utc))
+    sched = Scheduler(jobs=[job], lock=LeaderLock(), rescan=30, clock=clock)
+    sched.start()
+    assert sched.tick() == pytest.approx(30)
+
+    # A new row due in 10s appears; the next rescan re-arms the timer for it
+    deadline["at"] = clock.now + 40
+    clock.now += 30
+    assert sched.tick() == pytest.approx(10)
+    clock.now += 10
+    sched.tick()
+    assert len(runs) == 2
+
+
+@pytest.mark.django_db
+def test_account_expiry_jobs_are_set_based(django_user_model, django_assert_num_queries):
+    from django.core.cache import cache
+    from accounts.entitlements import _cache_key, get_entitlement
+    from accounts.jobs import expire_plans, expire_trials, next_trial_expiry
+
+    past = timezone.now() - timedelta(days=1)
+    future = timezone.now() + timedelta(days=1)
+    expired_trial = django_user_model.objects.create_user(email="t1@example.com", password="x", name="T1")
+    django_user_model.objects.filter(pk=expired_trial.pk).update(trial_expires_at=past)
+    live_trial = django_user_model.objects.create_user(email="t2@example.com", password="x", name="T2")
+    django_user_model.objects.filter(pk=live_trial.pk).update(trial_expires_at=future)
+    lapsed = django_user_model.objects.create_user(email="p1@example.com", password="x", name="P1")
+    django_user_model.objects.filter(pk=lapsed.pk).update(is_trial=False, plan="monthly", plan_expires_at=past)
+
+    trial_with_date = django_user_model.objects.create_user(email="t3@example.com", password="x", name="T3")
+    django_user_model.objects.filter(pk=trial_with_date.pk).update(trial_expires_at=future, plan_expires_at=past)
+    get_entitlement(lapsed.pk)
+    assert cache.get(_cache_key(lapsed.pk)) is not None
+
+    assert next_trial_expiry() == past
+    with django_assert_num_queries(2):
+        assert expire_trials() == 1
+    with django_assert_num_queries(2):
+        assert expire_plans() == 1
+    assert next_trial_expiry() == future
+
+    lapsed.refresh_from_db()
+    assert (lapsed.is_service_active, lapsed.plan) == (False, "monthly")
+    # .update() skips Vendor.save, so the job drops the cached snapshot itself
+    assert cache.get(_cache_key(lapsed.pk)) is None
+    trial_with_date.refresh_from_db()
+    assert trial_with_date.is_service_active is True
+    live_trial.refresh_from_db()
+    assert live_trial.is_service_active is True
+
+
+@pytest.mark.django_db
+def test_order_expiry_job_is_set_based_and_sends_notices_off_tick(
+    vendor_user, monkeypatch, django_assert_num_queries, django_capture_on_commit_callbacks,
+):
+    from orders import jobs
+    from orders.models import Order
+    from transactions.models import Transaction
+
+    past = timezone.now() - timedelta(minutes=1)
+    due = []
+    for n in range(5):
+        order = Order.objects.create(vendor=vendor_user, asset="USDT", type="buy", amount=1, rate=10, customer_chat_id=f"{700 + n}")
+        due.append(order)
+    Transaction.objects.create(order=due[0], status="uncompleted")
+    live = Order.objects.create(vendor=vendor_user, asset="USDT", type="buy", amount=1, rate=10)
+    Order.objects.filter(pk__in=[o.pk for o in due]).update(auto_expire_at=past)
+    Order.objects.filter(pk=live.pk).update(auto_expire_at=timezone.now() + timedelta(hours=1))
+
+    sent, published = [], []
+    monkeypatch.setattr(jobs, "_send_expiry_notices", lambda notices: sent.extend(notices))
+    monkeypatch.setattr("api.events.publish_events", lambda vendor_id, items: published.extend(items))
+
+    # Three chunks of savepoint, locked read, UPDATE, INSERT, re-read, release; nothing per row
+    with django_capture_on_commit_callbacks(execute=True):
+        with django_assert_num_queries(18):
+            assert jobs.expire_pending_orders(chunk_size=2) == 5
+    jobs._notice_pool().submit(lambda: None).result(timeout=5)
+
+    assert set(Order.objects.filter(status=Order.EXPIRED).values_list("pk", flat=True)) == {o.pk for o in due}
+    assert Order.objects.get(pk=live.pk).status == Order.PENDING
+    # The existing transaction is kept; the others get their "expired" history row
+    assert Transaction.objects.get(order=due[0]).status == "uncompleted"
+    assert Transaction.objects.filter(order__in=due[1:], status="expired").count() == 4
+    assert sorted(chat for chat, _ in sent) == [f"{700 + n}" for n in range(5)]
+    assert [t for t, _ in published] == ["order.expired"] * 5
+    assert jobs.expire_pending_orders() == 0
+
+
+@pytest.mark.django_db
+def test_expire_overdue_action_runs_the_job_for_the_vendor(auth_client, vendor_user, django_user_model, monkeypatch):
+    from orders import jobs
+    from orders.models import Order
+
+    monkeypatch.setattr(jobs, "_send_expiry_notices", lambda notices: None)
+    other = django_user_model.objects.create_user(email="other@example.com", password="x", name="O")
+    mine = Order.objects.create(vendor=vendor_user, asset="USDT", type="buy", amount=1, rate=10)
+    theirs = Order.objects.create(vendor=other, asset="USDT", type="buy", amount=1, rate=10)
+    Order.objects.filter(pk__in=[mine.pk, theirs.pk]).update(auto_expire_at=timezone.now() - timedelta(minutes=1))
+
+    resp = auth_client.post("/api/v1/orders/expire-overdue/")
+    assert resp.status_code == 200 and resp.json() == {"expired": 1}
+    assert Order.objects.get(pk=mine.pk).status == Order.EXPIRED
+    assert Order.objects.get(pk=theirs.pk).status == Order.PENDING
@@ -0,0 +1,134 @@
+import hashlib
+from decimal import Decimal
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from orders.models import Order
+from transactions.models import Transaction
+
+moto = pytest.importorskip("moto")
+
+PDF = b"%PDF-1.4 vendora test receipt"
+
+
+@pytest.fixture()
+def s3(settings):
+    import boto3
+
+    settings.OBJECT_STORAGE_BUCKET = "vendora-test"
+    settings.OBJECT_STORAGE_REGION = "us-east-1"
+    settings.OBJECT_STORAGE_ACCESS_KEY = "test"
+    settings.OBJECT_STORAGE_SECRET_KEY = "test"
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="vendora-test")
+        settings.STORAGES = {
+            **settings.STORAGES,
+            "default": {"BACKEND": "api.storage.S3Storage"},
+        }
+        yield client
+
+
+def _presign(client, digest, kind="vendor_proof"):
+    return client.post(
+        reverse("api_v1_presign_upload"),
+        {"kind": kind, "sha256": digest, "content_type": "application/pdf", "size": len(PDF), "filename": "r.pdf"},
+        format="json",
+    )
+
+
+def test_presign_is_disabled_on_local_storage(auth_client):
+    res = _presign(auth_client, hashlib.sha256(PDF).hexdigest())
+    assert res.status_code == 501
+
+
+def test_direct_upload_attach_dedup_and_presigned_get(auth_client, vendor_user, s3):
+    digest = hashlib.sha256(PDF).hexdigest()
+    res = _presign(auth_client, digest)
+    assert res.status_code == 200
+    body = res.json()
+    key = body["key"]
+    assert key == f"vendor_proofs/{digest[:2]}/{digest}.pdf"
+    assert body["upload"]["method"] == "PUT"
+    assert "x-amz-checksum-sha256" in body["upload"]["headers"]
+
+    # The browser PUTs the bytes straight to the bucket; presigning again
+    # still hands out a PUT rather than saying the object exists
+    s3.put_object(Bucket="vendora-test", Key=key, Body=PDF, ContentType="application/pdf")
+    again = _presign(auth_client, digest).json()
+    assert again["key"] == key and again["upload"]["method"] == "PUT"
+
+    order = Order.objects.create(vendor=vendor_user, asset="BTC", type=Order.BUY, amount=Decimal("1"), rate=Decimal("10"))
+    txn = Transaction.objects.create(order=order, status="uncompleted")
+    url = reverse("transactions:transaction-complete", args=[txn.id])
+    res = auth_client.post(url, {"vendor_proof_key": key}, format="json")
+    assert res.status_code == 200
+    txn.refresh_from_db()
+    assert txn.vendor_proof.name == key
+
+    # Keys outside the kind's folder are refused
+    res = auth_client.post(url, {"proof_key": key}, format="json")
+    assert res.status_code == 400
+
+    auth_client.force_login(vendor_user)
+    media = auth_client.get(reverse("api_v1_media_file", args=[key]))
+    assert media.status_code == 302
+    assert "X-Amz-Signature" in media["Location"]
+
+
+def test_multipart_uploads_are_content_addressed(auth_client, vendor_user, s3):
+    names = []
+    for _ in range(2):
+        order = Order.objects.create(vendor=vendor_user, asset="BTC", type=Order.BUY, amount=Decimal("1"), rate=Decimal("10"))
+        txn = Transaction.objects.create(order=order, status="uncompleted")
+        upload = SimpleUploadedFile("proof.pdf", PDF, content_type="application/pdf")
+        res = auth_client.post(reverse("transactions:transaction-complete", args=[txn.id]), {"proof": upload}, format="multipart")
+        assert res.status_code == 200
+        txn.refresh_from_db()
+        names.append(txn.proof.name)
+
+    assert names[0] == names[1]
+    assert s3.list_objects_v2(Bucket="vendora-test", Prefix="proofs/")["KeyCount"] == 1
+
+
+def _upload_for(client, vendor, s3, body=PDF, content_type="application/pdf"):
+    digest = hashlib.sha256(body).hexdigest()
+    key = _presign(client, digest).json()["key"]
+    s3.put_object(Bucket="vendora-test", Key=key, Body=body, ContentType=content_type)
+    order = Order.objects.create(vendor=vendor, asset="BTC", type=Order.BUY, amount=Decimal("1"), rate=Decimal("10"))
+    txn = Transaction.objects.create(order=order, status="uncompleted")
+    return key, reverse("transactions:transaction-complete", args=[txn.id])
+
+
+def test_keys_attach_only_for_the_vendor_that_presigned_them(auth_client, vendor_user, s3):
+    from accounts.models import Vendor
+    from rest_framework.test import APIClient
+
+    key, _ = _upload_for(auth_client, vendor_user, s3)
+    other = Vendor.objects.create_user(username="other", email="other@example.com", password="pass12345", name="Other")
+    other_client = APIClient()
+    other_client.force_authenticate(other)
+    order = Order.objects.create(vendor=other, asset="BTC", type=Order.BUY, amount=Decimal("1"), rate=Decimal("10"))
+    txn = Transaction.objects.create(order=order, status="uncompleted")
+    res = other_client.post(reverse("transactions:transaction-complete", args=[txn.id]), {"vendor_proof_key": key}, format="json")
+    assert res.status_code == 400 and res.json()["detail"] == "Upload not found."
+
+
+def test_stored_bytes_must_match_the_declared_type(auth_client, vendor_user, s3):
+    key, url = _upload_for(auth_client, vendor_user, s3, body=b"<html><script>alert(1)</script>")
+    res = auth_client.post(url, {"vendor_proof_key": key}, format="json")
+    assert res.status_code == 400 and res.json()["detail"] == "Unsupported file type."
+
+
+def test_listdir_lets_stale_receipts_be_discarded(s3):
+    from django.core.files.storage import default_storage
+    from transactions.receipts import discard_receipts
+
+    for name in ("receipts/7/a.pdf", "receipts/7/b.pdf", "receipts/70/c.pdf"):
+        s3.put_object(Bucket="vendora-test", Key=name, Body=PDF)
+    assert default_storage.listdir("receipts") == (["7", "70"], [])
+    discard_receipts(7, keep="receipts/7/b.pdf")
+    keys = [o["Key"] for o in s3.list_objects_v2(Bucket="vendora-test", Prefix="receipts/")["Contents"]]
+    assert keys == ["receipts/7/b.pdf", "receipts/70/c.pdf"]
@@ -0,0 +1,72 @@
+import json
+import pytest
+from django.core.cache import cache
+
+from api import metrics
+from api.update_dedup import UpdateDeduplicator
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_claim_rejects_repeats_from_lru_and_shared_cache():
+    first = UpdateDeduplicator(ttl=60, lru_size=2)
+    assert first.claim(100) is True
+    assert first.claim(100) is False
+    # Another worker with an empty LRU still sees the shared claim
+    other = UpdateDeduplicator(ttl=60, lru_size=2)
+    assert other.claim(100) is False
+    # Released claims can be processed again
+    first.release(100)
+    assert UpdateDeduplicator(ttl=60).claim(100) is True
+    # Updates without an id are never dropped
+    assert first.claim(None) is True and first.claim(None) is True
+
+
+def test_wrap_releases_claim_when_handler_fails():
+    dd = UpdateDeduplicator(ttl=60)
+    calls = []
+
+    def handler(update):
+        calls.append(update["update_id"])
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+
+    run = dd.wrap(handler)
+    with pytest.raises(RuntimeError):
+        run({"update_id": 5})
+    run({"update_id": 5})
+    run({"update_id": 5})
+    assert calls == [5, 5]
+
+
+@pytest.mark.django_db
+def test_webhook_acknowledges_retried_update_once(client, settings, monkeypatch):
+    from django.urls import reverse
+    settings.TELEGRAM_WEBHOOK_SECRET = "s3cret"
+    sent = []
+
+    class DummyTGS:
+        def __init__(self, *a, **k):
+            self.chat_id = None
+
+        def send_message(self, text, chat_id=None, reply_markup=None, **kwargs):
+            sent.append(text)
+            return {"success": True}
+
+    monkeypatch.setattr("api.telegram_service.TelegramBotService", DummyTGS)
+    before = dict(metrics._counters)
+    update = {"update_id": 987654, "message": {"chat": {"id": 5150}, "text": "/status"}}
+    for _ in range(3):
+        resp = client.post(
+            reverse("telegram:webhook"), json.dumps(update), content_type="application/json",
+            HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN="s3cret",
+        )
+        assert resp.status_code == 200
+    assert resp.json()["status"] == "duplicate"
+    assert len(sent) == 1
+    assert metrics._counters["telegram_updates_duplicate_total"] - before.get("telegram_updates_duplicate_total", 0) == 2
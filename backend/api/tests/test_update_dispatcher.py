@@ -0,0 +1,42 @@
+import threading
+import time
+
+from api.update_dispatcher import ChatOrderedDispatcher, update_chat_key
+
+
+def _msg(update_id, chat_id):
+    return {"update_id": update_id, "message": {"chat": {"id": chat_id}, "text": str(update_id)}}
+
+
+def test_update_chat_key_covers_messages_and_callbacks():
+    assert update_chat_key(_msg(1, 42)) == "42"
+    assert update_chat_key({"update_id": 2, "callback_query": {"message": {"chat": {"id": 7}}}}) == "7"
+    assert update_chat_key({"update_id": 3}) == "update:3"
+
+
+def test_run_batch_keeps_per_chat_order_and_runs_chats_concurrently():
+    seen = {}
+    lock = threading.Lock()
+    threads = set()
+
+    def handler(update):
+        time.sleep(0.01)
+        with lock:
+            chat = update["message"]["chat"]["id"]
+            seen.setdefault(chat, []).append(update["update_id"])
+            threads.add(threading.current_thread().name)
+        if update["update_id"] == 5:
+            raise RuntimeError("boom")
+
+    dispatcher = ChatOrderedDispatcher(handler, workers=4)
+    try:
+        batch = [_msg(i, chat) for i, chat in enumerate([1, 2, 3, 1, 2, 3, 1, 2, 3])]
+        failures = dispatcher.run_batch(batch)
+    finally:
+        dispatcher.shutdown()
+
+    assert failures == 1
+    assert seen[1] == [0, 3, 6]
+    assert seen[2] == [1, 4, 7]
+    assert seen[3] == [2, 5, 8]
+    assert len(threads) > 1
@@ -0,0 +1,116 @@
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.testing import WebsocketCommunicator
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.events import (
+    ORDER_ACCEPTED, ORDER_CREATED, PAYMENT_REQUEST_CHANGED, TRANSACTION_COMPLETED, TRANSACTION_CREATED,
+    get_event_bus, reset_event_bus,
+)
+
+FEED_URL = "/ws/vendor-feed/"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_bus():
+    reset_event_bus()
+    yield
+    reset_event_bus()
+
+
+def _application():
+    from vendora.asgi import application
+    return application
+
+
+async def _connect(user):
+    protocol = f"jwt.{AccessToken.for_user(user)}"
+    comm = WebsocketCommunicator(_application(), FEED_URL, subprotocols=[protocol])
+    connected, subprotocol = await comm.connect()
+    assert connected and subprotocol == protocol
+    return comm
+
+
+def _publish(vendor_id, *items):
+    return get_event_bus().publish_many(vendor_id, list(items))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feed_rejects_anonymous_connections():
+    async def run():
+        comm = WebsocketCommunicator(_application(), FEED_URL)
+        connected, code = await comm.connect()
+        return connected, code
+
+    assert async_to_sync(run)() == (False, 4001)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feed_coalesces_rapid_updates_into_view_deltas(vendor_user, settings):
+    settings.VENDOR_FEED_COALESCE_MS = 100
+
+    async def run():
+        comm = await _connect(vendor_user)
+        await comm.send_json_to({"action": "subscribe", "views": ["orders.pending"]})
+        subscribed = await comm.receive_json_from()
+        # Order 1 is created then accepted within the window; order 2 only created.
+        # Payment and transaction events are outside the view.
+        await sync_to_async(_publish)(vendor_user.id, (ORDER_CREATED, {"id": 1, "status": "pending"}))
+        await sync_to_async(_publish)(
+            vendor_user.id,
+            (ORDER_CREATED, {"id": 2, "status": "pending"}),
+            (PAYMENT_REQUEST_CHANGED, {"id": 9, "status": "approved"}),
+            (TRANSACTION_CREATED, {"id": 5, "status": "uncompleted"}),
+        )
+        last = await sync_to_async(_publish)(vendor_user.id, (ORDER_ACCEPTED, {"id": 1, "status": "accepted"}))
+        frame = await comm.receive_json_from(timeout=2)
+        assert await comm.receive_nothing(timeout=0.2)
+        await comm.disconnect()
+        return subscribed, frame, last[0]
+
+    subscribed, frame, last = async_to_sync(run)()
+    assert subscribed == {"type": "subscribed", "views": ["orders.pending"], "last_event_id": None}
+    assert frame["type"] == "deltas" and frame["last_event_id"] == last.id
+    assert [(d["id"], d["op"], d["event"]) for d in frame["deltas"]] == [
+        (2, "upsert", ORDER_CREATED),
+        (1, "remove", ORDER_ACCEPTED),
+    ]
+    assert frame["deltas"][1]["row"] == {"id": 1, "status": "accepted"}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_feed_resumes_from_last_event_id_or_asks_for_resync(vendor_user, settings):
+    settings.VENDOR_FEED_COALESCE_MS = 0
+    settings.EVENT_BUS_MAXLEN = 3
+    seen, missed, done = _publish(
+        vendor_user.id,
+        (TRANSACTION_CREATED, {"id": 7, "status": "uncompleted"}),
+        (TRANSACTION_CREATED, {"id": 8, "status": "uncompleted"}),
+        (TRANSACTION_COMPLETED, {"id": 7, "status": "completed"}),
+    )
+
+    async def run():
+        comm = await _connect(vendor_user)
+        await comm.send_json_to({"action": "subscribe", "views": ["transactions.uncompleted"], "last_event_id": seen.id})
+        subscribed = await comm.receive_json_from()
+        replayed = await comm.receive_json_from()
+        # Three more events trim everything the client had seen out of retention
+        await sync_to_async(_publish)(vendor_user.id, *[(TRANSACTION_CREATED, {"id": n, "status": "uncompleted"}) for n in (10, 11, 12)])
+        live = await comm.receive_json_from()
+        await comm.disconnect()
+
+        stale = await _connect(vendor_user)
+        await stale.send_json_to({"action": "subscribe", "views": ["transactions.uncompleted"], "last_event_id": done.id})
+        resync = await stale.receive_json_from()
+        await stale.send_json_to({"action": "subscribe", "views": ["nope"]})
+        error = await stale.receive_json_from()
+        await stale.disconnect()
+        return subscribed, replayed, live, resync, error
+
+    subscribed, replayed, live, resync, error = async_to_sync(run)()
+    assert subscribed["type"] == "subscribed"
+    assert [(d["id"], d["op"]) for d in replayed["deltas"]] == [(8, "upsert"), (7, "remove")]
+    assert replayed["last_event_id"] == done.id
+    assert [d["id"] for d in live["deltas"]] == [10, 11, 12]
+    assert resync["type"] == "resync" and resync["last_event_id"] == live["last_event_id"]
+    assert error["type"] == "error" and error["views"] == ["nope"]
@@ -0,0 +1,97 @@
+"""Idempotency guard for Telegram updates keyed by ``update_id``.
+
+Telegram re-delivers an update when our webhook answers slowly or fails, so
+the same "confirm" callback can arrive twice. ``claim`` marks an update as
+taken before dispatch: an in-process LRU answers repeats without any I/O, and
+``cache.add`` (atomic on Redis) makes the claim visible to every worker for
+``TELEGRAM_DEDUP_TTL`` seconds.
+"""
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "tg:update:"
+
+
+class UpdateDeduplicator:
+    def __init__(self, ttl: Optional[int] = None, lru_size: Optional[int] = None) -> None:
+        self._ttl = ttl
+        self._lru_size = lru_size
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def ttl(self) -> int:
+        return int(self._ttl or getattr(settings, "TELEGRAM_DEDUP_TTL", 86400))
+
+    @property
+    def lru_size(self) -> int:
+        return int(self._lru_size or getattr(settings, "TELEGRAM_DEDUP_LRU_SIZE", 10000))
+
+    def _remember(self, update_id: int) -> None:
+        with self._lock:
+            self._seen[update_id] = None
+            self._seen.move_to_end(update_id)
+            while len(self._seen) > self.lru_size:
+                self._seen.popitem(last=False)
+
+    def claim(self, update_id: Any) -> bool:
+        """Return True if this update should be processed, False if it was seen before."""
+        try:
+            uid = int(update_id)
+        except (TypeError, ValueError):
+            # Nothing to key on; let it through rather than drop it
+            return True
+        metrics.inc("telegram_updates_total")
+        with self._lock:
+            local_hit = uid in self._seen
+        if local_hit:
+            metrics.inc("telegram_updates_duplicate_total")
+            return False
+        try:
+            fresh = cache.add(f"{KEY_PREFIX}{uid}", 1, timeout=self.ttl)
+        except Exception as e:
+            # Shared store unavailable: fall back to the local LRU only
+            logger.warning("Update dedup cache unavailable: %s", e)
+            fresh = True
+        self._remember(uid)
+        if not fresh:
+            metrics.inc("telegram_updates_duplicate_total")
+        return bool(fresh)
+
+    def release(self, update_id: Any) -> None:
+        """Forget a claim so a retry of a failed update is processed again."""
+        try:
+            uid = int(update_id)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._seen.pop(uid, None)
+        try:
+            cache.delete(f"{KEY_PREFIX}{uid}")
+        except Exception:
+            pass
+
+    def wrap(self, handler: Callable[[Dict[str, Any]], Any]) -> Callable[[Dict[str, Any]], Any]:
+        """Decorate an update handler so duplicates are skipped and failures released."""
+        def run_once(update: Dict[str, Any]) -> Any:
+            update_id = update.get("update_id")
+            if not self.claim(update_id):
+                return None
+            try:
+                return handler(update)
+            except Exception:
+                self.release(update_id)
+                raise
+        return run_once
+
+
+dedup = UpdateDeduplicator()
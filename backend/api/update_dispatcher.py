@@ -0,0 +1,72 @@
+"""Concurrent, per-chat ordered execution of Telegram updates.
+
+Used by ``telegram_poll`` to process a ``getUpdates`` batch in-process. Each
+chat is pinned to one single-threaded lane so a customer's updates are handled
+in the order Telegram delivered them, while different chats run in parallel.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import logging
+import zlib
+
+from django.db import close_old_connections
+
+from vendora import request_context
+
+logger = logging.getLogger(__name__)
+
+
+def update_chat_key(update: Dict[str, Any]) -> str:
+    """Chat id an update belongs to; falls back to the update id for chatless updates."""
+    for kind in ("message", "edited_message", "channel_post"):
+        chat = (update.get(kind) or {}).get("chat") or {}
+        if chat.get("id") is not None:
+            return str(chat["id"])
+    cq = update.get("callback_query") or {}
+    chat = (cq.get("message") or {}).get("chat") or {}
+    if chat.get("id") is not None:
+        return str(chat["id"])
+    return f"update:{update.get('update_id')}"
+
+
+class ChatOrderedDispatcher:
+    """Fixed pool of single-worker lanes; updates for the same chat share a lane."""
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Any], workers: int = 8) -> None:
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self._lanes = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"tg-lane-{i}")
+            for i in range(self.workers)
+        ]
+
+    def _lane_for(self, chat_key: str) -> ThreadPoolExecutor:
+        return self._lanes[zlib.crc32(chat_key.encode("utf-8")) % self.workers]
+
+    def _run(self, update: Dict[str, Any]) -> Any:
+        close_old_connections()
+        try:
+            # Lane threads don't inherit a context; bind the update for log records
+            with request_context.bound(update_id=update.get("update_id")):
+                return self.handler(update)
+        finally:
+            close_old_connections()
+
+    def submit(self, update: Dict[str, Any]) -> Future:
+        return self._lane_for(update_chat_key(update)).submit(self._run, update)
+
+    def run_batch(self, updates: Iterable[Dict[str, Any]], timeout: Optional[float] = None) -> int:
+        """Process a batch and block until every update finished. Returns the failure count."""
+        futures: List[Future] = [self.submit(u) for u in updates]
+        done, not_done = wait(futures, timeout=timeout)
+        failures = len(not_done)
+        for fut in done:
+            exc = fut.exception()
+            if exc is not None:
+                failures += 1
+                logger.error("Telegram update failed: %s", exc)
+        return failures
+
+    def shutdown(self, wait_for_pending: bool = True) -> None:
+        for lane in self._lanes:
+            lane.shutdown(wait=wait_for_pending)
@@ -0,0 +1,63 @@
+"""Admission path shared by the Telegram webhook and ``telegram_poll``.
+
+Every update takes the same steps however it arrived: its ``update_id`` is
+bound into the logging context (``vendora.request_context``), repeats are
+dropped (``update_dedup``), flooding chats and vendors are turned away
+(``flood_guard``), and only then does the bot router run. A failed update
+releases its dedup claim so Telegram's retry is processed again.
+
+The webhook hands the slow-down notice back on its HTTP response; the poller
+has no response to ride on and passes ``send_notice`` to deliver it.
+"""
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from vendora import request_context
+
+from .bot_router import Reply, send_reply
+from .bot_routes import router as bot_router
+from .flood_guard import flood_guard
+from .update_dedup import dedup
+from .update_dispatcher import update_chat_key
+
+OK = "ok"
+DUPLICATE = "duplicate"
+THROTTLED = "throttled"
+
+
+class Intake(NamedTuple):
+    status: str  # OK / DUPLICATE / THROTTLED
+    # Slow-down text still to be delivered to ``chat_id`` (only without ``send_notice``)
+    notice: Optional[str] = None
+    chat_id: Optional[str] = None
+
+
+def reply_notice(chat_id: str, text: str) -> None:
+    send_reply(chat_id, Reply(text))
+
+
+def take_update(
+    update: Dict[str, Any],
+    process: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    send_notice: Optional[Callable[[str, str], Any]] = None,
+) -> Intake:
+    """Admit ``update`` and route it; ``process`` defaults to the bot router."""
+    update_id = update.get("update_id")
+    request_context.bind(update_id=update_id)
+    if not dedup.claim(update_id):
+        return Intake(DUPLICATE)
+
+    # Before any DB work
+    admission = flood_guard.admit(update)
+    if not admission.allowed:
+        chat_id = update_chat_key(update)
+        if admission.notice and send_notice is not None:
+            send_notice(chat_id, admission.notice)
+            return Intake(THROTTLED)
+        return Intake(THROTTLED, admission.notice, chat_id)
+
+    try:
+        (process or bot_router.process_update)(update)
+    except Exception:
+        dedup.release(update_id)
+        raise
+    return Intake(OK)
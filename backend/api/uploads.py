@@ -0,0 +1,40 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .storage import UploadError, presign_upload, supports_direct_upload
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def presign_upload_view(request):
+    """Issue a presigned PUT for a direct-to-storage upload.
+
+    Payload: { "kind": "proof|vendor_proof|avatar|receipt", "sha256": hex,
+    "content_type": str, "size": int, "filename": str? }
+
+    Returns the object ``key`` to attach afterwards (``vendor_proof_key``,
+    ``avatar_key``, ...) and the presigned ``upload``. Only the vendor that
+    presigned a key can attach it. Responds 501 on the local backend so clients
+    fall back to multipart.
+    """
+    if not supports_direct_upload():
+        return Response({'detail': 'Direct uploads are not enabled.'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    data = request.data
+    try:
+        size = int(data.get('size') or 0)
+    except (TypeError, ValueError):
+        return Response({'detail': 'size must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        result = presign_upload(
+            request.user,
+            str(data.get('kind') or ''),
+            str(data.get('sha256') or ''),
+            str(data.get('content_type') or ''),
+            size,
+            filename=str(data.get('filename') or ''),
+        )
+    except UploadError as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(result, status=status.HTTP_200_OK)
@@ -17,6 +17,8 @@ def relax_throttles(settings):
     settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = rates
     settings.THROTTLE_TRIAL_USER = '10000/min'
     settings.THROTTLE_USER = '10000/min'
+    settings.TELEGRAM_FLOOD_CHAT_RATE = '10000/min'
+    settings.TELEGRAM_FLOOD_VENDOR_RATE = '10000/min'
 
 @pytest.fixture()
 def api_client() -> APIClient:
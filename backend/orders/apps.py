@@ -4,3 +4,9 @@ from typing import ClassVar
 class OrdersConfig(AppConfig):
     default_auto_field: ClassVar[str] = 'django.db.models.BigAutoField'
     name: ClassVar[str] = 'orders'
+    def ready(self) -> None:
+        # import signals to register them
+        try:
+            import orders.signals  # noqa: F401
+        except Exception:
+            pass
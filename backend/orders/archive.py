@@ -0,0 +1,188 @@
+"""Order and transaction history archival.
+
+Finished orders (declined, expired, completed) whose last update is older
+than ``ORDER_ARCHIVE_AFTER_DAYS`` move, with their transaction, from
+``orders_order``/``transactions_transaction`` into the ``ArchivedOrder`` and
+``ArchivedTransaction`` tables. Rows keep their ids, codes and proof file
+paths. The hot tables, and so every vendor-scoped list, index and ``COUNT``,
+then hold only live and recent history. ``Order.objects`` and
+``Transaction.objects`` never touch the archive.
+
+``archive_batch`` moves one chunk per database transaction. The chunk's rows
+are re-checked and, where the backend supports it, locked with ``SKIP
+LOCKED``, so a row that is being edited is simply picked up by a later run.
+Locks last one chunk, never the whole job. Orders that a customer query
+still points at, or whose transaction is not finished, stay hot.
+
+Reads that must reach history use ``find_order`` / ``transaction_for``.
+Dashboard totals add ``archived_totals``, which is cached per vendor and
+refreshed whenever that vendor's rows move.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, cast
+import logging
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ArchivedOrder, Order
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_STATUSES = (Order.DECLINED, Order.EXPIRED, Order.COMPLETED)
+FINISHED_TRANSACTION_STATUSES = ("completed", "declined", "expired")
+TOTALS_KEY_PREFIX = "archive:totals:"
+
+_ORDER_FIELDS = [f.attname for f in ArchivedOrder._meta.concrete_fields if f.name != "archived_at"]
+
+
+def _transaction_fields():
+    from transactions.models import ArchivedTransaction
+
+    return [f.attname for f in ArchivedTransaction._meta.concrete_fields if f.name != "archived_at"]
+
+
+def archivable_orders(cutoff, vendor_id=None):
+    """Hot orders that may move to the archive (finished before ``cutoff``)."""
+    from transactions.models import Transaction
+
+    open_txn = Transaction.objects.exclude(status__in=FINISHED_TRANSACTION_STATUSES).values("order_id")
+    qs = (
+        cast(Any, Order).objects.filter(status__in=ARCHIVABLE_STATUSES, updated_at__lt=cutoff)
+        .exclude(pk__in=open_txn)
+        .exclude(query__isnull=False)
+    )
+    if vendor_id is not None:
+        qs = qs.filter(vendor_id=vendor_id)
+    return qs
+
+
+def default_cutoff(days: int):
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_batch(order_ids: Iterable[int], cutoff) -> Dict[Any, int]:
+    """Move one chunk; returns ``{vendor_id: orders moved}``."""
+    from transactions.models import ArchivedTransaction, Transaction
+
+    ids = list(order_ids)
+    if not ids:
+        return {}
+    now = timezone.now()
+    with transaction.atomic():
+        orders = list(
+            archivable_orders(cutoff).filter(pk__in=ids)
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("pk")
+            .values(*_ORDER_FIELDS)
+        )
+        if not orders:
+            return {}
+        moved_ids = [row["id"] for row in orders]
+        txn_fields = _transaction_fields()
+        txns = list(Transaction.objects.filter(order_id__in=moved_ids).values(*txn_fields))
+
+        ArchivedOrder.objects.bulk_create([ArchivedOrder(archived_at=now, **row) for row in orders])
+        ArchivedTransaction.objects.bulk_create([ArchivedTransaction(archived_at=now, **row) for row in txns])
+        # Raw deletes: no per-row signals or cascade collection; the only
+        # dependents (transactions) were copied above, and queries exclude the row
+        Transaction.objects.filter(order_id__in=moved_ids)._raw_delete(Transaction.objects.db)
+        Order.objects.filter(pk__in=moved_ids)._raw_delete(Order.objects.db)
+
+        per_vendor: Dict[Any, int] = {}
+        for row in orders:
+            per_vendor[row["vendor_id"]] = per_vendor.get(row["vendor_id"], 0) + 1
+        txn_ids = [row["id"] for row in txns]
+        transaction.on_commit(lambda: _after_move(per_vendor, txn_ids))
+    return per_vendor
+
+
+def _after_move(per_vendor: Dict[Any, int], transaction_ids=()) -> None:
+    from api.change_versions import ORDERS, TRANSACTIONS, bump
+    from transactions.receipts import discard_receipts_for
+
+    for vendor_id in per_vendor:
+        cache.delete(f"{TOTALS_KEY_PREFIX}{vendor_id}")
+        bump(vendor_id, ORDERS, TRANSACTIONS)
+    # Receipts are only served for hot transactions
+    discard_receipts_for(transaction_ids)
+
+
+def archive_orders(days: int, batch_size: int = 500, vendor_id=None, max_batches: Optional[int] = None, pause=None) -> int:
+    """Archive everything eligible in chunks of ``batch_size``; returns orders moved."""
+    cutoff = default_cutoff(days)
+    total = 0
+    last_id = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(
+            archivable_orders(cutoff, vendor_id).filter(pk__gt=last_id)
+            .order_by("pk").values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+        moved = archive_batch(ids, cutoff)
+        total += sum(moved.values())
+        batches += 1
+        if pause:
+            pause()
+    return total
+
+
+def find_order(**lookup):
+    """The hot ``Order`` matching ``lookup``, else its ``ArchivedOrder``; None if neither."""
+    order = cast(Any, Order).objects.filter(**lookup).first()
+    if order is None:
+        order = cast(Any, ArchivedOrder).objects.filter(**lookup).first()
+    return order
+
+
+def transaction_for(order):
+    """Transaction of a hot or archived order."""
+    from transactions.models import ArchivedTransaction, Transaction
+
+    model = ArchivedTransaction if isinstance(order, ArchivedOrder) else Transaction
+    return cast(Any, model).objects.filter(order=order).first()
+
+
+def _value_expression():
+    return Coalesce(
+        F("order__total_value"),
+        ExpressionWrapper(F("order__amount") * F("order__rate"), output_field=DecimalField(max_digits=40, decimal_places=4)),
+        output_field=DecimalField(max_digits=40, decimal_places=4),
+    )
+
+
+def archived_totals(vendor_id) -> Dict[str, Any]:
+    """Status counts, completed transactions and revenue held in the archive for a vendor."""
+    key = f"{TOTALS_KEY_PREFIX}{vendor_id}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    from transactions.models import ArchivedTransaction
+
+    counts = cast(Any, ArchivedOrder).objects.filter(vendor_id=vendor_id).aggregate(
+        declined=Count("id", filter=Q(status=Order.DECLINED)),
+        completed=Count("id", filter=Q(status=Order.COMPLETED)),
+    )
+    # Same "completed" test as the dashboard applies to hot transactions
+    completed = cast(Any, ArchivedTransaction).objects.filter(order__vendor_id=vendor_id).filter(
+        Q(status__iexact="completed") | Q(completed_at__isnull=False) | Q(vendor_completed_at__isnull=False)
+    )
+    agg = completed.aggregate(n=Count("id"), revenue=Sum(_value_expression()))
+    totals = {
+        "declined": counts["declined"] or 0,
+        "completed": counts["completed"] or 0,
+        "completed_transactions": agg["n"] or 0,
+        "revenue": Decimal(str(agg["revenue"] or 0)),
+    }
+    try:
+        cache.set(key, totals, timeout=None)
+    except Exception as e:
+        logger.warning("Archive totals cache failed for vendor %s: %s", vendor_id, e)
+    return totals
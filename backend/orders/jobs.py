@@ -0,0 +1,107 @@
+"""Scheduled order lifecycle jobs (see ``api.scheduler``)."""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import threading
+
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from api.scheduler import job
+from orders.models import Order
+
+logger = logging.getLogger(__name__)
+
+# Orders flipped per UPDATE; each chunk commits on its own
+EXPIRE_CHUNK_SIZE = 500
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _notice_pool() -> ThreadPoolExecutor:
+    """Single background sender, so Telegram latency never holds up the scheduler tick."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="order-notices")
+        return _pool
+
+
+def _send_expiry_notices(notices: List[Tuple[str, str]]) -> None:
+    from api.telegram_service import TelegramBotService
+    service = TelegramBotService()
+    for chat_id, code in notices:
+        try:
+            service.send_message(f"⏰ Order {code} has expired.", chat_id=chat_id)
+        except Exception as e:
+            logger.warning("Expiry notice for order %s failed: %s", code, e)
+
+
+def _after_expiry(orders: List[Any]) -> None:
+    """What ``Order.save`` signals would have done, plus the customer notices (on commit)."""
+    from api.change_versions import ORDERS, TRANSACTIONS, bump
+    from api.events import ORDER_EXPIRED, publish_events
+    from orders.signals import order_event_data
+
+    per_vendor: Dict[int, list] = {}
+    for order in orders:
+        per_vendor.setdefault(order.vendor_id, []).append((ORDER_EXPIRED, order_event_data(order)))
+    notices = [(str(o.customer_chat_id), str(o.order_code or o.pk)) for o in orders if o.customer_chat_id]
+
+    def run():
+        for vendor_id, events in per_vendor.items():
+            bump(vendor_id, ORDERS, TRANSACTIONS)
+            publish_events(vendor_id, events)
+        if notices:
+            _notice_pool().submit(_send_expiry_notices, notices)
+
+    transaction.on_commit(run)
+
+
+def _due_orders(now: datetime, vendor_id=None):
+    qs = Order.objects.filter(status=Order.PENDING, auto_expire_at__isnull=False, auto_expire_at__lte=now)
+    if vendor_id is not None:
+        qs = qs.filter(vendor_id=vendor_id)
+    return qs
+
+
+def next_order_expiry() -> Optional[datetime]:
+    """Earliest ``auto_expire_at`` among pending orders."""
+    return Order.objects.filter(status=Order.PENDING, auto_expire_at__isnull=False).aggregate(
+        due=Min("auto_expire_at")
+    )["due"]
+
+
+@job("expire_orders", interval=300, deadline=next_order_expiry)
+def expire_pending_orders(vendor_id=None, chunk_size: int = EXPIRE_CHUNK_SIZE) -> int:
+    """Expire pending orders past their auto_expire_at and notify customers.
+
+    Each chunk locks its due rows, flips them with one UPDATE and records the
+    "expired" transactions in one INSERT. Events, change versions and the
+    Telegram notices follow on commit.
+    """
+    from transactions.models import Transaction
+
+    now = timezone.now()
+    total = 0
+    while True:
+        with transaction.atomic():
+            pks = list(
+                _due_orders(now, vendor_id).order_by("auto_expire_at")
+                .select_for_update(skip_locked=True).values_list("pk", flat=True)[:chunk_size]
+            )
+            if not pks:
+                break
+            Order.objects.filter(pk__in=pks).update(status=Order.EXPIRED, updated_at=now)
+            # One history row per order, as before; orders that already have one keep it
+            Transaction._default_manager.bulk_create(
+                [Transaction(order_id=pk, status="expired") for pk in pks], ignore_conflicts=True,
+            )
+            _after_expiry(list(Order.objects.filter(pk__in=pks)))
+        total += len(pks)
+        if len(pks) < chunk_size:
+            break
+    return total
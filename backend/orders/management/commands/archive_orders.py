@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from orders.archive import archivable_orders, archive_orders, default_cutoff
+import time
+
+class Command(BaseCommand):
+    help = "Move finished orders (and their transactions) older than --days into the archive tables, in chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Archive declined/expired/completed orders not updated for this many days (default: ORDER_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Orders moved per database transaction (default: ORDER_ARCHIVE_BATCH_SIZE).",
+        )
+        parser.add_argument("--vendor", type=int, default=None, help="Only archive this vendor's orders.")
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many chunks.")
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Seconds to pause between chunks to spread load (default: 0).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only count what would be archived.")
+
+    def handle(self, *args, **options):
+        days = options.get("days")
+        if days is None:
+            days = int(getattr(settings, "ORDER_ARCHIVE_AFTER_DAYS", 180))
+        min_days = int(getattr(settings, "ORDER_ARCHIVE_MIN_DAYS", 30))
+        if days < min_days:
+            raise CommandError(f"--days must be at least {min_days} (dashboard insights read recent history from the hot tables).")
+        batch_size = max(1, int(options.get("batch_size") or getattr(settings, "ORDER_ARCHIVE_BATCH_SIZE", 500)))
+        vendor_id = options.get("vendor")
+
+        if options.get("dry_run"):
+            count = archivable_orders(default_cutoff(days), vendor_id).count()
+            self.stdout.write(self.style.WARNING(f"{count} orders older than {days} days would be archived."))
+            return
+
+        pause_seconds = float(options.get("sleep") or 0)
+        moved = archive_orders(
+            days,
+            batch_size=batch_size,
+            vendor_id=vendor_id,
+            max_batches=options.get("max_batches"),
+            pause=(lambda: time.sleep(pause_seconds)) if pause_seconds > 0 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved} orders older than {days} days."))
@@ -1,6 +1,5 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from orders.models import Order
+from orders.jobs import expire_pending_orders
 import time
 
 class Command(BaseCommand):
@@ -20,30 +19,7 @@ class Command(BaseCommand):
         )
 
     def expire_once(self) -> int:
-        now = timezone.now()
-        qs = Order.objects.filter(status=Order.PENDING, auto_expire_at__isnull=False, auto_expire_at__lte=now)
-        count = 0
-        for order in qs.iterator():
-            order.status = Order.EXPIRED
-            order.save(update_fields=["status"])
-            # create a transaction record for expired for list/history
-            try:
-                from transactions.models import Transaction
-                Transaction._default_manager.get_or_create(order=order, defaults={"status": "expired"})
-            except Exception:
-                pass
-            # try notify customer
-            try:
-                if order.customer_chat_id:
-                    from api.telegram_service import TelegramBotService
-                    TelegramBotService().send_message(
-                        f"⏰ Order {order.order_code or order.pk} has expired.",
-                        chat_id=str(order.customer_chat_id),
-                    )
-            except Exception:
-                pass
-            count += 1
-        return count
+        return expire_pending_orders()
 
     def handle(self, *args, **options):
         watch = bool(options.get("watch", False))
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_ord_vsc_idx_order_ord_sc_idx_order_ord_c_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_code', models.CharField(blank=True, max_length=32, unique=True)),
+                ('customer_chat_id', models.CharField(blank=True, max_length=64)),
+                ('customer_name', models.CharField(blank=True, max_length=100)),
+                ('pay_instructions', models.TextField(blank=True)),
+                ('send_instructions', models.TextField(blank=True)),
+                ('asset', models.CharField(max_length=50)),
+                ('type', models.CharField(choices=[('buy', 'Buy'), ('sell', 'Sell')], max_length=10)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('rate', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('total_value', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('declined', 'Declined'), ('expired', 'Expired'), ('completed', 'Completed')], default='pending', max_length=10)),
+                ('auto_expire_at', models.DateTimeField(blank=True, null=True)),
+                ('rejection_reason', models.TextField(blank=True)),
+                ('acceptance_note', models.TextField(blank=True)),
+                ('accepted_at', models.DateTimeField(blank=True, null=True)),
+                ('declined_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['vendor', 'created_at'], name='aord_vc_idx')],
+            },
+        ),
+    ]
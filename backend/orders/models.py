@@ -1,7 +1,9 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 # Create your models here.
-class Order(models.Model):
+class AbstractOrder(models.Model):
+    """Columns shared by live orders and their archive copies (``ArchivedOrder``)."""
     BUY = "buy"
     SELL = "sell"
     ORDER_TYPES = [(BUY, "Buy"), (SELL, "Sell")]
@@ -40,10 +42,16 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        abstract = True
+
+
+class Order(AbstractOrder):
     class Meta:
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["vendor", "status", "created_at"], name="ord_vsc_idx"),
+            models.Index(fields=["vendor", "created_at"], name="ord_vc_idx"),
             models.Index(fields=["status", "created_at"], name="ord_sc_idx"),
             models.Index(fields=["created_at"], name="ord_c_idx"),
             models.Index(fields=["auto_expire_at"], name="ord_exp_idx"),
@@ -111,4 +119,26 @@ class Order(models.Model):
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{str(self.type).upper()} {self.asset} @ {self.rate}"
\ No newline at end of file
+        return f"{str(self.type).upper()} {self.asset} @ {self.rate}"
+
+
+class ArchivedOrder(AbstractOrder):
+    """Terminal orders moved out of ``orders_order`` by ``orders.archive``.
+
+    Rows keep their original id and order_code. ``Order.objects`` never sees
+    them; use ``orders.archive.find_order`` for lookups that should reach
+    history.
+    """
+    # Copied as-is, not stamped on insert
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["vendor", "created_at"], name="aord_vc_idx"),
+        ]
+
+    def __str__(self):
+        return f"{str(self.type).upper()} {self.asset} @ {self.rate}"
@@ -1,4 +1,7 @@
+from decimal import Decimal
 from rest_framework import serializers
+
+from api.fast_lists import column_formatter
 from .models import Order
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -42,46 +45,146 @@ class OrderSerializer(serializers.ModelSerializer):
         # Ensure total_value is populated even for legacy rows
         try:
             if data.get("total_value") in (None, "", "null"):
-                from decimal import Decimal
-                amt = instance.amount
-                rt = instance.rate
-                if amt is not None and rt is not None:
-                    try:
-                        amt_d = amt if isinstance(amt, Decimal) else Decimal(str(amt))
-                        rt_d = rt if isinstance(rt, Decimal) else Decimal(str(rt))
-                        data["total_value"] = amt_d * rt_d
-                    except Exception:
-                        data["total_value"] = float(amt) * float(rt)
+                total = legacy_total(instance.amount, instance.rate)
+                if total is not None:
+                    data["total_value"] = total
         except Exception:
             pass
         # If instructions are empty, enrich from vendor defaults
         try:
-            if instance.type == Order.BUY and not instance.pay_instructions:
-                from accounts.models import BankDetail
-                bd = BankDetail._default_manager.filter(vendor=instance.vendor).order_by('-is_default','-created_at').first()
-                if bd:
-                    data["pay_instructions"] = (
-                        f"Bank: {bd.bank_name}\nAccount Name: {bd.account_name}\nAccount Number: {bd.account_number}\n"
-                        + (f"Instructions: {bd.instructions}" if bd.instructions else "")
-                    )
-                else:
-                    # Fallback to vendor's plain bank_details or rate.bank_details when no structured record exists
-                    try:
-                        vend_text = (getattr(instance.vendor, "bank_details", "") or "").strip()
-                        if vend_text:
-                            data["pay_instructions"] = vend_text
-                        else:
-                            from rates.models import Rate
-                            rate = Rate._default_manager.filter(vendor=instance.vendor, asset=instance.asset).first()
-                            if rate and rate.bank_details:
-                                data["pay_instructions"] = rate.bank_details
-                    except Exception:
-                        pass
-            if instance.type == Order.SELL and not instance.send_instructions:
-                from rates.models import Rate
-                rate = Rate._default_manager.filter(vendor=instance.vendor, asset=instance.asset).first()
-                if rate and rate.contract_address:
-                    data["send_instructions"] = rate.contract_address
+            row = {
+                "vendor": instance.vendor_id, "type": instance.type, "asset": instance.asset,
+                "pay_instructions": instance.pay_instructions, "send_instructions": instance.send_instructions,
+                "vendor__bank_details": getattr(instance.vendor, "bank_details", ""),
+            }
+            banks, rates = _instruction_defaults([row])
+            data["pay_instructions"], data["send_instructions"] = order_instructions(row, banks, rates)
         except Exception:
             pass
-        return data
\ No newline at end of file
+        return data
+
+# Columns and row builder for the fast list path (api.fast_lists)
+ORDER_LIST_COLUMNS = (
+    "id", "order_code", "vendor", "vendor__name", "vendor__email", "vendor__bank_details",
+    "customer_chat_id", "customer_name", "asset", "type", "amount", "rate", "total_value", "status",
+    "pay_instructions", "send_instructions", "auto_expire_at", "rejection_reason", "acceptance_note",
+    "accepted_at", "declined_at", "created_at", "updated_at",
+)
+
+
+def legacy_total(amount, rate):
+    """``amount * rate`` for legacy rows without a stored ``total_value``; None when either is missing."""
+    if amount is None or rate is None:
+        return None
+    try:
+        return (amount if isinstance(amount, Decimal) else Decimal(str(amount))) * (
+            rate if isinstance(rate, Decimal) else Decimal(str(rate))
+        )
+    except Exception:
+        return float(amount) * float(rate)
+
+
+def _instruction_defaults(rows):
+    """Default bank details and per-asset rates for the vendors in a page (two queries at most)."""
+    from accounts.models import BankDetail
+    from rates.models import Rate
+
+    buys = [r for r in rows if r["type"] == Order.BUY and not r["pay_instructions"]]
+    banks = {}
+    if buys:
+        needs_bank = {r["vendor"] for r in buys}
+        for bd in BankDetail._default_manager.filter(vendor_id__in=needs_bank).order_by("vendor_id", "-is_default", "-created_at"):
+            banks.setdefault(bd.vendor_id, bd)
+    # Rates are only the last fallback: skip them when nothing on the page gets that far
+    needs_rate = {r["vendor"] for r in buys if r["vendor"] not in banks and not (r["vendor__bank_details"] or "").strip()}
+    needs_rate |= {r["vendor"] for r in rows if r["type"] == Order.SELL and not r["send_instructions"]}
+    rates = {}
+    if needs_rate:
+        for rate in Rate._default_manager.filter(vendor_id__in=needs_rate).values("vendor_id", "asset", "bank_details", "contract_address"):
+            rates.setdefault((rate["vendor_id"], rate["asset"]), rate)
+    return banks, rates
+
+
+def order_instructions(row, banks, rates):
+    """(pay, send) instructions for an order row, falling back to the vendor's defaults when empty.
+
+    ``row`` carries the ``ORDER_LIST_COLUMNS`` fields used here; ``banks`` and
+    ``rates`` are the maps from ``_instruction_defaults``. Buy orders fall back
+    to the default bank detail, then the vendor's plain bank details, then the
+    asset rate's; sell orders to the rate's contract address.
+    """
+    pay, send = row["pay_instructions"], row["send_instructions"]
+    rate = rates.get((row["vendor"], row["asset"]))
+    if row["type"] == Order.BUY and not pay:
+        bd = banks.get(row["vendor"])
+        if bd:
+            pay = (
+                f"Bank: {bd.bank_name}\nAccount Name: {bd.account_name}\nAccount Number: {bd.account_number}\n"
+                + (f"Instructions: {bd.instructions}" if bd.instructions else "")
+            )
+        elif (row["vendor__bank_details"] or "").strip():
+            pay = row["vendor__bank_details"].strip()
+        elif rate and rate["bank_details"]:
+            pay = rate["bank_details"]
+    if row["type"] == Order.SELL and not send:
+        if rate and rate["contract_address"]:
+            send = rate["contract_address"]
+    return pay, send
+
+
+def order_list_rows(rows, serializer):
+    """``.values(*ORDER_LIST_COLUMNS)`` rows as OrderSerializer output."""
+    fmt = {name: column_formatter(serializer, name) for name in (
+        "amount", "rate", "total_value", "auto_expire_at", "accepted_at", "declined_at", "created_at", "updated_at",
+    )}
+    banks, rates = _instruction_defaults(rows)
+    out = []
+    for r in rows:
+        total_value = fmt["total_value"](r["total_value"])
+        if total_value is None and r["amount"] is not None and r["rate"] is not None:
+            # Legacy rows without a stored total (JSON number, as the serializer renders it)
+            total_value = float(legacy_total(r["amount"], r["rate"]))
+        pay, send = order_instructions(r, banks, rates)
+        out.append({
+            "id": r["id"],
+            "order_code": r["order_code"],
+            "vendor": r["vendor"],
+            "vendor_name": r["vendor__name"],
+            "vendor_email": r["vendor__email"],
+            "customer_chat_id": r["customer_chat_id"],
+            "customer_name": r["customer_name"],
+            "asset": r["asset"],
+            "type": r["type"],
+            "order_type": r["type"],
+            "amount": fmt["amount"](r["amount"]),
+            "rate": fmt["rate"](r["rate"]),
+            "total_value": total_value,
+            "status": r["status"],
+            "pay_instructions": pay,
+            "send_instructions": send,
+            "auto_expire_at": fmt["auto_expire_at"](r["auto_expire_at"]),
+            "rejection_reason": r["rejection_reason"],
+            "acceptance_note": r["acceptance_note"],
+            "accepted_at": fmt["accepted_at"](r["accepted_at"]),
+            "declined_at": fmt["declined_at"](r["declined_at"]),
+            "created_at": fmt["created_at"](r["created_at"]),
+            "updated_at": fmt["updated_at"](r["updated_at"]),
+        })
+    return out
+
+
+_CENTS = Decimal("0.01")
+
+# Streaming export (api.exports): hot and archived orders share these columns
+ORDER_EXPORT_COLUMNS = (
+    "id", "order_code", "created_at", "status", "type", "asset", "amount", "rate", "total_value",
+    "customer_name", "customer_chat_id", "accepted_at", "declined_at", "rejection_reason", "acceptance_note",
+)
+
+
+def order_export_rows(rows):
+    """Legacy orders without a stored total export ``amount * rate``, as the dashboard counts them."""
+    for r in rows:
+        if r["total_value"] is None and r["amount"] is not None and r["rate"] is not None:
+            r["total_value"] = (r["amount"] * r["rate"]).quantize(_CENTS)
+        yield r
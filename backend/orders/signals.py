@@ -0,0 +1,57 @@
+"""Publish order lifecycle events to the vendor event bus (``api.events``) and
+bump the vendor's change versions (``api.change_versions``)."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.change_versions import ORDERS, TRANSACTIONS, bump_on_commit
+from api.events import ORDER_ACCEPTED, ORDER_CREATED, ORDER_DECLINED, ORDER_EXPIRED, publish_event
+from .models import Order
+
+# Status transitions are saved with update_fields=[..., "status", ...]
+_STATUS_EVENTS = {
+    Order.ACCEPTED: ORDER_ACCEPTED,
+    Order.DECLINED: ORDER_DECLINED,
+    Order.EXPIRED: ORDER_EXPIRED,
+}
+
+
+def order_event_data(order) -> dict:
+    def iso(dt):
+        return dt.isoformat() if dt else None
+
+    return {
+        "id": order.pk,
+        "order_code": order.order_code,
+        "status": order.status,
+        "type": order.type,
+        "asset": order.asset,
+        "amount": str(order.amount),
+        "rate": str(order.rate),
+        "total_value": str(order.total_value) if order.total_value is not None else None,
+        "created_at": iso(order.created_at),
+        "accepted_at": iso(order.accepted_at),
+        "declined_at": iso(order.declined_at),
+    }
+
+
+@receiver(post_save, sender=Order)
+def publish_order_event(sender, instance: Order, created, update_fields=None, **kwargs):
+    if created:
+        event_type = ORDER_CREATED
+    elif update_fields and "status" in update_fields:
+        event_type = _STATUS_EVENTS.get(instance.status)
+    else:
+        return
+    if event_type is None:
+        return
+    vendor_id = instance.vendor_id
+    data = order_event_data(instance)
+    transaction.on_commit(lambda: publish_event(vendor_id, event_type, data))
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def bump_order_version(sender, instance: Order, **kwargs):
+    # Transaction rows render order fields as well
+    bump_on_commit(instance.vendor_id, ORDERS, TRANSACTIONS)
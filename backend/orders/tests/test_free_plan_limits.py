@@ -39,3 +39,14 @@ class FreePlanLimitTests(TestCase):
         resp = self.client.post(url, {}, format='json')
         self.assertEqual(resp.status_code, 403)
         self.assertIn("can't take any more orders", resp.json().get('detail',''))
+
+    def test_accept_does_not_swallow_quota_check_failures(self):
+        from unittest import mock
+        from django.db import DatabaseError
+        self.client.force_authenticate(user=self.vendor)
+        url = f"/api/v1/orders/{self.order.pk}/accept/"
+        with mock.patch.object(Vendor, 'can_accept_order', side_effect=DatabaseError("quota row unavailable")):
+            resp = self.client.post(url, {}, format='json')
+        self.assertEqual(resp.status_code, 500)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.PENDING)
@@ -2,16 +2,35 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import QuerySet
 from typing import Any, cast
+from api.change_versions import BANK_DETAILS, ORDERS, RATES, ConditionalListMixin
+from api.fast_lists import FastListMixin
+from .serializers import ORDER_EXPORT_COLUMNS, ORDER_LIST_COLUMNS, order_export_rows, order_list_rows
 from api.permissions import IsOwner, IsVendorAdmin
+from vendora.db_router import ReplicaListMixin
 from rest_framework import filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 from django.http import HttpResponse
 
+from accounts.entitlements import PLAN_EXPIRED, SUSPENDED, TRIAL_EXPIRED, entitlement_for
 
-class OrderViewSet(ModelViewSet):
+_CREATE_GATE_MESSAGES = {
+    SUSPENDED: "Service disabled. Contact support.",
+    TRIAL_EXPIRED: "Trial expired. Contact vendor to activate.",
+    PLAN_EXPIRED: "Subscription expired. Contact vendor to renew.",
+}
+_ACCEPT_GATE_MESSAGES = {
+    SUSPENDED: "Service disabled.",
+    TRIAL_EXPIRED: "Trial expired.",
+    PLAN_EXPIRED: "Subscription expired.",
+}
+
+class OrderViewSet(ConditionalListMixin, ReplicaListMixin, FastListMixin, ModelViewSet):
     permission_classes = [IsAuthenticated, IsOwner | IsVendorAdmin]
+    # Empty pay/send instructions are filled from bank details and rates (order_instructions)
+    etag_kinds = (ORDERS, RATES, BANK_DETAILS)
+    fast_list_columns = ORDER_LIST_COLUMNS
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["asset", "type", "status"]
     ordering_fields = ["created_at", "amount", "rate"]
@@ -38,32 +57,20 @@ class OrderViewSet(ModelViewSet):
 
         return OrderSerializer
 
+    def fast_list_rows(self, rows):
+        return order_list_rows(rows, self.get_serializer())
+
     def perform_create(self, serializer):
         # Set vendor from authenticated user
         vendor = self.request.user
-        # Manual gating
-        try:
-            from django.utils import timezone
-            now = timezone.now()
-            # Respect vendor availability toggle
-            if getattr(vendor, "is_available", True) is False:
-                from rest_framework.exceptions import PermissionDenied
-                msg = getattr(vendor, "unavailable_message", "Vendor is currently unavailable.") or "Vendor is currently unavailable."
-                raise PermissionDenied(msg)
-            if not getattr(vendor, "is_service_active", True):
-                from rest_framework.exceptions import PermissionDenied
-                raise PermissionDenied("Service disabled. Contact support.")
-            tea = getattr(vendor, "trial_expires_at", None)
-            if getattr(vendor, "is_trial", False) and tea and tea < now:
-                from rest_framework.exceptions import PermissionDenied
-                raise PermissionDenied("Trial expired. Contact vendor to activate.")
-            if getattr(vendor, "plan", "trial") not in {"trial", "perpetual"}:
-                pea = getattr(vendor, "plan_expires_at", None)
-                if pea and pea < now:
-                    from rest_framework.exceptions import PermissionDenied
-                    raise PermissionDenied("Subscription expired. Contact vendor to renew.")
-        except Exception:
-            pass
+        # Manual gating from the vendor's entitlement snapshot
+        from rest_framework.exceptions import PermissionDenied
+        ent = entitlement_for(vendor)
+        # Respect vendor availability toggle
+        if not ent.is_available:
+            raise PermissionDenied(ent.unavailable_message or "Vendor is currently unavailable.")
+        if not ent.active:
+            raise PermissionDenied(_CREATE_GATE_MESSAGES[ent.reason])
 
         order = serializer.save(vendor=vendor)
         # Only send a "New pending order" push if vendor is not using auto_accept
@@ -84,30 +91,15 @@ class OrderViewSet(ModelViewSet):
         if order.vendor != request.user and not request.user.is_staff:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
-        # Manual gating on accept
-        try:
-            vendor = request.user
-            # Enforce daily free-plan limits
-            try:
-                can_accept, msg = vendor.can_accept_order()
-                if not can_accept:
-                    return Response({"detail": msg}, status=status.HTTP_403_FORBIDDEN)
-            except Exception:
-                # If the helper fails for any reason, allow fallback to existing logic
-                pass
-            from django.utils import timezone
-            now = timezone.now()
-            if not getattr(vendor, "is_service_active", True):
-                return Response({"detail": "Service disabled."}, status=status.HTTP_403_FORBIDDEN)
-            tea = getattr(vendor, "trial_expires_at", None)
-            if getattr(vendor, "is_trial", False) and tea and tea < now:
-                return Response({"detail": "Trial expired."}, status=status.HTTP_403_FORBIDDEN)
-            if getattr(vendor, "plan", "trial") not in {"trial", "perpetual"}:
-                pea = getattr(vendor, "plan_expires_at", None)
-                if pea and pea < now:
-                    return Response({"detail": "Subscription expired."}, status=status.HTTP_403_FORBIDDEN)
-        except Exception:
-            pass
+        # Manual gating on accept: free-plan daily limit, then plan/service state.
+        # Failures here surface instead of silently letting the accept through.
+        vendor = request.user
+        can_accept, msg = vendor.can_accept_order()
+        if not can_accept:
+            return Response({"detail": msg}, status=status.HTTP_403_FORBIDDEN)
+        ent = entitlement_for(vendor)
+        if not ent.active:
+            return Response({"detail": _ACCEPT_GATE_MESSAGES[ent.reason]}, status=status.HTTP_403_FORBIDDEN)
 
         # Get acceptance note from request
         acceptance_note = request.data.get("acceptance_note", "")
@@ -259,32 +251,32 @@ class OrderViewSet(ModelViewSet):
     @action(detail=False, methods=["post"], url_path="expire-overdue")
     def expire_overdue(self, request):
         self.throttle_scope = 'order_write'
-        from django.utils import timezone
-        from .models import Order
+        from .jobs import expire_pending_orders
 
-        now = timezone.now()
         vendor = request.user
         if not vendor.is_authenticated:
             return Response({"detail": "Unauthorized"}, status=status.HTTP_401_UNAUTHORIZED)
-        qs = Order.objects.filter(vendor=vendor, status=Order.PENDING, auto_expire_at__isnull=False, auto_expire_at__lt=now)
-        updated = 0
-        for order in qs.iterator():
-            order.status = Order.EXPIRED
-            order.save(update_fields=["status"])
-            # Create a transaction entry for expired order
-            try:
-                from transactions.models import Transaction
-                Transaction._default_manager.get_or_create(order=order, defaults={"status": "expired"})
-            except Exception:
-                pass
-            # Notify customer via Telegram
-            try:
-                if order.customer_chat_id:
-                    from api.telegram_service import TelegramBotService
-                    TelegramBotService().send_message(f"⏰ Order {order.order_code or order.pk} has expired.", chat_id=str(order.customer_chat_id))
-            except Exception:
-                pass
-            updated += 1
+        updated = expire_pending_orders(vendor_id=vendor.pk)
         return Response({"expired": updated}, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """Stream the vendor's orders, archived history included, as CSV or NDJSON.
+
+        Query: ``?start=YYYY-MM-DD&end=YYYY-MM-DD`` (creation date, inclusive),
+        ``?status=`` and ``?fmt=csv|ndjson``. No status means every status.
+        """
+        from api.exports import export_response, filter_export, history_rows, parse_export_query
+        from .models import ArchivedOrder, Order
+
+        try:
+            start, end, status_param, fmt = parse_export_query(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        vendor = request.user
+        hot = filter_export(cast(Any, Order).objects.filter(vendor=vendor), start, end, status_param)
+        archived = filter_export(cast(Any, ArchivedOrder).objects.filter(vendor=vendor), start, end, status_param)
+        rows = history_rows(hot, archived, ORDER_EXPORT_COLUMNS)
+        return export_response(request, ORDER_EXPORT_COLUMNS, lambda: order_export_rows(rows()), "orders", fmt)
+
     # Order PDF endpoint removed per request
@@ -0,0 +1,40 @@
+"""Publish new customer queries to the vendor event bus (``api.events``) and
+bump the vendor's change versions (``api.change_versions``)."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.change_versions import QUERIES, bump_on_commit
+from api.events import QUERY_CREATED, publish_event
+from .models import Query
+
+
+@receiver(post_save, sender=Query)
+def publish_query_event(sender, instance: Query, created, **kwargs):
+    if not created:
+        return
+    vendor_id = instance.vendor_id or (instance.order.vendor_id if instance.order_id else None)
+    if vendor_id is None:
+        return
+    data = {
+        "id": instance.pk,
+        "order_id": instance.order_id,
+        "status": instance.status,
+        "message": instance.message,
+        "timestamp": instance.timestamp.isoformat() if instance.timestamp else None,
+    }
+    transaction.on_commit(lambda: publish_event(vendor_id, QUERY_CREATED, data))
+
+
+@receiver(post_save, sender=Query)
+@receiver(post_delete, sender=Query)
+def bump_query_version(sender, instance: Query, **kwargs):
+    # Listed for the direct vendor and for the vendor of the linked order
+    vendor_ids = {instance.vendor_id}
+    if instance.order_id:
+        try:
+            vendor_ids.add(instance.order.vendor_id)
+        except Exception:
+            pass
+    for vendor_id in vendor_ids - {None}:
+        bump_on_commit(vendor_id, QUERIES)
@@ -2,7 +2,9 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import QuerySet, Q
 from typing import Any, cast
+from api.change_versions import QUERIES, ConditionalListMixin
 from api.permissions import IsOwner, IsVendorAdmin
+from vendora.db_router import ReplicaListMixin
 from rest_framework import filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -10,8 +12,9 @@ from rest_framework import status
 from django.utils import timezone
 
 
-class QueryViewSet(ModelViewSet):
+class QueryViewSet(ConditionalListMixin, ReplicaListMixin, ModelViewSet):
     permission_classes = [IsAuthenticated, IsOwner | IsVendorAdmin]
+    etag_kinds = (QUERIES,)
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["message", "reply"]
     ordering_fields = ["timestamp"]
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from api.fast_lists import column_formatter
 from .models import Rate
 
 class RateSerializer(serializers.ModelSerializer):
@@ -24,3 +26,24 @@ class RateSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError("Sell rate must be positive.")
         return value
+
+
+# Columns and row builder for the fast list path (api.fast_lists)
+RATE_LIST_COLUMNS = ("id", "vendor", "asset", "buy_rate", "sell_rate", "contract_address", "bank_details")
+
+
+def rate_list_rows(rows, serializer):
+    """``.values(*RATE_LIST_COLUMNS)`` rows as RateSerializer output."""
+    buy, sell = column_formatter(serializer, "buy_rate"), column_formatter(serializer, "sell_rate")
+    return [
+        {
+            "id": r["id"],
+            "vendor": r["vendor"],
+            "asset": r["asset"],
+            "buy_rate": buy(r["buy_rate"]),
+            "sell_rate": sell(r["sell_rate"]),
+            "contract_address": r["contract_address"],
+            "bank_details": r["bank_details"],
+        }
+        for r in rows
+    ]
@@ -0,0 +1,12 @@
+"""Bump the vendor's rates change version (``api.change_versions``) on writes."""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.change_versions import RATES, bump_on_commit
+from .models import Rate
+
+
+@receiver(post_save, sender=Rate)
+@receiver(post_delete, sender=Rate)
+def bump_rate_version(sender, instance: Rate, **kwargs):
+    bump_on_commit(instance.vendor_id, RATES)
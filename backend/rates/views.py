@@ -2,12 +2,18 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import QuerySet
 from typing import Any, cast
+from api.change_versions import RATES, ConditionalListMixin
+from api.fast_lists import FastListMixin
+from .serializers import RATE_LIST_COLUMNS, rate_list_rows
 from api.permissions import IsOwner, IsVendorAdmin
+from vendora.db_router import ReplicaListMixin
 from rest_framework import filters
 
 
-class RateViewSet(ModelViewSet):
+class RateViewSet(ConditionalListMixin, ReplicaListMixin, FastListMixin, ModelViewSet):
     permission_classes = [IsAuthenticated, IsOwner | IsVendorAdmin]
+    etag_kinds = (RATES,)
+    fast_list_columns = RATE_LIST_COLUMNS
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["asset", "contract_address"]
     ordering_fields = ["asset"]
@@ -34,6 +40,9 @@ class RateViewSet(ModelViewSet):
 
         return RateSerializer
 
+    def fast_list_rows(self, rows):
+        return rate_list_rows(rows, self.get_serializer())
+
     def perform_create(self, serializer):
         # Gracefully handle duplicate asset per vendor returning 400 instead of 500
         from django.db import IntegrityError
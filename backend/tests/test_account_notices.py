@@ -0,0 +1,41 @@
+import pytest
+from django.core import mail
+from django.utils import timezone
+
+from accounts.mail_queue import deliver_queued_email
+from accounts.models import NotificationLog, OutboundEmail
+from accounts.notices import send_account_notices
+
+
+def _trial_vendor(django_user_model, i, expires_in_days):
+    v = django_user_model.objects.create_user(email=f"n{i}@example.com", password="pass1234", name=f"N{i}")
+    django_user_model.objects.filter(pk=v.pk).update(
+        is_trial=True, trial_expires_at=timezone.now() + timezone.timedelta(days=expires_in_days)
+    )
+    return v
+
+
+@pytest.mark.django_db
+def test_notices_are_set_based_chunked_and_idempotent(django_user_model, django_assert_max_num_queries):
+    for i in range(5):
+        _trial_vendor(django_user_model, i, 2)
+    expired = _trial_vendor(django_user_model, 99, -1)
+    NotificationLog.objects.create(vendor=expired, kind="trial_expired")
+
+    # Per kind: one anti-join per chunk (+1 empty probe); per chunk one transaction
+    # with a bulk insert of queued emails and one of log rows
+    with django_assert_max_num_queries(30):
+        counts = send_account_notices(chunk_size=2)
+    assert counts == {"trial_ending": 5, "trial_expired": 0, "plan_ending": 0, "plan_expired": 0}
+    assert OutboundEmail.objects.filter(status=OutboundEmail.PENDING).count() == 5
+    assert deliver_queued_email() == 5
+    assert len(mail.outbox) == 5
+    assert mail.outbox[0].subject == "Your trial is ending soon"
+    assert NotificationLog.objects.filter(kind="trial_ending").count() == 5
+
+    # Re-running (e.g. after an interrupted run) only picks up what was not logged
+    NotificationLog.objects.filter(vendor__email="n4@example.com").delete()
+    mail.outbox.clear()
+    assert send_account_notices(chunk_size=2)["trial_ending"] == 1
+    deliver_queued_email()
+    assert [m.to for m in mail.outbox] == [["n4@example.com"]]
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from orders.models import Order
+from transactions.models import Transaction
+
+URL = "/api/v1/accounts/analytics/"
+DAY = datetime(2026, 3, 2, 9, 0, tzinfo=dt_timezone.utc)  # a Monday
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _order(vendor, status, created, asset="USDT", amount=2, rate=100, accept_after=None):
+    order = Order.objects.create(vendor=vendor, asset=asset, type=Order.BUY, amount=amount, rate=rate, status=status)
+    accepted_at = created + accept_after if accept_after else None
+    Order.objects.filter(pk=order.pk).update(created_at=created, updated_at=created, accepted_at=accepted_at)
+    return order
+
+
+def _release(order, proof_at, done_at):
+    return Transaction.objects.create(
+        order=order, status="completed", proof_uploaded_at=proof_at, vendor_completed_at=done_at, completed_at=done_at,
+    )
+
+
+@pytest.fixture
+def history(vendor_user):
+    done = _order(vendor_user, Order.COMPLETED, DAY, accept_after=timedelta(seconds=60))
+    _release(done, DAY + timedelta(minutes=5), DAY + timedelta(minutes=15))
+    legacy = _order(vendor_user, Order.COMPLETED, DAY + timedelta(hours=3), amount=3, rate=7, accept_after=timedelta(seconds=120))
+    Order.objects.filter(pk=legacy.pk).update(total_value=None)
+    _release(legacy, DAY + timedelta(hours=4), DAY + timedelta(hours=4, minutes=30))
+    _order(vendor_user, Order.DECLINED, DAY + timedelta(days=1))
+    _order(vendor_user, Order.PENDING, DAY + timedelta(days=2), asset="BTC", amount=1, rate=1000)
+    _order(vendor_user, Order.COMPLETED, DAY - timedelta(days=40))  # outside the range
+
+
+@pytest.mark.django_db
+def test_daily_buckets_by_asset(auth_client, history):
+    data = auth_client.get(f"{URL}?start=2026-03-01&end=2026-03-07").json()
+    assert data["periods"][0] == "2026-03-01" and len(data["periods"]) == 7
+    monday = data["series"][0]
+    assert (monday["period"], monday["asset"]) == ("2026-03-02", "USDT")
+    assert monday["orders"] == 2 and monday["completed"] == 2
+    assert monday["volume"] == 5.0 and monday["revenue"] == 221.0
+    assert monday["avg_acceptance_seconds"] == 90.0
+    assert monday["avg_release_seconds"] == 1200.0
+    assert [(s["period"], s["asset"]) for s in data["series"][1:]] == [("2026-03-03", "USDT"), ("2026-03-04", "BTC")]
+    totals = data["totals"]
+    assert totals["orders"] == 4 and totals["by_status"]["declined"] == 1 and totals["by_status"]["pending"] == 1
+    assert totals["revenue"] == 221.0
+
+
+@pytest.mark.django_db
+def test_weekly_and_monthly_include_archive(auth_client, history, django_capture_on_commit_callbacks):
+    before = auth_client.get(f"{URL}?granularity=month&start=2026-01-01&end=2026-03-31").json()
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("archive_orders", "--days", "90")
+    after = auth_client.get(f"{URL}?granularity=month&start=2026-01-01&end=2026-03-31").json()
+    assert after["series"] == before["series"] and after["periods"] == ["2026-01-01", "2026-02-01", "2026-03-01"]
+    assert after["totals"]["orders"] == 5
+
+    week = auth_client.get(f"{URL}?granularity=week&start=2026-03-01&end=2026-03-08&asset=USDT").json()
+    assert week["periods"] == ["2026-02-23", "2026-03-02"]
+    assert [(s["period"], s["orders"]) for s in week["series"]] == [("2026-03-02", 3)]
+
+
+@pytest.mark.django_db
+def test_cached_until_orders_change(auth_client, vendor_user, history, django_assert_num_queries, django_capture_on_commit_callbacks):
+    url = f"{URL}?start=2026-03-01&end=2026-03-07"
+    first = auth_client.get(url)
+    with django_assert_num_queries(0):  # served from the cache
+        again = auth_client.get(url)
+    assert again.json() == first.json()
+    assert auth_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _order(vendor_user, Order.PENDING, DAY)
+    assert auth_client.get(url).json()["totals"]["orders"] == 5
+
+
+@pytest.mark.django_db
+def test_transaction_fields_do_not_multiply_order_rows(vendor_user, history):
+    from accounts.analytics import vendor_analytics
+
+    with CaptureQueriesContext(connection) as queries:
+        data = vendor_analytics(vendor_user.pk, DAY.date(), DAY.date(), "day")
+    # One statement per table pair; transactions are read through subqueries, never joined
+    assert len(queries) == 2
+    assert all("JOIN" not in q["sql"] for q in queries.captured_queries)
+    assert data["totals"]["orders"] == 2 and data["totals"]["completed"] == 2
+    assert data["totals"]["avg_release_seconds"] == 1200.0
+
+
+@pytest.mark.django_db
+def test_invalid_queries(auth_client):
+    assert auth_client.get(f"{URL}?granularity=year").status_code == 400
+    assert auth_client.get(f"{URL}?start=2026-03-05&end=2026-03-01").status_code == 400
+    assert auth_client.get(f"{URL}?start=2020-01-01&end=2026-01-01").status_code == 400
+    assert auth_client.get(f"{URL}?granularity=month&start=2020-01-01&end=2026-01-01").status_code == 200
+    default = auth_client.get(URL).json()
+    assert default["end"] == timezone.localdate().isoformat()
+    assert len(default["periods"]) == 30
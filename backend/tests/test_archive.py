@@ -0,0 +1,97 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from orders.archive import find_order, transaction_for
+from orders.models import ArchivedOrder, Order
+from queries.models import Query
+from transactions.models import ArchivedTransaction, Transaction
+
+DASHBOARD_URL = "/api/v1/accounts/dashboard-summary/"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _order(vendor, status, age_days, amount=2, rate=100):
+    order = Order.objects.create(vendor=vendor, asset="USDT", type=Order.BUY, amount=amount, rate=rate, status=status)
+    stamp = timezone.now() - timedelta(days=age_days)
+    Order.objects.filter(pk=order.pk).update(created_at=stamp, updated_at=stamp)
+    order.refresh_from_db()
+    return order
+
+
+@pytest.fixture
+def history(vendor_user):
+    old_done = _order(vendor_user, Order.COMPLETED, 200)
+    Transaction.objects.create(order=old_done, status="completed", completed_at=old_done.created_at, proof="proofs/old.png")
+    old_declined = _order(vendor_user, Order.DECLINED, 200)
+    Order.objects.filter(pk=old_declined.pk).update(total_value=None)
+    with_query = _order(vendor_user, Order.COMPLETED, 200)
+    Query.objects.create(order=with_query, vendor=vendor_user, message="where?")
+    open_txn = _order(vendor_user, Order.COMPLETED, 200)
+    Transaction.objects.create(order=open_txn, status="uncompleted")
+    recent = _order(vendor_user, Order.COMPLETED, 10, amount=1, rate=50)
+    Transaction.objects.create(order=recent, status="completed", completed_at=timezone.now())
+    old_pending = _order(vendor_user, Order.PENDING, 200)
+    return {
+        "moved": {old_done.pk, old_declined.pk},
+        "kept": {with_query.pk, open_txn.pk, recent.pk, old_pending.pk},
+        "old_done": old_done,
+    }
+
+
+@pytest.mark.django_db
+def test_archive_moves_finished_history_in_chunks(auth_client, history, django_capture_on_commit_callbacks):
+    before = auth_client.get(DASHBOARD_URL).json()["stats"]
+    etag = auth_client.get("/api/v1/orders/")["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("archive_orders", "--days", "90", "--batch-size", "1")
+
+    assert set(ArchivedOrder.objects.values_list("pk", flat=True)) == history["moved"]
+    assert set(Order.objects.values_list("pk", flat=True)) == history["kept"]
+    archived = ArchivedOrder.objects.get(pk=history["old_done"].pk)
+    assert archived.order_code == history["old_done"].order_code
+    assert archived.created_at == history["old_done"].created_at
+    txn = ArchivedTransaction.objects.get(order=archived)
+    assert txn.proof.name == "proofs/old.png" and not Transaction.objects.filter(order_id=archived.pk).exists()
+
+    # Totals include the archive; lists revalidate
+    assert auth_client.get(DASHBOARD_URL).json()["stats"] == before
+    assert auth_client.get("/api/v1/orders/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+    assert auth_client.get("/api/v1/orders/?status=completed").json()["count"] == 3
+
+    found = find_order(order_code__iexact=archived.order_code.lower())
+    assert isinstance(found, ArchivedOrder) and transaction_for(found).pk == txn.pk
+
+
+@pytest.mark.django_db
+def test_archive_dry_run_and_minimum_age(history, capsys):
+    call_command("archive_orders", "--days", "90", "--dry-run")
+    assert "2 orders" in capsys.readouterr().out
+    assert not ArchivedOrder.objects.exists()
+    with pytest.raises(CommandError):
+        call_command("archive_orders", "--days", "7")
+
+
+@pytest.mark.django_db
+def test_archived_revenue_uses_amount_times_rate_for_legacy_rows(vendor_user, django_capture_on_commit_callbacks):
+    from orders.archive import archived_totals
+
+    legacy = _order(vendor_user, Order.COMPLETED, 200, amount=3, rate=7)
+    Order.objects.filter(pk=legacy.pk).update(total_value=None)
+    Transaction.objects.create(order=legacy, status="completed")
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("archive_orders", "--days", "90")
+    totals = archived_totals(vendor_user.pk)
+    assert totals["revenue"] == Decimal("21") and totals["completed_transactions"] == 1
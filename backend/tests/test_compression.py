@@ -0,0 +1,101 @@
+import datetime
+import gzip
+import io
+import uuid
+import zlib
+from decimal import Decimal
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from orders.models import Order
+from vendora.compression import CompressionMiddleware, choose_encoding
+
+
+def test_fast_renderer_matches_drf_byte_for_byte():
+    aware = timezone.now().replace(microsecond=123456)
+    payload = {
+        "aware": aware,
+        "naive": datetime.datetime(2024, 1, 2, 3, 4, 5, 6),
+        "date": datetime.date(2024, 1, 2),
+        "time": datetime.time(4, 5, 6, 789),
+        "span": datetime.timedelta(seconds=90),
+        "decimal": Decimal("10.50"),
+        "lazy": gettext_lazy("Pending"),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "separator": "line\u2028break\u2029para",
+        "unicode": "Naira ₦ – ok",
+        1: "int key",
+        "nested": ({"x": [Decimal("1"), None, True, 1.5]},),
+        "big": 2**70,
+    }
+    assert FastJSONRenderer().render(payload) == JSONRenderer().render(payload)
+    # Indented (browsable API) output takes the stdlib path
+    ctx = {"indent": 2}
+    assert FastJSONRenderer().render({"a": 1}, "application/json", ctx) == JSONRenderer().render({"a": 1}, "application/json", ctx)
+
+
+def test_fast_parser_matches_drf_parser():
+    parser = FastJSONParser()
+    data = parser.parse(io.BytesIO(b'{"amount": "10.50", "rate": 1500.25, "big": 123456789012345678901234, "s": "\\u20a6"}'))
+    assert data == {"amount": "10.50", "rate": 1500.25, "big": 123456789012345678901234, "s": "₦"}
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"amount": NaN}'))
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b'{"amount": '))
+
+
+def test_encoding_negotiation():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("*") == "gzip"
+    assert choose_encoding("") is None
+
+
+def _run(response, accept="gzip", path="/api/v1/orders/"):
+    request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept)
+    return CompressionMiddleware(lambda req: response)(request)
+
+
+def test_middleware_compresses_large_json_only():
+    body = b'{"results": [' + b",".join(b'{"id": %d, "status": "pending"}' % i for i in range(200)) + b"]}"
+    resp = _run(HttpResponse(body, content_type="application/json"))
+    assert resp["Content-Encoding"] == "gzip" and "Accept-Encoding" in resp["Vary"]
+    assert int(resp["Content-Length"]) == len(resp.content) < len(body)
+    assert gzip.decompress(resp.content) == body
+
+    assert not _run(HttpResponse(b'{"ok": true}', content_type="application/json")).has_header("Content-Encoding")
+    assert not _run(HttpResponse(b"\x89PNG" * 1000, content_type="image/png")).has_header("Content-Encoding")
+    assert not _run(HttpResponse(body, content_type="application/json"), accept="identity").has_header("Content-Encoding")
+    # Token responses are not compressed (BREACH)
+    assert not _run(HttpResponse(body, content_type="application/json"), path="/api/v1/accounts/token/").has_header("Content-Encoding")
+
+
+def test_middleware_flushes_each_sse_event():
+    events = [f"id: {i}\nevent: order\ndata: {{\"id\": {i}}}\n\n" for i in range(3)]
+    resp = _run(StreamingHttpResponse(iter(events), content_type="text/event-stream"))
+    assert resp["Content-Encoding"] == "gzip"
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    received = []
+    for chunk in resp.streaming_content:
+        received.append(decoder.decompress(chunk).decode())
+    # Each event is decodable as soon as its chunk arrives
+    assert received[:3] == events
+
+
+@pytest.mark.django_db
+def test_api_list_is_compressed_end_to_end(auth_client, vendor_user):
+    for n in range(30):
+        Order.objects.create(vendor=vendor_user, asset="USDT", type=Order.BUY, amount=n + 1, rate=1500)
+    plain = auth_client.get("/api/v1/orders/")
+    resp = auth_client.get("/api/v1/orders/", HTTP_ACCEPT_ENCODING="gzip, br")
+    assert resp["Content-Encoding"] in ("gzip", "br")
+    if resp["Content-Encoding"] == "gzip":
+        assert gzip.decompress(resp.content) == plain.content
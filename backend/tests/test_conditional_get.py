@@ -0,0 +1,113 @@
+import pytest
+from django.core.cache import cache
+
+from accounts.models import BankDetail
+from orders.models import Order
+from queries.models import Query
+from rates.models import Rate
+
+ORDERS_URL = "/api/v1/orders/"
+DASHBOARD_URL = "/api/v1/accounts/dashboard-summary/"
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_order_list_revalidates_on_change_version(auth_client, vendor_user, django_assert_num_queries, django_capture_on_commit_callbacks):
+    first = auth_client.get(ORDERS_URL)
+    etag = first["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert first["Cache-Control"] == "private, no-cache"
+
+    # Unchanged: answered from the version counter alone
+    with django_assert_num_queries(0):
+        resp = auth_client.get(ORDERS_URL, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304 and resp["ETag"] == etag
+    # Other filters are other representations
+    assert auth_client.get(ORDERS_URL + "?status=accepted", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    # Writes to unrelated kinds leave the order ETag alone
+    with django_capture_on_commit_callbacks(execute=True):
+        Query.objects.create(vendor=vendor_user, message="hello?", contact="@c")
+    assert auth_client.get(ORDERS_URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Order.objects.create(vendor=vendor_user, asset="BTC", type="buy", amount=1, rate=100)
+    resp = auth_client.get(ORDERS_URL, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200 and resp["ETag"] != etag
+    assert len(resp.json()["results"]) == 1
+
+
+@pytest.fixture
+def instruction_orders(vendor_user, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        rate = Rate.objects.create(vendor=vendor_user, asset="USDT", buy_rate=10, sell_rate=9, contract_address="0xold")
+        sell = Order.objects.create(vendor=vendor_user, asset="USDT", type=Order.SELL, amount=1, rate=9)
+        buy = Order.objects.create(vendor=vendor_user, asset="USDT", type=Order.BUY, amount=1, rate=10)
+    return rate, sell, buy
+
+
+def _revalidated_row(auth_client, order, etag):
+    resp = auth_client.get(ORDERS_URL, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200 and resp["ETag"] != etag
+    return next(r for r in resp.json()["results"] if r["id"] == order.pk)
+
+
+@pytest.mark.django_db
+def test_order_list_revalidates_on_rate_change(auth_client, instruction_orders, django_capture_on_commit_callbacks):
+    rate, sell, _ = instruction_orders
+    etag = auth_client.get(ORDERS_URL)["ETag"]
+    with django_capture_on_commit_callbacks(execute=True):
+        rate.contract_address = "0xnew"
+        rate.save()
+    assert _revalidated_row(auth_client, sell, etag)["send_instructions"] == "0xnew"
+
+
+@pytest.mark.django_db
+def test_order_list_revalidates_on_bank_detail_change(auth_client, vendor_user, instruction_orders, django_capture_on_commit_callbacks):
+    _, _, buy = instruction_orders
+    etag = auth_client.get(ORDERS_URL)["ETag"]
+    with django_capture_on_commit_callbacks(execute=True):
+        bd = BankDetail.objects.create(vendor=vendor_user, bank_name="B1", account_number="001", account_name="V", is_default=True)
+    assert _revalidated_row(auth_client, buy, etag)["pay_instructions"].startswith("Bank: B1")
+
+    etag = auth_client.get(ORDERS_URL)["ETag"]
+    with django_capture_on_commit_callbacks(execute=True):
+        bd.delete()
+    assert not _revalidated_row(auth_client, buy, etag)["pay_instructions"]
+
+
+@pytest.mark.django_db
+def test_order_list_revalidates_on_vendor_bank_details(auth_client, vendor_user, instruction_orders):
+    _, _, buy = instruction_orders
+    etag = auth_client.get(ORDERS_URL)["ETag"]
+    vendor_user.bank_details = "Plain bank"
+    vendor_user.save(update_fields=["bank_details"])
+    assert _revalidated_row(auth_client, buy, etag)["pay_instructions"] == "Plain bank"
+
+
+@pytest.mark.django_db
+def test_dashboard_summary_revalidates(auth_client, vendor_user, django_capture_on_commit_callbacks):
+    etag = auth_client.get(DASHBOARD_URL)["ETag"]
+    assert auth_client.get(DASHBOARD_URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    with django_capture_on_commit_callbacks(execute=True):
+        Query.objects.create(vendor=vendor_user, message="hello?", contact="@c")
+    resp = auth_client.get(DASHBOARD_URL, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200 and resp.json()["stats"]["pending_queries"] == 1
+
+
+def test_evicted_version_restarts_above_previous_values():
+    from api import change_versions
+
+    before = change_versions.get_versions(7, [change_versions.RATES])[change_versions.RATES]
+    change_versions.bump(7, change_versions.RATES)
+    bumped = change_versions.get_versions(7, [change_versions.RATES])[change_versions.RATES]
+    assert bumped == before + 1
+    cache.clear()
+    change_versions.bump(7, change_versions.RATES)
+    assert change_versions.get_versions(7, [change_versions.RATES])[change_versions.RATES] > before
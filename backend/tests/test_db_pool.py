@@ -0,0 +1,40 @@
+import pytest
+
+from vendora import db_pool
+
+POOL_ARGS = dict(min_size=2, max_size=8, timeout=5, max_idle=60, max_lifetime=600)
+
+
+def _postgres():
+    return {"ENGINE": "django.db.backends.postgresql", "NAME": "vendora", "OPTIONS": {"sslmode": "require"}, "CONN_MAX_AGE": 60}
+
+
+def test_pool_options_replace_persistent_connections():
+    pytest.importorskip("psycopg_pool")
+    db = db_pool.apply_pool(_postgres(), **POOL_ARGS)
+    pool = db["OPTIONS"]["pool"]
+    assert db["OPTIONS"]["sslmode"] == "require"
+    assert (pool["min_size"], pool["max_size"], pool["timeout"]) == (2, 8, 5)
+    assert callable(pool["check"])
+    assert db["CONN_MAX_AGE"] == 0 and db["CONN_HEALTH_CHECKS"] is True
+
+
+def test_pool_is_skipped_without_psycopg3_or_postgres(monkeypatch):
+    sqlite = {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+    assert db_pool.apply_pool(dict(sqlite), **POOL_ARGS) == sqlite
+    monkeypatch.setattr(db_pool, "pool_available", lambda: False)
+    assert db_pool.apply_pool(_postgres(), **POOL_ARGS) == _postgres()
+
+
+class _Pool:
+    def get_stats(self):
+        return {"pool_size": 4, "pool_available": 1, "requests_waiting": 2, "requests_wait_ms": 130}
+
+
+@pytest.mark.django_db
+def test_pool_stats_reach_metrics(client, settings, monkeypatch):
+    settings.METRICS_SECRET = None
+    monkeypatch.setattr(db_pool, "_pool_of", lambda alias: _Pool() if alias == "default" else None)
+    assert db_pool.pool_stats()["db_pool_default_requests_wait_ms"] == 130
+    data = client.get("/metrics/").json()
+    assert data["counters"]["db_pool_default_requests_waiting"] == 2
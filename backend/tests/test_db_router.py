@@ -0,0 +1,98 @@
+import pytest
+from django.core.cache import cache
+
+from orders.models import Order
+from vendora import db_router
+from vendora.db_router import ReplicaRouter, use_replica
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = ["replica"]
+    settings.DATABASE_REPLICA_PIN_SECONDS = 5
+    settings.DATABASE_REPLICA_CHECK_SECONDS = 5
+    cache.clear()
+    db_router._health.clear()
+    db_router._pinned_locally.clear()
+    checks = []
+
+    def check(alias):
+        checks.append(alias)
+        return state["healthy"]
+
+    state = {"healthy": True, "checks": checks}
+    monkeypatch.setattr(db_router, "_check_replica", check)
+    yield state
+    db_router._health.clear()
+    db_router._pinned_locally.clear()
+    cache.clear()
+
+
+def test_only_marked_reads_use_a_replica(replicas):
+    router = ReplicaRouter()
+    assert router.db_for_read(Order) == "default"
+    with use_replica(vendor_id=1):
+        assert router.db_for_read(Order) == "replica"
+        # A write in the same block sends the rest of it to the primary
+        assert router.db_for_write(Order) == "default"
+        assert router.db_for_read(Order) == "default"
+
+
+def test_vendor_writes_pin_reads_to_primary_across_workers(replicas):
+    router = ReplicaRouter()
+    router.db_for_write(Order, instance=Order(vendor_id=7))
+    # Another process only sees the shared pin
+    db_router._pinned_locally.clear()
+    with use_replica(vendor_id=7):
+        assert router.db_for_read(Order) == "default"
+    with use_replica(vendor_id=8):
+        assert router.db_for_read(Order) == "replica"
+    cache.delete(f"{db_router.PIN_KEY_PREFIX}7")
+    with use_replica(vendor_id=7):
+        assert router.db_for_read(Order) == "replica"
+
+
+def test_change_version_bump_pins_vendor(replicas):
+    from api.change_versions import ORDERS, bump
+
+    bump(11, ORDERS)
+    assert db_router.is_pinned(11)
+
+
+def test_unhealthy_replica_falls_back_and_is_rechecked(replicas, settings):
+    router = ReplicaRouter()
+    replicas["healthy"] = False
+    with use_replica(vendor_id=1):
+        assert router.db_for_read(Order) == "default"
+    with use_replica(vendor_id=1):
+        assert router.db_for_read(Order) == "default"
+    # Checked once per interval, not per read
+    assert replicas["checks"] == ["replica"]
+    replicas["healthy"] = True
+    settings.DATABASE_REPLICA_CHECK_SECONDS = 0
+    with use_replica(vendor_id=1):
+        assert router.db_for_read(Order) == "replica"
+
+
+def test_without_replicas_nothing_changes(settings):
+    settings.DATABASE_REPLICAS = []
+    with use_replica(vendor_id=1):
+        assert db_router._state.get() is None
+
+
+@pytest.mark.django_db
+def test_list_views_read_inside_replica_block(auth_client, vendor_user, replicas, settings, monkeypatch):
+    settings.DATABASE_ROUTERS = ["vendora.db_router.ReplicaRouter"]
+    seen = []
+
+    def read_alias(state):
+        seen.append(state["vendor_id"])
+        return "default"
+
+    monkeypatch.setattr(db_router, "_read_alias", read_alias)
+    assert auth_client.get("/api/v1/orders/").status_code == 200
+    assert seen and set(seen) == {vendor_user.pk}
+    seen.clear()
+    # Writes are not replica reads
+    auth_client.post("/api/v1/rates/", {"asset": "USDT", "buy_rate": "1", "sell_rate": "1"}, format="json")
+    assert seen == []
@@ -0,0 +1,104 @@
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from accounts.entitlements import (
+    PLAN_EXPIRED, SUSPENDED, TRIAL_EXPIRED, Entitlement, entitlement_for, get_entitlement, invalidate_entitlements,
+)
+from accounts.models import Vendor
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _vendor(**fields):
+    v = Vendor.objects.create_user(email="ent@example.com", password="pw", name="Ent")
+    Vendor.objects.filter(pk=v.pk).update(**fields)
+    v.refresh_from_db()
+    return v
+
+
+@pytest.mark.django_db
+def test_snapshot_reasons_and_valid_until():
+    now = timezone.now()
+    trial_end = now + timezone.timedelta(minutes=2)
+    v = _vendor(is_trial=True, plan="trial", trial_expires_at=trial_end)
+    ent = Entitlement.from_vendor(v, now)
+    assert ent.active and ent.reason == ""
+    # The snapshot expires exactly when the trial does
+    assert ent.expires_at == trial_end and ent.valid_until == trial_end
+
+    later = trial_end + timezone.timedelta(seconds=1)
+    assert not ent.is_fresh(later)
+    assert Entitlement.from_vendor(v, later).reason == TRIAL_EXPIRED
+
+    v.is_trial, v.plan, v.plan_expires_at = False, "monthly", now - timezone.timedelta(days=1)
+    assert Entitlement.from_vendor(v, now).reason == PLAN_EXPIRED
+    v.plan = "perpetual"
+    assert Entitlement.from_vendor(v, now).active
+    v.is_service_active = False
+    ent = Entitlement.from_vendor(v, now)
+    assert (ent.reason, ent.suspended, ent.daily_limit) == (SUSPENDED, True, -1)
+
+
+@pytest.mark.django_db
+def test_free_plan_ignores_stale_paid_expiry(auth_client, vendor_user):
+    # Dropped from a paid plan to free: the old expiry date is still stored
+    Vendor.objects.filter(pk=vendor_user.pk).update(
+        plan="none", is_trial=False, is_service_active=True, plan_expires_at=timezone.now() - timezone.timedelta(days=3),
+    )
+    vendor_user.refresh_from_db()
+    ent = Entitlement.from_vendor(vendor_user)
+    assert ent.active and ent.reason == "" and not ent.plan_expired and ent.expires_at is None
+    assert ent.daily_limit == 10
+    assert auth_client.get("/api/v1/orders/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_cached_snapshot_costs_no_queries_and_drops_on_save(django_assert_num_queries):
+    v = _vendor(is_trial=False, plan="perpetual", is_service_active=True)
+    with django_assert_num_queries(1):
+        assert get_entitlement(v.pk).active
+    with django_assert_num_queries(0):
+        assert get_entitlement(v.pk).active
+        assert entitlement_for(v) is entitlement_for(v)
+
+    v.is_service_active = False
+    v.save(update_fields=["is_service_active"])
+    assert get_entitlement(v.pk).reason == SUSPENDED
+    assert entitlement_for(v).reason == SUSPENDED
+
+    # QuerySet.update bypasses signals; callers invalidate explicitly
+    Vendor.objects.filter(pk=v.pk).update(is_service_active=True)
+    assert not get_entitlement(v.pk).active
+    invalidate_entitlements([v.pk])
+    assert get_entitlement(v.pk).active
+    assert get_entitlement(v.pk + 1000) is None
+
+
+@pytest.mark.django_db
+def test_order_create_respects_availability(auth_client, vendor_user):
+    Vendor.objects.filter(pk=vendor_user.pk).update(is_available=False, unavailable_message="Back at 9")
+    vendor_user.refresh_from_db()
+    res = auth_client.post(
+        "/api/v1/orders/", {"asset": "BTC", "type": "buy", "amount": "1", "rate": "100"}, format="json"
+    )
+    assert res.status_code == 403
+    assert res.json()["detail"] == "Back at 9"
+
+
+@pytest.mark.django_db
+def test_expire_licenses_drops_cached_snapshots():
+    from django.core.management import call_command
+
+    v = _vendor(is_trial=False, plan="monthly", plan_expires_at=timezone.now() - timezone.timedelta(days=1))
+    assert get_entitlement(v.pk).reason == PLAN_EXPIRED
+    call_command("expire_licenses")
+    # Re-read from the row: now suspended, not a stale cached snapshot
+    assert get_entitlement(v.pk).reason == SUSPENDED
+    v.refresh_from_db()
+    assert v.plan == "monthly"
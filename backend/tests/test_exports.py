@@ -0,0 +1,85 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from orders.models import Order
+from transactions.models import Transaction
+
+ORDERS_URL = "/api/v1/orders/export/"
+TRANSACTIONS_URL = "/api/v1/transactions/export/"
+
+
+def _body(response):
+    assert response.streaming
+    return b"".join(response.streaming_content)
+
+
+def _order(vendor, status, age_days, **extra):
+    order = Order.objects.create(vendor=vendor, asset="USDT", type=Order.BUY, amount=2, rate=100, status=status, **extra)
+    stamp = timezone.now() - timedelta(days=age_days)
+    Order.objects.filter(pk=order.pk).update(created_at=stamp, updated_at=stamp)
+    return order
+
+
+@pytest.fixture
+def history(vendor_user, django_capture_on_commit_callbacks):
+    old = _order(vendor_user, Order.COMPLETED, 200, customer_name="=HYPERLINK(\"x\")")
+    txn = Transaction.objects.create(order=old, status="completed", completed_at=timezone.now())
+    Transaction.objects.filter(pk=txn.pk).update(created_at=timezone.now() - timedelta(days=200))
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("archive_orders", "--days", "90")
+    recent = _order(vendor_user, Order.PENDING, 1, customer_chat_id="-100200")
+    declined = _order(vendor_user, Order.DECLINED, 1)
+    Order.objects.filter(pk=declined.pk).update(total_value=None)
+    Transaction.objects.create(order=declined, status="declined")
+    return {"old": old, "recent": recent, "declined": declined}
+
+
+@pytest.mark.django_db
+def test_order_csv_includes_archived_history(auth_client, history):
+    response = auth_client.get(ORDERS_URL)
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/csv")
+    assert 'filename="orders.csv"' in response["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(_body(response).decode())))
+    assert [r["order_code"] for r in rows] == [history[k].order_code for k in ("old", "recent", "declined")]
+    assert rows[0]["customer_name"].startswith("'=")
+    assert rows[1]["customer_chat_id"] == "-100200"
+    assert rows[2]["total_value"] == "200.00"
+
+
+@pytest.mark.django_db
+def test_order_export_filters_by_date_and_status(auth_client, history):
+    start = (timezone.now() - timedelta(days=7)).date().isoformat()
+    rows = _body(auth_client.get(f"{ORDERS_URL}?start={start}&status=declined&fmt=ndjson")).decode().splitlines()
+    assert [json.loads(line)["order_code"] for line in rows] == [history["declined"].order_code]
+    assert auth_client.get(f"{ORDERS_URL}?start=2025-13-01").status_code == 400
+    assert auth_client.get(f"{ORDERS_URL}?start=2025-02-01&end=2025-01-01").status_code == 400
+    assert auth_client.get(f"{ORDERS_URL}?fmt=xlsx").status_code == 400
+
+
+@pytest.mark.django_db
+def test_transaction_ndjson_joins_order_fields(auth_client, history, django_assert_max_num_queries):
+    with django_assert_max_num_queries(6):
+        response = auth_client.get(f"{TRANSACTIONS_URL}?fmt=ndjson")
+        lines = [json.loads(line) for line in _body(response).decode().splitlines()]
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert [r["order_order_code"] for r in lines] == [history["old"].order_code, history["declined"].order_code]
+    assert lines[0]["status"] == "completed" and lines[0]["order_amount"] == "2.00"
+    assert lines[1]["order_total_value"] == "200.00"
+
+
+@pytest.mark.django_db
+def test_export_is_gzipped_when_accepted(auth_client, history, settings):
+    settings.COMPRESSION_MIN_BYTES = 0
+    response = auth_client.get(TRANSACTIONS_URL, HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    text = gzip.decompress(_body(response)).decode()
+    assert text.splitlines()[0].startswith("id,order_id,order_order_code")
+    assert len(text.splitlines()) == 3
@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+import pytest
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import BankDetail
+from orders.models import Order
+from rates.models import Rate
+from transactions.models import Transaction
+
+
+@pytest.fixture
+def vendor_data(vendor_user):
+    vendor_user.bank_details = "Plain bank text"
+    vendor_user.save(update_fields=["bank_details"])
+    BankDetail.objects.create(vendor=vendor_user, bank_name="B1", account_number="001", account_name="V", instructions="Ref order id", is_default=True)
+    Rate.objects.create(vendor=vendor_user, asset="USDT", buy_rate=Decimal("1500.5"), sell_rate=Decimal("1490"), contract_address="0xabc", bank_details="Rate bank")
+    Rate.objects.create(vendor=vendor_user, asset="BTC", buy_rate=Decimal("100"), sell_rate=Decimal("99"))
+    buy = Order.objects.create(vendor=vendor_user, asset="USDT", type=Order.BUY, amount=Decimal("10.5"), rate=Decimal("1500.5"))
+    sell = Order.objects.create(vendor=vendor_user, asset="USDT", type=Order.SELL, amount=Decimal("3"), rate=Decimal("1490"), status=Order.ACCEPTED)
+    legacy = Order.objects.create(vendor=vendor_user, asset="BTC", type=Order.SELL, amount=Decimal("2"), rate=Decimal("99"), send_instructions="given")
+    Order.objects.filter(pk=legacy.pk).update(total_value=None)
+    txn = Transaction.objects.create(order=sell, customer_note="paid")
+    txn.proof.save("proof.png", ContentFile(b"png"), save=True)
+    Transaction.objects.create(order=legacy, status="completed")
+    return buy, sell, legacy
+
+
+def _both_paths(client, settings, url):
+    with CaptureQueriesContext(connection) as fast_queries:
+        fast = client.get(url)
+    settings.API_FAST_LISTS = False
+    with CaptureQueriesContext(connection) as slow_queries:
+        slow = client.get(url)
+    settings.API_FAST_LISTS = True
+    assert fast.status_code == slow.status_code == 200
+    return fast, slow, len(fast_queries), len(slow_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", [
+    "/api/v1/orders/",
+    "/api/v1/orders/?status=accepted",
+    "/api/v1/orders/?status=pending&ordering=-amount",
+    "/api/v1/transactions/",
+    "/api/v1/rates/",
+])
+def test_fast_list_output_is_identical(auth_client, settings, vendor_data, url):
+    fast, slow, fast_q, slow_q = _both_paths(auth_client, settings, url)
+    assert fast.content == slow.content
+    assert fast_q <= slow_q
+
+
+@pytest.mark.django_db
+def test_fast_order_list_covers_fallbacks_without_per_row_queries(auth_client, settings, vendor_data):
+    buy, sell, legacy = vendor_data
+    for n in range(5):
+        Order.objects.create(vendor=buy.vendor, asset="USDT", type=Order.BUY, amount=n + 1, rate=10)
+    fast, slow, fast_q, slow_q = _both_paths(auth_client, settings, "/api/v1/orders/")
+    assert fast.content == slow.content
+    rows = {r["id"]: r for r in fast.json()["results"]}
+    assert rows[buy.pk]["pay_instructions"].startswith("Bank: B1\nAccount Name: V")
+    # Serializer path looks instructions up per row; the fast path once per page
+    assert fast_q < slow_q
+
+    txns = auth_client.get("/api/v1/transactions/").json()["results"]
+    legacy_txn = next(t for t in txns if t["order"] == legacy.pk)
+    assert legacy_txn["order_total_value"] == 198.0
+    assert next(t for t in txns if t["order"] == sell.pk)["proof"].startswith("http://testserver/")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("drop, expected", [
+    (("bank_detail",), "Plain bank text"),
+    (("bank_detail", "bank_details"), "Rate bank"),
+])
+def test_order_instruction_fallbacks_match_on_both_paths(auth_client, settings, vendor_data, drop, expected):
+    buy, _, _ = vendor_data
+    if "bank_detail" in drop:
+        BankDetail.objects.filter(vendor=buy.vendor).delete()
+    if "bank_details" in drop:
+        type(buy.vendor).objects.filter(pk=buy.vendor_id).update(bank_details="")
+    fast, slow, _, _ = _both_paths(auth_client, settings, "/api/v1/orders/")
+    assert fast.content == slow.content
+    rows = {r["id"]: r for r in fast.json()["results"]}
+    assert rows[buy.pk]["pay_instructions"] == expected
@@ -0,0 +1,91 @@
+import pytest
+from django.core import mail
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.mail_queue import deliver_queued_email, enqueue_email, next_email_due
+from accounts.models import OutboundEmail
+
+
+class FlakyConnection:
+    """Email backend stand-in that fails the first ``failures`` sends."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.opened = 0
+        self.sent = []
+
+    def open(self):
+        self.opened += 1
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("smtp down")
+        self.sent.extend(messages)
+        return len(messages)
+
+
+@pytest.mark.django_db
+def test_password_reset_only_enqueues(api_client, vendor_user):
+    res = api_client.post(reverse("accounts:password_reset"), {"email": vendor_user.email}, format="json")
+    assert res.status_code == 200
+    assert len(mail.outbox) == 0
+    queued = OutboundEmail.objects.get()
+    assert queued.to == [vendor_user.email]
+    assert deliver_queued_email() == 1
+    assert mail.outbox[0].subject == "Reset Your Vendora Password"
+
+
+@pytest.mark.django_db
+def test_failed_sends_back_off_then_give_up(settings):
+    settings.EMAIL_QUEUE_MAX_ATTEMPTS = 2
+    settings.EMAIL_QUEUE_RETRY_BASE_SECONDS = 30
+    # Rows go out oldest first, so the first failure hits ``flaky``
+    flaky = enqueue_email("a", "body", "a@example.com")
+    ok = enqueue_email("b", "body", "b@example.com")
+
+    conn = FlakyConnection(failures=1)
+    assert deliver_queued_email(connection=conn) == 1
+    assert conn.opened == 1
+    ok.refresh_from_db()
+    flaky.refresh_from_db()
+    assert ok.status == OutboundEmail.SENT
+    assert (flaky.status, flaky.attempts, flaky.last_error) == (OutboundEmail.PENDING, 1, "smtp down")
+    assert flaky.next_attempt_at > timezone.now() + timezone.timedelta(seconds=25)
+    assert next_email_due() == flaky.next_attempt_at
+
+    # Not due yet: nothing is sent
+    assert deliver_queued_email(connection=FlakyConnection(failures=0)) == 0
+
+    OutboundEmail.objects.filter(pk=flaky.pk).update(next_attempt_at=timezone.now())
+    assert deliver_queued_email(connection=FlakyConnection(failures=1)) == 0
+    flaky.refresh_from_db()
+    assert (flaky.status, flaky.attempts) == (OutboundEmail.FAILED, 2)
+    assert next_email_due() is None
+
+
+@pytest.mark.django_db
+def test_batch_is_leased_and_sent_outside_the_claim_transaction(settings):
+    from django.db import connection
+
+    settings.EMAIL_QUEUE_LEASE_SECONDS = 600
+    row = enqueue_email("a", "body", "a@example.com")
+    seen = {}
+
+    class Inspecting(FlakyConnection):
+        def send_messages(self, messages):
+            # No savepoint from the claim is open, and the row is leased meanwhile
+            seen["savepoints"] = list(connection.savepoint_ids)
+            seen["row"] = OutboundEmail.objects.values("status", "attempts", "next_attempt_at").get(pk=row.pk)
+            return super().send_messages(messages)
+
+    assert deliver_queued_email(connection=Inspecting(failures=0)) == 1
+    assert seen["savepoints"] == []
+    assert (seen["row"]["status"], seen["row"]["attempts"]) == (OutboundEmail.PENDING, 1)
+    assert seen["row"]["next_attempt_at"] > timezone.now() + timezone.timedelta(seconds=500)
+    row.refresh_from_db()
+    assert (row.status, row.attempts) == (OutboundEmail.SENT, 1)
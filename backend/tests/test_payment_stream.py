@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+
+from accounts.models import PaymentRequest
+from api import metrics
+from api.events import PAYMENT_REQUEST_CHANGED, get_event_bus, reset_event_bus
+
+STREAM_URL = "/api/v1/accounts/payment-requests/stream/"
+
+
+@pytest.fixture(autouse=True)
+def _fresh_bus():
+    reset_event_bus()
+    yield
+    reset_event_bus()
+
+
+async def _read_stream(user, on_open, preamble=2, **headers):
+    client = AsyncClient()
+    await client.aforce_login(user)
+    resp = await client.get(STREAM_URL, headers=headers)
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "text/event-stream"
+    chunks = []
+    it = resp.streaming_content.__aiter__()
+    for _ in range(preamble):  # retry hint, then the snapshot or replayed events
+        chunks.append(await it.__anext__())
+    assert metrics._counters.get("payment_stream_connections_open") == 1
+    await on_open()
+    async for chunk in it:
+        chunks.append(chunk)
+    return b"".join(chunks).decode()
+
+
+def _publish(vendor_id, *statuses):
+    return get_event_bus().publish_many(vendor_id, [(PAYMENT_REQUEST_CHANGED, {"id": i, "status": s}) for i, s in enumerate(statuses)])
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_relays_bus_events_with_heartbeats_and_lifetime_cap(vendor_user, settings):
+    settings.PAYMENT_STREAM_HEARTBEAT_SECONDS = 0.2
+    settings.PAYMENT_STREAM_MAX_SECONDS = 0.7
+    PaymentRequest.objects.create(vendor=vendor_user, status="pending")
+    metrics.set_value("payment_stream_connections_open", 0)
+
+    async def publish():
+        await asyncio.sleep(0.05)
+        await sync_to_async(_publish)(vendor_user.id, "approved", "approved")
+
+    body = async_to_sync(_read_stream)(vendor_user, publish)
+    assert body.startswith("retry: 2000\n\n")
+    assert '"status": "pending"' in body  # snapshot
+    assert body.count('"status": "approved"') == 2
+    assert body.count("id: ") == 3  # snapshot offset + two events
+    assert body.count(": keep-alive") >= 2
+    # Lifetime cap closed the stream and released the connection gauge
+    assert metrics._counters["payment_stream_connections_open"] == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_resumes_from_last_event_id(vendor_user, settings):
+    settings.PAYMENT_STREAM_HEARTBEAT_SECONDS = 0.2
+    settings.PAYMENT_STREAM_MAX_SECONDS = 0.3
+    first, second, third = _publish(vendor_user.id, "pending", "approved", "rejected")
+
+    async def noop():
+        return None
+
+    body = async_to_sync(_read_stream)(vendor_user, noop, preamble=1, **{"Last-Event-ID": first.id})
+    # Only what the client missed, no snapshot
+    assert f"id: {second.id}\n" in body and f"id: {third.id}\n" in body
+    assert f"id: {first.id}\n" not in body
+    assert "[" not in body
+
+
+def test_stream_requires_login(client):
+    resp = client.get(STREAM_URL)
+    assert resp.status_code in (302, 401)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_under_wsgi_sends_chunks_as_they_happen(client, vendor_user, settings):
+    settings.PAYMENT_STREAM_HEARTBEAT_SECONDS = 0.2
+    settings.PAYMENT_STREAM_POLL_SECONDS = 0.05
+    settings.PAYMENT_STREAM_MAX_SECONDS = 0.5
+    PaymentRequest.objects.create(vendor=vendor_user, status="pending")
+    client.force_login(vendor_user)
+    resp = client.get(STREAM_URL)
+    assert resp["Content-Type"] == "text/event-stream"
+    # A sync generator: the snapshot arrives before the stream's lifetime is up
+    it = iter(resp.streaming_content)
+    assert next(it) == b"retry: 2000\n\n"
+    assert b'"status": "pending"' in next(it)
+    event = _publish(vendor_user.id, "approved")[0]
+    rest = b"".join(it).decode()
+    assert f"id: {event.id}\n" in rest and '"status": "approved"' in rest
+    assert ": keep-alive" in rest
@@ -0,0 +1,87 @@
+import io
+import zipfile
+from typing import Any, cast
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from orders.models import Order
+from transactions.models import Transaction
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def _completed_txn(vendor, asset="BTC"):
+    o = cast(Any, Order).objects.create(vendor=vendor, asset=asset, type=Order.BUY, amount=1, rate=10)
+    return cast(Any, Transaction).objects.create(order=o, status="completed", completed_at=timezone.now())
+
+
+def test_receipt_pdf_is_cached_and_revalidated(auth_client, vendor_user, media_root, monkeypatch):
+    from transactions import receipts
+
+    t = _completed_txn(vendor_user)
+    url = reverse("transactions:transaction-download-pdf", args=[t.id])
+    res = auth_client.get(url)
+    assert res.status_code == 200
+    assert res["Content-Type"] == "application/pdf"
+    body = b"".join(res.streaming_content)
+    assert body.startswith(b"%PDF")
+    assert int(res["Content-Length"]) == len(body)
+    etag = res["ETag"]
+
+    # Second download is served from the cache without rendering again
+    def fail(*args, **kwargs):
+        raise AssertionError("receipt re-rendered")
+    monkeypatch.setattr(receipts, "render_receipt", fail)
+    again = auth_client.get(url)
+    assert b"".join(again.streaming_content) == body
+    assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    # Any rendered field changing produces a new version
+    t.status = "declined"
+    t.save(update_fields=["status"])
+    monkeypatch.undo()
+    fresh = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert fresh.status_code == 200
+    assert fresh["ETag"] != etag
+    # ...and replaces the old one in storage
+    assert len(list((media_root / "receipts" / str(t.id)).iterdir())) == 1
+
+
+def test_archiving_deletes_cached_receipts(auth_client, vendor_user, media_root, django_capture_on_commit_callbacks):
+    from datetime import timedelta
+    from django.core.management import call_command
+
+    t = _completed_txn(vendor_user)
+    assert auth_client.get(reverse("transactions:transaction-download-pdf", args=[t.id])).status_code == 200
+    old = timezone.now() - timedelta(days=400)
+    cast(Any, Order).objects.filter(pk=t.order_id).update(status=Order.COMPLETED, updated_at=old)
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command("archive_orders", "--days", "90")
+    assert not list((media_root / "receipts" / str(t.id)).iterdir())
+
+
+def test_receipts_export_streams_zip_for_range(auth_client, vendor_user):
+    t1 = _completed_txn(vendor_user, "BTC")
+    t2 = _completed_txn(vendor_user, "ETH")
+    cast(Any, Transaction).objects.create(
+        order=cast(Any, Order).objects.create(vendor=vendor_user, asset="SOL", type=Order.BUY, amount=1, rate=10),
+        status="uncompleted",
+    )
+    today = timezone.now().date().isoformat()
+    url = reverse("transactions:transaction-export-receipts")
+    res = auth_client.get(url, {"start": today, "end": today})
+    assert res.status_code == 200
+    assert res["Content-Type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(res.streaming_content)))
+    names = archive.namelist()
+    assert len(names) == 2
+    assert {f"transaction_{t1.id}.pdf", f"transaction_{t2.id}.pdf"} == {n.split("_", 1)[1] for n in names}
+    assert all(archive.read(n).startswith(b"%PDF") for n in names)
+
+    assert auth_client.get(url, {"start": today}).status_code == 400
@@ -0,0 +1,78 @@
+import json
+import logging
+import threading
+
+import pytest
+
+from vendora import request_context
+from vendora.settings import JsonFormatter
+
+
+@pytest.fixture
+def access_records(caplog):
+    logger = logging.getLogger("vendora.access")
+    caplog.handler.addFilter(request_context.RequestContextFilter())
+    logger.addHandler(caplog.handler)
+    yield lambda: [r for r in caplog.records if r.name == "vendora.access"]
+    logger.removeHandler(caplog.handler)
+
+
+@pytest.mark.django_db
+def test_access_log_carries_context_timing_and_query_count(auth_client, vendor_user, settings, access_records):
+    settings.ACCESS_LOG_SAMPLE_RATE = 1.0
+    resp = auth_client.get("/api/v1/orders/", HTTP_X_REQUEST_ID="req-123")
+    assert resp.status_code == 200
+    assert resp["X-Request-ID"] == "req-123"
+
+    (record,) = access_records()
+    assert record.request_id == "req-123"
+    assert record.vendor_id == vendor_user.id
+    assert record.route and "orders" in record.route
+    assert record.http["status"] == 200 and record.http["db_queries"] >= 1
+    assert record.http["duration_ms"] > 0
+
+    line = json.loads(JsonFormatter().format(record))
+    assert line["request_id"] == "req-123" and line["http"]["path"] == "/api/v1/orders/"
+    # Nothing leaks past the request
+    assert request_context.get_context() == {}
+
+
+@pytest.mark.django_db
+def test_access_log_sampling_keeps_errors_and_slow_requests(client, settings, access_records):
+    settings.ACCESS_LOG_SAMPLE_RATE = 0.0
+    client.get("/api/v1/orders/")
+    assert not access_records()
+
+    settings.ACCESS_LOG_SLOW_MS = 0
+    client.get("/api/v1/orders/")
+    assert len(access_records()) == 1
+
+
+def test_context_is_isolated_per_thread():
+    seen = {}
+    barrier = threading.Barrier(2)
+
+    def work(rid):
+        with request_context.bound(request_id=rid):
+            barrier.wait()  # both threads bound before either reads
+            record = logging.LogRecord("x", logging.INFO, __file__, 1, "m", None, None)
+            request_context.RequestContextFilter().filter(record)
+            seen[rid] = record.request_id
+
+    threads = [threading.Thread(target=work, args=(rid,)) for rid in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert seen == {"a": "a", "b": "b"}
+
+
+def test_dispatcher_binds_update_id_for_handlers():
+    from api.update_dispatcher import ChatOrderedDispatcher
+
+    dispatcher = ChatOrderedDispatcher(lambda update: request_context.get_context().get("update_id"), workers=2)
+    try:
+        futures = [dispatcher.submit({"update_id": n, "message": {"chat": {"id": n}}}) for n in (41, 42)]
+        assert [f.result(timeout=5) for f in futures] == [41, 42]
+    finally:
+        dispatcher.shutdown()
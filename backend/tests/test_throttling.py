@@ -1,3 +1,4 @@
+import math
 import pytest
 from django.urls import reverse
 from rest_framework.test import APIClient
@@ -143,4 +144,87 @@ def test_auth_burst_throttle(settings, django_user_model):
         assert getattr(r, "status_code", None) in (400,401)
     # 3rd attempt should be throttled (expect 429)
     r = client.post(url, {'email':'tb@example.com','password':'wrong'}, format='json')
-    assert getattr(r, "status_code", None) == 429
\ No newline at end of file
+    assert getattr(r, "status_code", None) == 429
+
+def test_atomic_throttle_keeps_one_counter_shared_across_instances():
+    from django.core.cache import cache
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from vendora.throttling import AtomicRateThrottle
+
+    class ThreePerMinute(AtomicRateThrottle):
+        rate = '3/min'
+        scope = 'probe'
+
+        def get_cache_key(self, request, view):  # type: ignore[override]
+            return self.cache_format % {'scope': self.scope, 'ident': 'client-1'}
+
+    cache.clear()
+    request = Request(APIRequestFactory().get('/'))
+    # A fresh instance per request, as DRF does; state lives only in the cache
+    results = [ThreePerMinute().allow_request(request, None) for _ in range(3)]
+    throttled = ThreePerMinute()
+    assert results == [True, True, True]
+    assert throttled.allow_request(request, None) is False
+    assert throttled.wait() == 60
+    # One integer per key, not a timestamp history
+    assert cache.get('throttle_probe_client-1:n') == 4
+    assert cache.get('throttle_probe_client-1') is None
+
+
+class _FakeRedis:
+    """Runs the GCRA script's logic in Python against a dict and a manual clock (ms)."""
+
+    def __init__(self):
+        self.store = {}
+        self.now = 1_000_000
+        self.calls = 0
+
+    def register_script(self, source):
+        from vendora.throttling import _GCRA_LUA
+        assert source == _GCRA_LUA
+
+        def script(keys, args, client):
+            assert client is self
+            self.calls += 1
+            emission, burst = float(args[0]), int(args[1])
+            tat = max(float(self.store.get(keys[0], self.now)), self.now)
+            new_tat = tat + emission
+            allow_at = new_tat - emission * burst
+            if allow_at > self.now:
+                return [0, math.ceil(allow_at - self.now)]
+            self.store[keys[0]] = new_tat
+            return [1, 0]
+        return script
+
+
+def test_atomic_throttle_uses_gcra_script_on_redis_cache(settings, monkeypatch):
+    from django.core.cache.backends.redis import RedisCacheClient
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from vendora import throttling
+
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://unused:6379/0'}}
+    fake = _FakeRedis()
+    monkeypatch.setattr(RedisCacheClient, 'get_client', lambda self, key=None, *, write=False: fake)
+    monkeypatch.setattr(throttling, '_gcra_script', None)
+
+    class ThreePerMinute(throttling.AtomicRateThrottle):
+        rate = '3/min'
+        scope = 'probe'
+
+        def get_cache_key(self, request, view):  # type: ignore[override]
+            return self.cache_format % {'scope': self.scope, 'ident': 'client-1'}
+
+    request = Request(APIRequestFactory().get('/'))
+    results = [ThreePerMinute().allow_request(request, None) for _ in range(3)]
+    throttled = ThreePerMinute()
+    assert results == [True, True, True]
+    assert throttled.allow_request(request, None) is False
+    # One emission interval (20s) until the next slot frees up
+    assert throttled.wait() == 20
+    assert fake.calls == 4
+    assert list(fake.store) == [':1:throttle_probe_client-1:gcra']
+
+    fake.now += 20_000
+    assert ThreePerMinute().allow_request(request, None) is True
@@ -5,3 +5,9 @@ from typing import ClassVar
 class TransactionsConfig(AppConfig):
     default_auto_field: ClassVar[str] = 'django.db.models.BigAutoField'
     name: ClassVar[str] = 'transactions'
+    def ready(self) -> None:
+        # import signals to register them
+        try:
+            import transactions.signals  # noqa: F401
+        except Exception:
+            pass
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_archivedorder'),
+        ('transactions', '0010_add_vendor_notified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('proof', models.FileField(blank=True, null=True, upload_to='proofs/')),
+                ('proof_uploaded_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('status', models.CharField(choices=[('uncompleted', 'Uncompleted'), ('completed', 'Completed'), ('declined', 'Declined'), ('expired', 'Expired')], default='uncompleted', max_length=20)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('customer_receiving_details', models.TextField(blank=True)),
+                ('customer_note', models.TextField(blank=True)),
+                ('vendor_proof', models.FileField(blank=True, null=True, upload_to='vendor_proofs/')),
+                ('vendor_completed_at', models.DateTimeField(blank=True, null=True)),
+                ('vendor_notified', models.BooleanField(default=False)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='orders.archivedorder')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('order',), name='unique_archived_txn_per_order')],
+            },
+        ),
+    ]
@@ -1,11 +1,11 @@
 from django.db import models
 from django.db.models import UniqueConstraint, Index
 from django.utils import timezone
-from orders.models import Order
+from orders.models import ArchivedOrder, Order
 
 # Create your models here.
-class Transaction(models.Model):
-    order = models.ForeignKey(Order, on_delete=models.CASCADE)
+class AbstractTransaction(models.Model):
+    """Columns shared by live transactions and their archive copies (``ArchivedTransaction``)."""
     proof = models.FileField(upload_to="proofs/", null=True, blank=True)
     # When the proof was first uploaded (customer or vendor)
     proof_uploaded_at = models.DateTimeField(null=True, blank=True)
@@ -32,6 +32,13 @@ class Transaction(models.Model):
     # Whether the vendor has been notified about this transaction (prevents duplicate push sends)
     vendor_notified = models.BooleanField(default=False)
 
+    class Meta:
+        abstract = True
+
+
+class Transaction(AbstractTransaction):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE)
+
     class Meta:
         constraints = [
             UniqueConstraint(fields=["order"], name="unique_transaction_per_order"),
@@ -41,4 +48,18 @@ class Transaction(models.Model):
         ]
 
     def __str__(self):
-        return f"Transaction for Order {self.order}"
\ No newline at end of file
+        return f"Transaction for Order {self.order}"
+
+
+class ArchivedTransaction(AbstractTransaction):
+    """Transaction of an ``ArchivedOrder``, moved with it by ``orders.archive``."""
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["order"], name="unique_archived_txn_per_order"),
+        ]
+
+    def __str__(self):
+        return f"Transaction for Order {self.order}"
@@ -0,0 +1,261 @@
+"""Transaction receipt PDFs.
+
+Receipts are rendered once per distinct state and kept in the default storage
+under ``receipts/<id>/<state hash>.pdf``. The hash covers every value drawn on
+the page, so it doubles as the HTTP ETag: a completed transaction's receipt is
+served from storage (or answered with 304) instead of re-running ReportLab.
+Only the current version is kept: writing a new one deletes the older PDFs of
+that transaction, and archiving a transaction (``orders.archive``) deletes its
+receipts.
+"""
+from typing import Any, Iterable, Iterator, Optional, Tuple
+import hashlib
+import json
+import logging
+import tempfile
+import zipfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout changes so cached receipts are re-rendered
+RENDERER_VERSION = "1"
+CHUNK_SIZE = 64 * 1024
+
+
+def _total_value(order: Any) -> Any:
+    total_value = getattr(order, "total_value", None)
+    if total_value in (None, "", "null"):
+        try:
+            total_value = (order.amount or 0) * (order.rate or 0)
+        except Exception:
+            total_value = 0
+    return total_value
+
+
+def _first_line(text: Any) -> str:
+    return (text or '').splitlines()[0] if text else ''
+
+
+def receipt_state(transaction: Any) -> Tuple[str, ...]:
+    """Every value the receipt renders, as strings, in drawing order."""
+    order = transaction.order
+    return tuple(str(v) for v in (
+        RENDERER_VERSION,
+        order.order_code or order.id,
+        getattr(order.vendor, 'name', ''),
+        str(getattr(order, 'created_at', '')).split('.')[0],
+        order.type,
+        order.asset,
+        order.amount,
+        order.rate,
+        _total_value(order),
+        order.status,
+        transaction.status,
+        transaction.vendor_completed_at or '',
+        transaction.completed_at or '',
+        _first_line(order.pay_instructions),
+        _first_line(order.send_instructions),
+    ))
+
+
+def receipt_etag(transaction: Any) -> str:
+    digest = hashlib.sha256(json.dumps(receipt_state(transaction)).encode("utf-8")).hexdigest()
+    return digest[:32]
+
+
+def receipt_filename(transaction: Any) -> str:
+    return f"transaction_{transaction.id}.pdf"
+
+
+def render_receipt(transaction: Any, out: Any) -> None:
+    """Draw the receipt for ``transaction`` into the binary file object ``out``."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+    from reportlab.lib import colors
+
+    p = canvas.Canvas(out, pagesize=letter)
+    width, height = letter
+
+    # Helpers
+    def hr(ypos, c=colors.HexColor("#e5e7eb")):
+        p.setStrokeColor(c)
+        p.setLineWidth(0.7)
+        p.line(50, ypos, width - 50, ypos)
+
+    def money(val):
+        try:
+            from decimal import Decimal
+            v = val if isinstance(val, (int, float)) else Decimal(str(val))
+        except Exception:
+            try:
+                v = float(val)
+            except Exception:
+                v = 0
+        return f"₦{float(v):,.2f}"
+
+    order = transaction.order
+    total_value = _total_value(order)
+
+    # Header
+    y = height - 60
+    p.setFillColor(colors.HexColor("#111827"))
+    p.setFont("Helvetica-Bold", 18)
+    p.drawString(50, y, "Vendora")
+    p.setFont("Helvetica", 12)
+    p.setFillColor(colors.HexColor("#6b7280"))
+    p.drawString(120, y, "• Transaction Summary")
+    hr(y - 10)
+    y -= 35
+
+    # Summary card
+    p.setFillColor(colors.black)
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(50, y, f"Order: {order.order_code or order.id}")
+    p.setFont("Helvetica", 10)
+    y -= 16
+    p.drawString(50, y, f"Vendor: {getattr(order.vendor, 'name', '')}")
+    y -= 14
+    p.drawString(50, y, f"Date: {str(getattr(order, 'created_at', '')).split('.')[0]}")
+    y -= 20
+
+    # Order details
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(50, y, "Order Details")
+    y -= 12
+    hr(y)
+    y -= 16
+    p.setFont("Helvetica", 10)
+    p.drawString(50, y, f"Type: {order.type}")
+    p.drawString(220, y, f"Asset: {order.asset}")
+    y -= 14
+    p.drawString(50, y, f"Amount: {order.amount}")
+    p.drawString(220, y, f"Rate: {money(order.rate)}")
+    y -= 14
+    p.drawString(50, y, f"Total Value: {money(total_value)}")
+    p.drawString(220, y, f"Order Status: {order.status}")
+    y -= 20
+
+    # Transaction details
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(50, y, "Transaction Details")
+    y -= 12
+    hr(y)
+    y -= 16
+    p.setFont("Helvetica", 10)
+    p.drawString(50, y, f"Transaction Status: {transaction.status}")
+    y -= 14
+    p.drawString(50, y, f"Vendor Completed At: {str(transaction.vendor_completed_at or '')}")
+    y -= 14
+    p.drawString(50, y, f"Customer Completed At: {str(transaction.completed_at or '')}")
+    y -= 20
+
+    # Instructions (first line)
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(50, y, "Instructions")
+    y -= 12
+    hr(y)
+    y -= 16
+    p.setFont("Helvetica", 10)
+    pay_line = _first_line(order.pay_instructions)
+    send_line = _first_line(order.send_instructions)
+    if pay_line:
+        p.drawString(50, y, f"Pay: {pay_line}")
+        y -= 14
+    if send_line:
+        p.drawString(50, y, f"Send: {send_line}")
+        y -= 14
+    if not pay_line and not send_line:
+        p.drawString(50, y, "No instructions available.")
+        y -= 14
+
+    p.showPage()
+    p.save()
+
+
+def discard_receipts(transaction_id: Any, keep: Optional[str] = None) -> None:
+    """Delete the cached receipts of one transaction, except the file named ``keep``."""
+    folder = f"receipts/{transaction_id}"
+    try:
+        _, files = default_storage.listdir(folder)
+    except FileNotFoundError:
+        return
+    for filename in files:
+        name = f"{folder}/{filename}"
+        if name == keep:
+            continue
+        try:
+            default_storage.delete(name)
+        except Exception as e:
+            logger.warning("Could not delete stale receipt %s: %s", name, e)
+
+
+def discard_receipts_for(transaction_ids: Iterable[Any]) -> None:
+    for transaction_id in transaction_ids:
+        discard_receipts(transaction_id)
+
+
+def cached_receipt(transaction: Any) -> Tuple[str, str]:
+    """Return ``(storage name, etag)``, rendering the receipt on first use."""
+    etag = receipt_etag(transaction)
+    name = f"receipts/{transaction.id}/{etag}.pdf"
+    if not default_storage.exists(name):
+        # Spool to disk past 1MB so rendering never holds a large PDF in memory
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as tmp:
+            render_receipt(transaction, tmp)
+            tmp.seek(0)
+            default_storage.save(name, File(tmp, name=receipt_filename(transaction)))
+        # Earlier states of this transaction can never be served again
+        discard_receipts(transaction.id, keep=name)
+    return name, etag
+
+
+class _ZipSink:
+    """Write-only, unseekable target for ZipFile; ``drain()`` hands back what was written."""
+
+    def __init__(self) -> None:
+        self._parts: list = []
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_receipts_zip(transactions: Any) -> Iterator[bytes]:
+    """Yield a zip archive of receipts chunk by chunk.
+
+    Each PDF comes from the receipt cache and is copied into the archive in
+    ``CHUNK_SIZE`` pieces, so memory stays flat regardless of how many
+    transactions are exported.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:  # type: ignore[arg-type]
+        for transaction in transactions:
+            name, _ = cached_receipt(transaction)
+            arcname = f"{transaction.order.order_code or transaction.order_id}_{receipt_filename(transaction)}"
+            with default_storage.open(name, "rb") as src, zf.open(arcname, mode="w") as dest:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    # Central directory is written on close
+    data = sink.drain()
+    if data:
+        yield data
@@ -1,4 +1,7 @@
+from decimal import Decimal
 from rest_framework import serializers
+
+from api.fast_lists import as_json_number, column_formatter
 from .models import Transaction
 
 class TransactionSerializer(serializers.ModelSerializer):
@@ -84,3 +87,63 @@ class TransactionSerializer(serializers.ModelSerializer):
         if value not in {"uncompleted", "completed", "declined", "expired"}:
             raise serializers.ValidationError("Invalid status.")
         return value
+
+
+# Columns and row builder for the fast list path (api.fast_lists)
+TRANSACTION_LIST_COLUMNS = (
+    "id", "order", "order__order_code", "order__type", "order__asset", "order__amount", "order__rate",
+    "order__total_value", "proof", "proof_uploaded_at", "created_at", "status", "completed_at",
+    "customer_receiving_details", "customer_note", "vendor_proof", "vendor_completed_at",
+)
+
+
+def transaction_list_rows(rows, serializer):
+    """``.values(*TRANSACTION_LIST_COLUMNS)`` rows as TransactionSerializer output."""
+    from decimal import Decimal
+
+    fmt = {name: column_formatter(serializer, name) for name in (
+        "proof", "proof_uploaded_at", "created_at", "completed_at", "vendor_proof", "vendor_completed_at",
+    )}
+    out = []
+    for r in rows:
+        total_value = r["order__total_value"]
+        if total_value is None and r["order__amount"] is not None and r["order__rate"] is not None:
+            total_value = Decimal(r["order__amount"]) * Decimal(r["order__rate"])
+        out.append({
+            "id": r["id"],
+            "order": r["order"],
+            "order_code": r["order__order_code"] or str(r["order"]),
+            "order_type": r["order__type"],
+            "order_asset": r["order__asset"],
+            "order_amount": as_json_number(r["order__amount"]),
+            "order_total_value": as_json_number(total_value),
+            "proof": fmt["proof"](r["proof"]),
+            "proof_uploaded_at": fmt["proof_uploaded_at"](r["proof_uploaded_at"]),
+            "created_at": fmt["created_at"](r["created_at"]),
+            "status": r["status"],
+            "completed_at": fmt["completed_at"](r["completed_at"]),
+            "customer_receiving_details": r["customer_receiving_details"],
+            "customer_note": r["customer_note"],
+            "vendor_proof": fmt["vendor_proof"](r["vendor_proof"]),
+            "vendor_completed_at": fmt["vendor_completed_at"](r["vendor_completed_at"]),
+        })
+    return out
+
+
+_CENTS = Decimal("0.01")
+
+# Streaming export (api.exports): order fields are joined in the same query
+TRANSACTION_EXPORT_FIELDS = (
+    "id", "order_id", "order__order_code", "order__type", "order__asset", "order__amount", "order__rate",
+    "order__total_value", "status", "created_at", "proof_uploaded_at", "completed_at", "vendor_completed_at",
+    "customer_note",
+)
+TRANSACTION_EXPORT_COLUMNS = tuple(f.replace("__", "_") for f in TRANSACTION_EXPORT_FIELDS)
+
+
+def transaction_export_rows(rows):
+    for r in rows:
+        out = {f.replace("__", "_"): v for f, v in r.items()}
+        if out["order_total_value"] is None and out["order_amount"] is not None and out["order_rate"] is not None:
+            out["order_total_value"] = (out["order_amount"] * out["order_rate"]).quantize(_CENTS)
+        yield out
@@ -0,0 +1,61 @@
+"""Publish transaction changes to the vendor event bus (``api.events``) and
+bump the vendor's change versions (``api.change_versions``)."""
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.change_versions import TRANSACTIONS, bump_on_commit
+from api.events import TRANSACTION_COMPLETED, TRANSACTION_CREATED, TRANSACTION_UPDATED, publish_event
+from .models import Transaction
+
+# Bookkeeping saves that do not change anything a vendor sees
+_QUIET_FIELDS = frozenset({"vendor_notified"})
+
+
+def transaction_event_data(txn) -> dict:
+    def iso(dt):
+        return dt.isoformat() if dt else None
+
+    order = txn.order
+    return {
+        "id": txn.pk,
+        "order_id": txn.order_id,
+        "order_code": order.order_code,
+        "type": order.type,
+        "asset": order.asset,
+        "amount": str(order.amount),
+        "status": txn.status,
+        "has_proof": bool(txn.proof),
+        "created_at": iso(txn.created_at),
+        "completed_at": iso(txn.completed_at),
+        "vendor_completed_at": iso(txn.vendor_completed_at),
+    }
+
+
+@receiver(post_save, sender=Transaction)
+def publish_transaction_event(sender, instance: Transaction, created, update_fields=None, **kwargs):
+    if created:
+        event_type = TRANSACTION_CREATED
+    elif update_fields is not None and set(update_fields) <= _QUIET_FIELDS:
+        return
+    elif instance.status == "completed":
+        # Completion saves either list "status" or save every field
+        if update_fields is not None and "status" not in update_fields:
+            return
+        event_type = TRANSACTION_COMPLETED
+    else:
+        event_type = TRANSACTION_UPDATED
+    vendor_id = instance.order.vendor_id
+    data = transaction_event_data(instance)
+    db_transaction.on_commit(lambda: publish_event(vendor_id, event_type, data))
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def bump_transaction_version(sender, instance: Transaction, **kwargs):
+    try:
+        vendor_id = instance.order.vendor_id
+    except Exception:
+        # Order already gone (cascade); its own receiver bumped the vendor
+        return
+    bump_on_commit(vendor_id, TRANSACTIONS)
@@ -2,7 +2,17 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import QuerySet
 from typing import Any, cast
+from api.change_versions import TRANSACTIONS, ConditionalListMixin
+from api.fast_lists import FastListMixin
+from .serializers import (
+    TRANSACTION_EXPORT_COLUMNS,
+    TRANSACTION_EXPORT_FIELDS,
+    TRANSACTION_LIST_COLUMNS,
+    transaction_export_rows,
+    transaction_list_rows,
+)
 from api.permissions import IsOwner, IsVendorAdmin
+from vendora.db_router import ReplicaListMixin
 from rest_framework import filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -39,8 +49,10 @@ def _validate_proof_upload(file_obj):
     return None
 
 
-class TransactionViewSet(ModelViewSet):
+class TransactionViewSet(ConditionalListMixin, ReplicaListMixin, FastListMixin, ModelViewSet):
     permission_classes = [IsAuthenticated, IsOwner | IsVendorAdmin]
+    etag_kinds = (TRANSACTIONS,)
+    fast_list_columns = TRANSACTION_LIST_COLUMNS
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["status"]
     ordering_fields = ["completed_at"]
@@ -66,6 +78,9 @@ class TransactionViewSet(ModelViewSet):
 
         return TransactionSerializer
 
+    def fast_list_rows(self, rows):
+        return transaction_list_rows(rows, self.get_serializer())
+
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
         if instance.status in {"declined", "expired"}:
@@ -92,21 +107,24 @@ class TransactionViewSet(ModelViewSet):
             return Response({"detail": "This transaction is declined and cannot be updated."}, status=status.HTTP_400_BAD_REQUEST)
 
         # If the request includes files but no explicit status, treat this as a proof update only
-        has_files = bool(request.FILES)
+        from api.storage import UploadError, save_content_addressed, validate_uploaded_key
+        has_files = bool(request.FILES) or any(request.data.get(k) for k in ("proof_key", "vendor_proof_key"))
         status_value = request.data.get("status")
 
-        # Allow vendor to upload their own proof file (e.g., transfer receipt)
-        if "vendor_proof" in request.FILES:
-            err = _validate_proof_upload(request.FILES["vendor_proof"])
-            if err:
-                return Response({"detail": err}, status=status.HTTP_400_BAD_REQUEST)
-            transaction.vendor_proof = request.FILES["vendor_proof"]
-        # Accept generic 'proof' field (test uses 'proof')
-        if "proof" in request.FILES:
-            err = _validate_proof_upload(request.FILES["proof"])
-            if err:
-                return Response({"detail": err}, status=status.HTTP_400_BAD_REQUEST)
-            transaction.proof = request.FILES["proof"]
+        for field in ("vendor_proof", "proof"):
+            # Allow vendor to upload their own proof file (e.g., transfer receipt);
+            # the generic 'proof' field is kept for older clients and tests.
+            if field in request.FILES:
+                err = _validate_proof_upload(request.FILES[field])
+                if err:
+                    return Response({"detail": err}, status=status.HTTP_400_BAD_REQUEST)
+                setattr(transaction, field, save_content_addressed(field, request.FILES[field]))
+            # Direct uploads: the PWA PUT the bytes to object storage and sends the key
+            elif request.data.get(f"{field}_key"):
+                try:
+                    setattr(transaction, field, validate_uploaded_key(field, request.data.get(f"{field}_key"), request.user))
+                except UploadError as e:
+                    return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         # If files were uploaded but no status provided, only save the files and mark proof_uploaded_at
         if has_files and not status_value:
@@ -272,128 +290,82 @@ class TransactionViewSet(ModelViewSet):
 
     @action(detail=True, methods=["get"], url_path="pdf")
     def download_pdf(self, request, pk=None):
-        """Generate a simple PDF summary for the transaction and order."""
+        """Serve the transaction's PDF summary, rendered once per state and cached."""
+        from django.core.files.storage import default_storage
+        from django.http import FileResponse
+        from django.utils.cache import get_conditional_response
+        from .receipts import cached_receipt, receipt_etag, receipt_filename
+
         transaction = self.get_object()
         if transaction.order.vendor != request.user and not request.user.is_staff:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
-        try:
-            # Attempt to use reportlab if available
-            from reportlab.lib.pagesizes import letter
-            from reportlab.pdfgen import canvas
-            from reportlab.lib import colors
-            from io import BytesIO
-
-            buffer = BytesIO()
-            p = canvas.Canvas(buffer, pagesize=letter)
-            width, height = letter
-
-            # Helpers
-            def hr(ypos, c=colors.HexColor("#e5e7eb")):
-                p.setStrokeColor(c)
-                p.setLineWidth(0.7)
-                p.line(50, ypos, width - 50, ypos)
-
-            def money(val):
-                try:
-                    from decimal import Decimal
-                    v = val if isinstance(val, (int, float)) else Decimal(str(val))
-                except Exception:
-                    try:
-                        v = float(val)
-                    except Exception:
-                        v = 0
-                return f"₦{float(v):,.2f}"
+        etag = f'"{receipt_etag(transaction)}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
 
-            order = transaction.order
-            # Compute total value fallback
-            total_value = getattr(order, "total_value", None)
-            if total_value in (None, "", "null"):
-                try:
-                    total_value = (order.amount or 0) * (order.rate or 0)
-                except Exception:
-                    total_value = 0
-
-            # Header
-            y = height - 60
-            p.setFillColor(colors.HexColor("#111827"))
-            p.setFont("Helvetica-Bold", 18)
-            p.drawString(50, y, "Vendora")
-            p.setFont("Helvetica", 12)
-            p.setFillColor(colors.HexColor("#6b7280"))
-            p.drawString(120, y, "• Transaction Summary")
-            hr(y - 10)
-            y -= 35
-
-            # Summary card
-            p.setFillColor(colors.black)
-            p.setFont("Helvetica-Bold", 12)
-            p.drawString(50, y, f"Order: {order.order_code or order.id}")
-            p.setFont("Helvetica", 10)
-            y -= 16
-            p.drawString(50, y, f"Vendor: {getattr(order.vendor, 'name', '')}")
-            y -= 14
-            p.drawString(50, y, f"Date: {str(getattr(order, 'created_at', '')).split('.')[0]}")
-            y -= 20
-
-            # Order details
-            p.setFont("Helvetica-Bold", 12)
-            p.drawString(50, y, "Order Details")
-            y -= 12
-            hr(y)
-            y -= 16
-            p.setFont("Helvetica", 10)
-            p.drawString(50, y, f"Type: {order.type}")
-            p.drawString(220, y, f"Asset: {order.asset}")
-            y -= 14
-            p.drawString(50, y, f"Amount: {order.amount}")
-            p.drawString(220, y, f"Rate: {money(order.rate)}")
-            y -= 14
-            p.drawString(50, y, f"Total Value: {money(total_value)}")
-            p.drawString(220, y, f"Order Status: {order.status}")
-            y -= 20
-
-            # Transaction details
-            p.setFont("Helvetica-Bold", 12)
-            p.drawString(50, y, "Transaction Details")
-            y -= 12
-            hr(y)
-            y -= 16
-            p.setFont("Helvetica", 10)
-            p.drawString(50, y, f"Transaction Status: {transaction.status}")
-            y -= 14
-            p.drawString(50, y, f"Vendor Completed At: {str(transaction.vendor_completed_at or '')}")
-            y -= 14
-            p.drawString(50, y, f"Customer Completed At: {str(transaction.completed_at or '')}")
-            y -= 20
-
-            # Instructions (first line)
-            p.setFont("Helvetica-Bold", 12)
-            p.drawString(50, y, "Instructions")
-            y -= 12
-            hr(y)
-            y -= 16
-            p.setFont("Helvetica", 10)
-            pay_line = (order.pay_instructions or '').splitlines()[0] if order.pay_instructions else ''
-            send_line = (order.send_instructions or '').splitlines()[0] if order.send_instructions else ''
-            if pay_line:
-                p.drawString(50, y, f"Pay: {pay_line}")
-                y -= 14
-            if send_line:
-                p.drawString(50, y, f"Send: {send_line}")
-                y -= 14
-            if not pay_line and not send_line:
-                p.drawString(50, y, "No instructions available.")
-                y -= 14
-
-            p.showPage()
-            p.save()
-            pdf = buffer.getvalue()
-            buffer.close()
-
-            response = HttpResponse(pdf, content_type="application/pdf")
-            filename = f"transaction_{transaction.id}.pdf"
-            response["Content-Disposition"] = f"attachment; filename=\"{filename}\""
-            return response
+        try:
+            name, _ = cached_receipt(transaction)
+            response = FileResponse(
+                default_storage.open(name, "rb"),
+                as_attachment=True,
+                filename=receipt_filename(transaction),
+                content_type="application/pdf",
+            )
+            response["Content-Length"] = str(default_storage.size(name))
         except Exception as e:
             return Response({"detail": f"PDF generation failed: {e}. Install 'reportlab' to enable PDFs."}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        response["ETag"] = etag
+        # Let the browser revalidate instead of re-downloading unchanged receipts
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    @action(detail=False, methods=["get"], url_path="receipts-export")
+    def export_receipts(self, request):
+        """Stream a zip of completed transaction receipts for a date range.
+
+        Query: ?start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive, by transaction date).
+        """
+        from datetime import date
+        from django.http import StreamingHttpResponse
+        from .receipts import iter_receipts_zip
+
+        try:
+            start = date.fromisoformat(str(request.query_params.get("start") or ""))
+            end = date.fromisoformat(str(request.query_params.get("end") or ""))
+        except ValueError:
+            return Response({"detail": "start and end must be dates (YYYY-MM-DD)"}, status=status.HTTP_400_BAD_REQUEST)
+        max_days = int(getattr(settings, "RECEIPT_EXPORT_MAX_DAYS", 366) or 366)
+        if end < start or (end - start).days >= max_days:
+            return Response({"detail": f"Date range must be between 1 and {max_days} days"}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = (
+            self.get_queryset()
+            .filter(status="completed", created_at__date__gte=start, created_at__date__lte=end)
+            .select_related("order", "order__vendor")
+            .order_by("created_at", "id")
+        )
+        response = StreamingHttpResponse(iter_receipts_zip(qs.iterator(chunk_size=200)), content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="receipts_{start.isoformat()}_{end.isoformat()}.zip"'
+        return response
+
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """Stream the vendor's transactions with their order fields, archived history included.
+
+        Query: ``?start=YYYY-MM-DD&end=YYYY-MM-DD`` (transaction date, inclusive),
+        ``?status=`` and ``?fmt=csv|ndjson``.
+        """
+        from api.exports import export_response, filter_export, history_rows, parse_export_query
+        from .models import ArchivedTransaction, Transaction
+
+        try:
+            start, end, status_param, fmt = parse_export_query(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        vendor = request.user
+        hot = filter_export(cast(Any, Transaction).objects.filter(order__vendor=vendor), start, end, status_param)
+        archived = filter_export(cast(Any, ArchivedTransaction).objects.filter(order__vendor=vendor), start, end, status_param)
+        rows = history_rows(hot, archived, TRANSACTION_EXPORT_FIELDS)
+        return export_response(request, TRANSACTION_EXPORT_COLUMNS, lambda: transaction_export_rows(rows()), "transactions", fmt)
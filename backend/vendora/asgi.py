@@ -23,12 +23,13 @@ from channels.auth import AuthMiddlewareStack
 from accounts.ws_auth import JwtAuthMiddleware
 # Import websocket url patterns
 from accounts import routing as accounts_routing
+from api import routing as api_routing
 
 application = ProtocolTypeRouter({
 	"http": django_asgi_app,
 	"websocket": JwtAuthMiddleware(
 		URLRouter(
-			accounts_routing.websocket_urlpatterns
+			accounts_routing.websocket_urlpatterns + api_routing.websocket_urlpatterns
 		)
 	),
 })
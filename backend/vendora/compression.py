@@ -0,0 +1,184 @@
+"""Response compression negotiated from ``Accept-Encoding``.
+
+Brotli (``br``) is used when the ``brotli`` module is installed and the client
+accepts it, gzip otherwise. Only textual types are compressed: JSON, text,
+JavaScript, SVG and ``text/event-stream``. Small bodies (under
+``COMPRESSION_MIN_BYTES``) and bodies that compress no smaller are left alone.
+
+Streaming responses are compressed chunk by chunk, and every chunk is flushed
+(``Z_SYNC_FLUSH`` / brotli ``flush()``). That keeps SSE events and live
+exports arriving as they are produced instead of waiting for the compressor's
+buffer to fill.
+
+Compressing a response that carries a secret next to attacker-influenced
+input enables BREACH-style guessing. Token endpoints are therefore excluded
+by path (``COMPRESSION_EXCLUDE_PATHS``), and responses marked
+``Cache-Control: no-transform`` are never touched.
+"""
+from typing import Optional
+import gzip
+import re
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:  # optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - exercised when brotli is absent
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/problem+json',
+    'application/x-ndjson',
+    'application/javascript',
+    'image/svg+xml',
+    'text/',
+)
+
+_ACCEPT_RE = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def accepted_encodings(header: str) -> dict:
+    """``{'gzip': 1.0, 'br': 0.5, ...}`` from an Accept-Encoding header."""
+    weights = {}
+    for part in (header or '').lower().split(','):
+        m = _ACCEPT_RE.match(part)
+        if not m:
+            continue
+        try:
+            weights[m.group(1)] = float(m.group(2)) if m.group(2) is not None else 1.0
+        except ValueError:
+            continue
+    return weights
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    weights = accepted_encodings(header)
+    wildcard = weights.get('*', 0.0)
+    candidates = (('br', 'gzip') if brotli is not None else ('gzip',))
+    best, best_q = None, 0.0
+    for enc in candidates:
+        q = weights.get(enc, wildcard)
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+class _Compressor:
+    """Incremental compressor with a per-chunk flush."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == 'br':
+            quality = int(getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5))
+            self._br = brotli.Compressor(quality=quality)
+        else:
+            level = int(getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6))
+            self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._br.process(data) + self._br.flush()
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._br.finish()
+        return self._z.flush(zlib.Z_FINISH)
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=int(getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)))
+    return gzip.compress(data, compresslevel=int(getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)), mtime=0)
+
+
+def _to_bytes(chunk) -> bytes:
+    return chunk if isinstance(chunk, bytes) else bytes(chunk, 'utf-8') if isinstance(chunk, str) else bytes(chunk)
+
+
+def _compress_stream(chunks, encoding):
+    compressor = _Compressor(encoding)
+    for chunk in chunks:
+        out = compressor.chunk(_to_bytes(chunk))
+        if out:
+            yield out
+    yield compressor.finish()
+
+
+async def _acompress_stream(chunks, encoding):
+    compressor = _Compressor(encoding)
+    async for chunk in chunks:
+        out = compressor.chunk(_to_bytes(chunk))
+        if out:
+            yield out
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def _encoding_for(self, request, response) -> Optional[str]:
+        if not getattr(settings, 'COMPRESSION_ENABLED', True):
+            return None
+        if response.has_header('Content-Encoding') or response.status_code in (204, 206, 304):
+            return None
+        if 'no-transform' in response.get('Cache-Control', '').lower():
+            return None
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return None
+        path = request.path
+        if any(p and p in path for p in getattr(settings, 'COMPRESSION_EXCLUDE_PATHS', ())):
+            return None
+        return choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+    def process_response(self, request, response):
+        encoding = self._encoding_for(request, response)
+        # Caches must key on Accept-Encoding even for responses sent as-is
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type.startswith(COMPRESSIBLE_TYPES):
+            patch_vary_headers(response, ('Accept-Encoding',))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _acompress_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = _compress_stream(response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            content = response.content
+            if len(content) < int(getattr(settings, 'COMPRESSION_MIN_BYTES', 512)):
+                return response
+            compressed = compress_bytes(content, encoding)
+            if len(compressed) >= len(content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The compressed body is a different byte sequence: strong validators become weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
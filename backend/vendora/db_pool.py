@@ -0,0 +1,99 @@
+"""Optional Postgres connection pooling (psycopg 3 pool, Django 5.1+).
+
+With ``DB_POOL=True`` and ``psycopg[pool]`` installed, each Postgres alias
+gets ``OPTIONS['pool']``. Django then keeps one ``psycopg_pool.ConnectionPool``
+per alias and process. A request borrows a connection and hands it back when
+it closes, instead of holding one per thread for ``CONN_MAX_AGE``. Pooling
+replaces persistent connections, so ``CONN_MAX_AGE`` is forced to 0.
+Connections are checked before they are handed out (the pool's
+``check_connection`` plus ``CONN_HEALTH_CHECKS``) and recycled after
+``DB_POOL_MAX_LIFETIME``.
+
+Size the pool so that ``processes x DB_POOL_MAX_SIZE`` (plus the same for
+each replica) stays under Postgres ``max_connections``. Under a spike,
+requests queue for up to ``DB_POOL_TIMEOUT`` seconds instead of opening more
+connections. The long-polling SSE stream gives its connection back between
+polls (``release_connections``). Pool wait times and sizes are published as
+``db_pool_<alias>_*`` metrics.
+
+Without psycopg 3 the settings are left as they were (psycopg2 with
+persistent connections) and a warning is logged.
+"""
+from typing import Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+POSTGRES_ENGINES = ('django.db.backends.postgresql',)
+
+
+def pool_available() -> bool:
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def apply_pool(db: dict, *, min_size: int, max_size: int, timeout: float, max_idle: float, max_lifetime: float) -> dict:
+    """Turn on pooling for one ``DATABASES`` entry when it is Postgres and psycopg 3 is installed."""
+    if db.get('ENGINE') not in POSTGRES_ENGINES:
+        return db
+    if not pool_available():
+        logger.warning('DB_POOL is set but psycopg[pool] is not installed; keeping persistent connections')
+        return db
+    from psycopg_pool import ConnectionPool
+
+    options = dict(db.get('OPTIONS') or {})
+    options['pool'] = {
+        'min_size': min_size,
+        'max_size': max(min_size, max_size),
+        'timeout': timeout,
+        'max_idle': max_idle,
+        'max_lifetime': max_lifetime,
+        # Cheap round trip before a connection leaves the pool
+        'check': ConnectionPool.check_connection,
+    }
+    db['OPTIONS'] = options
+    db['CONN_MAX_AGE'] = 0
+    db['CONN_HEALTH_CHECKS'] = True
+    return db
+
+
+def _pool_of(alias: str):
+    from django.db import connections
+
+    try:
+        return getattr(connections[alias], 'pool', None)
+    except Exception:
+        return None
+
+
+def pool_stats() -> Dict[str, int]:
+    """Flat ``db_pool_<alias>_<stat>`` gauges for every pooled alias."""
+    from django.conf import settings
+
+    out: Dict[str, int] = {}
+    for alias in settings.DATABASES:
+        pool = _pool_of(alias)
+        if pool is None:
+            continue
+        try:
+            stats = pool.get_stats()
+        except Exception:
+            continue
+        # pool_size/available, requests_waiting, requests_wait_ms, requests_errors, connections_lost...
+        for name, value in stats.items():
+            out[f'db_pool_{alias}_{name}'] = int(value)
+    return out
+
+
+def release_connections() -> None:
+    """Hand pooled connections back between the polls of a long-running stream."""
+    from django.db import connections
+
+    for conn in connections.all(initialized_only=True):
+        if conn.in_atomic_block or _pool_of(conn.alias) is None:
+            continue
+        conn.close()
@@ -0,0 +1,211 @@
+"""Read-replica routing.
+
+Replicas are configured with ``DATABASE_REPLICA_URLS`` and become the
+``replica``, ``replica_2``... aliases listed in ``DATABASE_REPLICAS``.
+``ReplicaRouter`` only sends a read to a replica inside ``use_replica()``
+(or a ``@replica_reads`` function). That marker is how views opt their safe
+reads in: list pages, the dashboard, SSE snapshots, metrics and the bot
+menus. Everything else reads the primary, as before. Even inside the marker
+the primary is used when:
+
+- the vendor's data changed within ``DATABASE_REPLICA_PIN_SECONDS``
+  (read-your-writes). Routed writes and change-version bumps pin the vendor
+  through the cache, so the pin holds across workers and a fresh ETag is
+  never paired with stale replica rows;
+- the same request or task has already written;
+- a transaction is open on the primary;
+- no replica passed its last health check. Each process checks a replica at
+  most every ``DATABASE_REPLICA_CHECK_SECONDS``. A replica that cannot be
+  reached, or whose replay lag exceeds ``DATABASE_REPLICA_MAX_LAG_SECONDS``
+  (Postgres), is skipped until it passes again. Keep that limit below the
+  pin window.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_KEY_PREFIX = 'dbpin:'
+
+# {'replica', 'vendor_id', 'wrote', 'chosen'} while inside use_replica()
+_state: ContextVar[Optional[dict]] = ContextVar('vendora_replica_state', default=None)
+
+# alias -> (healthy, checked_at monotonic)
+_health: Dict[str, tuple] = {}
+# vendor_id -> monotonic time until which this process already knows the pin is set
+_pinned_locally: Dict[object, float] = {}
+
+
+def replica_aliases() -> List[str]:
+    return list(getattr(settings, 'DATABASE_REPLICAS', []) or [])
+
+
+def _pin_seconds() -> float:
+    return float(getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5))
+
+
+def pin_vendor(vendor_id) -> None:
+    """Send this vendor's replica-eligible reads to the primary for the pin window."""
+    if vendor_id is None or not replica_aliases():
+        return
+    now = time.monotonic()
+    window = _pin_seconds()
+    # Refresh the shared pin at most every half window per process
+    if _pinned_locally.get(vendor_id, 0) - now > window / 2:
+        return
+    try:
+        cache.set(f'{PIN_KEY_PREFIX}{vendor_id}', 1, timeout=max(1, int(window + 0.999)))
+        _pinned_locally[vendor_id] = now + window
+    except Exception as e:
+        logger.warning('Replica pin for vendor %s failed: %s', vendor_id, e)
+
+
+def is_pinned(vendor_id) -> bool:
+    if vendor_id is None:
+        return False
+    if _pinned_locally.get(vendor_id, 0) > time.monotonic():
+        return True
+    try:
+        return bool(cache.get(f'{PIN_KEY_PREFIX}{vendor_id}'))
+    except Exception:
+        # Unknown pin state: the primary is always correct
+        return True
+
+
+def _check_replica(alias: str) -> bool:
+    max_lag = float(getattr(settings, 'DATABASE_REPLICA_MAX_LAG_SECONDS', 2))
+    conn = connections[alias]
+    try:
+        with conn.cursor() as cursor:
+            if conn.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT COALESCE(EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp())), 0) '
+                    'FROM (SELECT 1) AS t WHERE pg_is_in_recovery() '
+                    'AND pg_last_wal_receive_lsn() IS DISTINCT FROM pg_last_wal_replay_lsn()'
+                )
+                row = cursor.fetchone()
+                # No row: not replaying anything (caught up, or not a standby at all)
+                lag = float(row[0]) if row else 0.0
+                if lag > max_lag:
+                    logger.warning('Replica %s lags %.1fs (max %.1fs); reading from primary', alias, lag, max_lag)
+                    return False
+            else:
+                cursor.execute('SELECT 1')
+        return True
+    except Exception as e:
+        logger.warning('Replica %s unavailable; reading from primary: %s', alias, e)
+        try:
+            conn.close()
+        except Exception:
+            pass
+        return False
+
+
+def healthy_replicas() -> List[str]:
+    interval = float(getattr(settings, 'DATABASE_REPLICA_CHECK_SECONDS', 5))
+    now = time.monotonic()
+    healthy = []
+    for alias in replica_aliases():
+        ok, checked_at = _health.get(alias, (False, None))
+        if checked_at is None or now - checked_at >= interval:
+            ok = _check_replica(alias)
+            _health[alias] = (ok, now)
+        if ok:
+            healthy.append(alias)
+    return healthy
+
+
+@contextmanager
+def use_replica(vendor_id=None):
+    """Allow reads in this block to go to a replica (see module docstring)."""
+    if _state.get() is not None or not replica_aliases():
+        yield
+        return
+    if vendor_id is None:
+        from vendora.request_context import get_context
+        vendor_id = get_context().get('vendor_id')
+    token = _state.set({'replica': None, 'vendor_id': vendor_id, 'wrote': False, 'chosen': False})
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def replica_reads(func):
+    """Decorator form of ``use_replica()`` for views and bot handlers."""
+    if iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with use_replica():
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _read_alias(state: dict) -> str:
+    if state['wrote'] or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    if not state['chosen']:
+        # Decided once per block so a page never mixes replicas
+        state['chosen'] = True
+        if not is_pinned(state['vendor_id']):
+            candidates = healthy_replicas()
+            state['replica'] = random.choice(candidates) if candidates else None
+    return state['replica'] or DEFAULT_DB_ALIAS
+
+
+def _vendor_of(instance):
+    if instance is None:
+        return None
+    if instance._meta.model_name == 'vendor' and instance._meta.app_label == 'accounts':
+        return instance.pk
+    return getattr(instance, 'vendor_id', None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None:
+            return DEFAULT_DB_ALIAS
+        return _read_alias(state)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state['wrote'] = True
+        from vendora.request_context import get_context
+        vendor_id = _vendor_of(hints.get('instance')) or get_context().get('vendor_id')
+        if vendor_id is None and state is not None:
+            vendor_id = state['vendor_id']
+        pin_vendor(vendor_id)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, so objects from any alias may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaListMixin:
+    """ViewSet mixin: ``list`` reads from a replica (read-your-writes permitting)."""
+
+    def list(self, request, *args, **kwargs):
+        with use_replica(getattr(request.user, 'pk', None)):
+            return super().list(request, *args, **kwargs)  # type: ignore[misc]
@@ -0,0 +1,165 @@
+"""Per-request logging context.
+
+The request id, vendor id, resolved route and Telegram ``update_id`` live in a
+``ContextVar``, so each thread and each asyncio task sees only its own request
+(``sync_to_async`` carries the context into worker threads). The
+``RequestContextFilter`` copies those fields onto every log record for the
+formatters.
+
+``RequestContextMiddleware`` binds the context for each request, echoes
+``X-Request-ID`` and emits a structured access log on the ``vendora.access``
+logger with the duration and number of DB queries. Access logs are sampled
+(``ACCESS_LOG_SAMPLE_RATE``); server errors and requests slower than
+``ACCESS_LOG_SLOW_MS`` are always logged.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+import logging
+import random
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+CONTEXT_FIELDS = ('request_id', 'vendor_id', 'route', 'update_id')
+
+_context: ContextVar[Dict[str, Any]] = ContextVar('vendora_request_context', default={})
+# Mutable cell per request so queries counted in worker threads reach the middleware
+_query_count: ContextVar[Optional[list]] = ContextVar('vendora_request_queries', default=None)
+
+access_logger = logging.getLogger('vendora.access')
+
+
+def get_context() -> Dict[str, Any]:
+    return _context.get()
+
+
+def bind(**fields):
+    """Add fields to the current context; returns a token for ``reset``."""
+    return _context.set({**_context.get(), **fields})
+
+
+def reset(token) -> None:
+    _context.reset(token)
+
+
+@contextmanager
+def bound(**fields):
+    token = bind(**fields)
+    try:
+        yield
+    finally:
+        reset(token)
+
+
+class RequestContextFilter(logging.Filter):
+    """Expose the context fields as record attributes (None when unbound)."""
+
+    def filter(self, record):  # type: ignore[override]
+        ctx = _context.get()
+        for key in CONTEXT_FIELDS:
+            if not hasattr(record, key):
+                setattr(record, key, ctx.get(key))
+        return True
+
+
+def _count_query(execute, sql, params, many, context):
+    cell = _query_count.get()
+    if cell is not None:
+        cell[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+connection_created.connect(_install_query_counter, dispatch_uid='vendora_request_query_counter')
+
+
+class RequestContextMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections opened before the middleware loaded (e.g. at startup)
+        _install_query_counter(connections['default'])
+        token, cell, started = self._begin(request)
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            self._end(request, response, token, cell, started)
+
+    async def __acall__(self, request):
+        token, cell, started = self._begin(request)
+        response = None
+        try:
+            response = await self.get_response(request)
+            return response
+        finally:
+            self._end(request, response, token, cell, started)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = getattr(request, 'resolver_match', None)
+        route = getattr(match, 'route', None) or getattr(match, 'view_name', None)
+        if route:
+            bind(route=route)
+        return None
+
+    def _begin(self, request):
+        rid = request.META.get('HTTP_X_REQUEST_ID') or uuid.uuid4().hex[:12]
+        request.request_id = rid  # type: ignore[attr-defined]
+        cell = [0]
+        tokens = (_context.set({'request_id': rid}), _query_count.set(cell))
+        return tokens, cell, time.perf_counter()
+
+    def _end(self, request, response, tokens, cell, started):
+        duration_ms = (time.perf_counter() - started) * 1000
+        try:
+            if response is not None:
+                response['X-Request-ID'] = request.request_id
+            self._access_log(request, response, duration_ms, cell[0])
+        finally:
+            ctx_token, count_token = tokens
+            _query_count.reset(count_token)
+            _context.reset(ctx_token)
+
+    def _access_log(self, request, response, duration_ms, queries):
+        status = getattr(response, 'status_code', 500)
+        sample_rate = float(getattr(settings, 'ACCESS_LOG_SAMPLE_RATE', 0.1))
+        slow_ms = float(getattr(settings, 'ACCESS_LOG_SLOW_MS', 1000))
+        if not (status >= 500 or duration_ms >= slow_ms or random.random() < sample_rate):
+            return
+        if not access_logger.isEnabledFor(logging.INFO):
+            return
+        user = getattr(request, 'user', None)
+        vendor_id = getattr(user, 'id', None) if getattr(user, 'is_authenticated', False) else None
+        access_logger.info(
+            '%s %s %s %.1fms',
+            request.method, request.path, status, duration_ms,
+            extra={
+                'vendor_id': vendor_id or get_context().get('vendor_id'),
+                'http': {
+                    'method': request.method,
+                    'path': request.path,
+                    'status': status,
+                    'duration_ms': round(duration_ms, 2),
+                    'db_queries': queries,
+                    'sample_rate': sample_rate,
+                },
+            },
+        )
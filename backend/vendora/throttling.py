@@ -1,10 +1,105 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Optional, Tuple
+import logging
 from rest_framework.throttling import SimpleRateThrottle
 from rest_framework.permissions import SAFE_METHODS
 from django.conf import settings
 
-class TrialUserRateThrottle(SimpleRateThrottle):
+logger = logging.getLogger(__name__)
+
+# GCRA in one round trip: the key holds the theoretical arrival time (ms) of
+# the next request. A request is admitted while that time is within
+# ``limit`` emission intervals of now. Uses the server clock so every worker
+# agrees. Returns {allowed, retry_after_ms}.
+_GCRA_LUA = """
+local emission = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+local new_tat = tat + emission
+local allow_at = new_tat - emission * burst
+if allow_at > now then
+  return {0, math.ceil(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now))
+return {1, 0}
+"""
+
+_gcra_script = None
+
+
+def _redis_gcra(cache, key: str, limit: int, duration: int) -> Tuple[bool, Optional[float]]:
+    global _gcra_script
+    full_key = cache.make_and_validate_key(f"{key}:gcra")
+    client = cache._cache.get_client(full_key, write=True)
+    if _gcra_script is None:
+        _gcra_script = client.register_script(_GCRA_LUA)
+    allowed, retry_ms = _gcra_script(keys=[full_key], args=[duration * 1000.0 / limit, limit], client=client)
+    return bool(allowed), (int(retry_ms) / 1000.0 if not allowed else None)
+
+
+def _counter_window(cache, key: str, limit: int, duration: int) -> Tuple[bool, Optional[float]]:
+    """Fixed window anchored at the key's first request: ``add`` opens it, ``incr`` counts."""
+    key = f"{key}:n"
+    if cache.add(key, 1, duration):
+        return True, None
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Window expired between add and incr; this request opens the next one
+        cache.add(key, 1, duration)
+        return True, None
+    if count <= limit:
+        return True, None
+    # The window's remaining lifetime is not tracked; the full period is an upper bound
+    return False, float(duration)
+
+
+def acquire(cache, key: str, limit: int, duration: int) -> Tuple[bool, Optional[float]]:
+    """Admit one request for ``key`` at ``limit`` per ``duration`` seconds; (allowed, wait)."""
+    try:
+        from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+        from django.core.cache.backends.redis import RedisCache
+        from django.utils.connection import ConnectionProxy
+        if isinstance(cache, ConnectionProxy):
+            # SimpleRateThrottle.cache is the ``django.core.cache.cache`` proxy, never a backend
+            cache = caches[DEFAULT_CACHE_ALIAS]
+        if isinstance(cache, RedisCache):
+            return _redis_gcra(cache, key, limit, duration)
+        return _counter_window(cache, key, limit, duration)
+    except Exception as e:
+        # Fail open: an unavailable cache must not take the API down with it
+        logger.warning("Throttle check failed for %s: %s", key, e)
+        return True, None
+
+
+class AtomicRateThrottle(SimpleRateThrottle):
+    """SimpleRateThrottle with constant per-request cost.
+
+    DRF's base class keeps every request timestamp for the window under the
+    key and rewrites the list on each request. This keeps one small value per
+    key, updated atomically: GCRA in a Lua script on Redis (burst of
+    ``num_requests``, refilling evenly over the period), otherwise a counter
+    window using the cache's atomic ``add``/``incr``. Rates, scopes and cache
+    keys are configured exactly as for SimpleRateThrottle.
+    """
+
+    def allow_request(self, request, view):  # type: ignore[override]
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        allowed, self._wait = acquire(self.cache, self.key, self.num_requests, self.duration)
+        return allowed
+
+    def wait(self):  # type: ignore[override]
+        return getattr(self, '_wait', None)
+
+
+class TrialUserRateThrottle(AtomicRateThrottle):
     """
     Applies THROTTLE_TRIAL_USER to authenticated users flagged as trial.
     Scope: user_trial
@@ -25,7 +120,7 @@ class TrialUserRateThrottle(SimpleRateThrottle):
         return self.cache_format % {'scope': self.scope, 'ident': str(user.pk)}
 
 
-class RegularUserRateThrottle(SimpleRateThrottle):
+class RegularUserRateThrottle(AtomicRateThrottle):
     """
     Applies THROTTLE_USER to authenticated non-trial users.
     Scope: user
@@ -43,8 +138,8 @@ class RegularUserRateThrottle(SimpleRateThrottle):
             return None
         return self.cache_format % {'scope': self.scope, 'ident': user.pk}
 
-class _FixedScopeThrottle(SimpleRateThrottle):
-    """A SimpleRateThrottle variant with an immutable, class-level scope.
+class _FixedScopeThrottle(AtomicRateThrottle):
+    """An AtomicRateThrottle variant with an immutable, class-level scope.
 
     We intentionally do NOT inherit from ScopedRateThrottle because that
     class rewrites `self.scope` from the view's `throttle_scope` attribute
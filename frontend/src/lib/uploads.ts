@@ -0,0 +1,52 @@
+import { http } from './http';
+
+// Matches backend api.storage.UPLOAD_KINDS
+export type UploadKind = 'proof' | 'vendor_proof' | 'avatar' | 'receipt';
+
+interface PresignResponse {
+  key: string;
+  upload: {
+    url: string;
+    method: 'PUT';
+    headers: Record<string, string>;
+    expires_in: number;
+  };
+}
+
+async function sha256Hex(file: Blob): Promise<string> {
+  const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+  return Array.from(new Uint8Array(digest))
+    .map((b) => b.toString(16).padStart(2, '0'))
+    .join('');
+}
+
+/**
+ * Upload a file straight to object storage and return its key for the
+ * matching `<kind>_key` field. Returns null when direct uploads are disabled
+ * (local storage backend) so callers can fall back to a multipart request.
+ */
+export async function uploadDirect(kind: UploadKind, file: File): Promise<string | null> {
+  if (typeof crypto === 'undefined' || !crypto.subtle) return null;
+  const sha256 = await sha256Hex(file);
+  let presign: PresignResponse;
+  try {
+    const res = await http.post<PresignResponse>('/api/v1/uploads/presign/', {
+      kind,
+      sha256,
+      content_type: file.type,
+      size: file.size,
+      filename: file.name,
+    });
+    presign = res.data;
+  } catch (error: any) {
+    if (error?.response?.status === 501) return null;
+    throw error;
+  }
+  const resp = await fetch(presign.upload.url, {
+    method: presign.upload.method,
+    headers: presign.upload.headers,
+    body: file,
+  });
+  if (!resp.ok) throw new Error(`Upload failed (${resp.status})`);
+  return presign.key;
+}
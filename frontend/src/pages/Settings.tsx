@@ -13,6 +13,7 @@ import { listBankDetails, createBankDetail, updateBankDetail, deleteBankDetail,
 import { listRates, createRate, updateRate, deleteRate, Rate } from "@/lib/rates";
 import { getCurrencyOptions } from "@/lib/currency";
 import http from "@/lib/http";
+import { uploadDirect } from "@/lib/uploads";
 import { getErrorMessage } from "@/lib/errors";
 import { isUpdateAvailable, subscribeToSWUpdate, requestUpdate } from "@/lib/sw-updates";
 import { promptInstall, ensurePushRegistered, PushRegistrationResult } from "@/main";
@@ -308,9 +309,16 @@ const Settings = () => {
         return;
       }
       try {
-        const form = new FormData();
-        form.append("avatar", file);
-        const res = await http.patch('/api/v1/accounts/vendors/me/', form);
+        const key = await uploadDirect("avatar", file);
+        let payload: FormData | { avatar_key: string };
+        if (key) {
+          payload = { avatar_key: key };
+        } else {
+          const form = new FormData();
+          form.append("avatar", file);
+          payload = form;
+        }
+        const res = await http.patch('/api/v1/accounts/vendors/me/', payload);
         const url = resolveMediaUrl(res.data.avatar_url) || URL.createObjectURL(file);
         setProfileImage(url);
         await refreshUser();
@@ -9,6 +9,7 @@ import { Label } from "@/components/ui/label";
 import { ArrowLeft, Check, Upload, Download, Clock, CheckCircle2, XCircle, Image as ImageIcon } from "lucide-react";
 import { useToast } from "@/hooks/use-toast";
 import { http, tokenStore } from "@/lib/http";
+import { uploadDirect } from "@/lib/uploads";
 import { getErrorMessage } from "@/lib/errors";
 import { formatCurrency } from "@/lib/currency";
 import { useAuth } from "@/contexts/AuthContext";
@@ -75,10 +76,15 @@ const TransactionDetails = () => {
     setIsUploading(true);
     try {
       if (!id) return;
-      const form = new FormData();
-      form.append("status", "completed");
-      form.append("vendor_proof", files[0]);
-      await http.post(`/api/v1/transactions/${id}/complete/`, form, { headers: { "Content-Type": "multipart/form-data" } });
+      const key = await uploadDirect("vendor_proof", files[0]);
+      if (key) {
+        await http.post(`/api/v1/transactions/${id}/complete/`, { status: "completed", vendor_proof_key: key });
+      } else {
+        const form = new FormData();
+        form.append("status", "completed");
+        form.append("vendor_proof", files[0]);
+        await http.post(`/api/v1/transactions/${id}/complete/`, form, { headers: { "Content-Type": "multipart/form-data" } });
+      }
       toast({ title: "Proof Uploaded", description: "Vendor proof uploaded and transaction completed.", className: "bg-success text-success-foreground" });
       const fresh = await http.get(`/api/v1/transactions/${id}/`);
       setTxn(fresh.data);
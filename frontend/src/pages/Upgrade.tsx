@@ -2,6 +2,7 @@ import React, { useState, useEffect, useCallback } from 'react';
 import Layout from '@/components/Layout';
 import { useAuth } from '@/contexts/AuthContext';
 import { http } from '@/lib/http';
+import { uploadDirect } from '@/lib/uploads';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
@@ -54,10 +55,15 @@ export default function UpgradePage() {
     }
     setLoading(true);
     try {
-      const fd = new FormData();
-      fd.append('receipt', file);
-      fd.append('note', note);
-      await http.post('/api/v1/accounts/payment-requests/', fd, { headers: { 'Content-Type': 'multipart/form-data' } });
+      const key = await uploadDirect('receipt', file);
+      if (key) {
+        await http.post('/api/v1/accounts/payment-requests/', { receipt_key: key, note });
+      } else {
+        const fd = new FormData();
+        fd.append('receipt', file);
+        fd.append('note', note);
+        await http.post('/api/v1/accounts/payment-requests/', fd, { headers: { 'Content-Type': 'multipart/form-data' } });
+      }
       toast({ title: 'Submitted', description: 'Your payment receipt was submitted and is pending review.' });
       // Poll the latest endpoint with exponential backoff (max ~60s)
       (async () => {